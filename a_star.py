@@ -3,11 +3,41 @@ from os import path
 import math
 from queue import PriorityQueue, SimpleQueue
 from tree_node import TreeNode
+from candidates import shortest_path
 from heapq import *
 
 INF_INT = 1000000000
 
+# Maximal number of tree nodes held at once by memory-bounded searches, each of them holds a solution list of all links
+MAX_SEARCH_NODES = 100000
+# Number of nodes kept at every depth by beam search
+BEAM_WIDTH = 64
+
+
+class SearchStats:
+    """
+    Statistics of a search of the solution tree, to compare variants of the search:
+    numbers of expanded, generated, dropped (to stay within memory bound) and pruned (by the best known solution) tree nodes,
+    number of iterations (IDA* thresholds) and peak number of tree nodes held at once
+    """
+    def __init__(self):
+        self.expansions = 0
+        self.generated = 0
+        self.dropped = 0
+        self.pruned = 0
+        self.iterations = 0
+        self.peak_nodes = 0
+
+    def hold(self, nodes_count):
+        if nodes_count > self.peak_nodes:
+            self.peak_nodes = nodes_count
+
+    def __str__(self):
+        return f"{self.expansions} expanded, {self.generated} generated, {self.dropped} dropped, {self.pruned} pruned, " \
+               f"{self.iterations} iterations, peak {self.peak_nodes} nodes"
+
 def calculate_min_dist(network):
+    mask = network.link_mask
     min_dist = []
     for i in range(len(network.nodes)):
         min_dist.append([INF_INT] * len(network.nodes))
@@ -23,6 +53,8 @@ def calculate_min_dist(network):
             node = q.get()
     
             for link_id in node.links:
+                if mask is not None and not mask[link_id]:
+                    continue
                 link = network.links[link_id]
                 new_dist = min_dist[start_node.id][node.id] + 1
 
@@ -35,6 +67,7 @@ def calculate_min_dist(network):
 
 
 def calculate_min_cost(network):
+    mask = network.link_mask
     min_cost = []
     for i in range(len(network.nodes)):
         min_cost.append([float("inf")] * len(network.nodes))
@@ -55,6 +88,8 @@ def calculate_min_cost(network):
             node = q.get()
 
             for link_id in node.links:
+                if mask is not None and not mask[link_id]:
+                    continue
                 link = network.links[link_id]
                 new_cost = min_cost[start_node.id][node.id] + link.get_a_star_cost()
 
@@ -82,7 +117,7 @@ def get_scale(cost_tab, dist_tab):
     return avg_dist/avg_cost
 
 
-def prepare_solution_tree(network, start_node, end_node, min_cost_tab, min_dist_tab, weight_length, weight_cost):
+def prepare_solution_tree(network, start_node, end_node, min_cost_tab, min_dist_tab, weight_length, weight_cost, link_lengths=None, conflict_index=None):
 
     #start_node = network.nodes[network.nodes_ids_map.index("Norden")]
     #end_node = network.nodes[network.nodes_ids_map.index("Passau")]
@@ -92,23 +127,103 @@ def prepare_solution_tree(network, start_node, end_node, min_cost_tab, min_dist_
     TreeNode.start_node = start_node
     TreeNode.end_node = end_node
     
-    TreeNode.min_cost = min_cost_tab
-    TreeNode.min_dist = min_dist_tab
+    # Only rows of the end node and the start node are used, so tables may compute rows on access
+    TreeNode.min_cost = min_cost_tab[start_node.id]
+    TreeNode.min_dist = min_dist_tab[end_node.id]
+
+    capacities = network.capacities()
+    TreeNode.free_fractions = ((capacities - network.loads) / capacities).tolist()
 
     TreeNode.weight_length = weight_length
     TreeNode.weight_cost = weight_cost
+    # Links of contracted networks stand for chains of links
+    TreeNode.link_lengths = link_lengths
+    # Counting shared nodes or risk groups instead of shared links, other than the ends of the demand
+    TreeNode.conflict_index = conflict_index
+    if conflict_index is not None:
+        TreeNode.conflict_ends_mask = conflict_index.ends_mask(start_node.id, end_node.id)
+    TreeNode.upper_bound = float("inf")
     return TreeNode([0] * len(network.links), None, start_node, 1)
 
 
+def heuristic_admissible(weight_length, weight_cost):
+    """
+    Checks if scores of tree nodes never overestimate goal functions of solutions below them, so that pruning by
+    a known solution keeps the optimum. With weight_cost above 1, free capacity heuristic 10^(-weight_cost * min_cost)
+    can be lower than the free fraction of a path of -log10 cost at least min_cost
+    """
+    return weight_length >= 0 and 0 <= weight_cost <= 1
+
+
+def shortest_pair_solution(root):
+    """
+    Returns the better of complete solutions made of a shortest path and a lowest cost path avoiding links of it,
+    in both orders, quick to find and good enough to bound the search, or None if there is none
+    """
+    network = TreeNode.network
+    start_id = TreeNode.start_node.id
+    end_id = TreeNode.end_node.id
+    lengths = [root.get_link_length(link_id) for link_id in range(len(network.links))]
+    # Full links would have infinite -log10 costs, those hidden by the mask are skipped by Dijkstra anyway
+    costs = [-math.log10(free_fraction) if free_fraction > 0 else float("inf")
+             for free_fraction in TreeNode.free_fractions]
+    best = None
+    for first_weights, second_weights, first_value in ((lengths, costs, 1), (costs, lengths, 2)):
+        first_path = shortest_path(network, start_id, end_id, first_weights)
+        if first_path is None:
+            return None
+        second_path = shortest_path(network, start_id, end_id, second_weights, frozenset(first_path[1]))
+        if second_path is None:
+            second_path = shortest_path(network, start_id, end_id, second_weights)
+        solution = [0] * len(network.links)
+        for link_id in first_path[1]:
+            solution[link_id] += first_value
+        for link_id in second_path[1]:
+            solution[link_id] += 3 - first_value
+        incumbent = TreeNode(solution, None, TreeNode.start_node, 3)
+        if best is None or incumbent.get_goal_function() < best.get_goal_function():
+            best = incumbent
+    return best
+
+
+def bound_search(root):
+    """
+    Sets `TreeNode.upper_bound` to goal function of a quickly found solution and returns it, if there is one
+    """
+    incumbent = shortest_pair_solution(root)
+    if incumbent is not None:
+        TreeNode.upper_bound = incumbent.get_goal_function()
+    return incumbent
+
+
 # A*
-def a_star(root):
+def a_star(root, pareto_archive=None, max_expansions=None, stats=None, max_nodes=None, prune=False):
+    """
+    Returns the first complete solution found, None if there is none or `max_expansions` nodes were expanded before it was found
+    and no solution was found by `bound_search` either.
+    If `pareto_archive` is given, search continues after the first complete solution and every complete solution
+    is offered to the archive (with objectives from `TreeNode.get_objectives`), until all nodes or `max_expansions` nodes were expanded.
+    If the open list grows over `max_nodes` nodes, its worse half is dropped, as in SMA* but without backing up
+    their scores, so the solution is not guaranteed to be optimal any more. Counts are added to `stats` if it is given.
+    If `prune` is set and there is no archive, children scored above a quickly found solution are not created,
+    which keeps the optimum only if `heuristic_admissible` holds for the weights of the tree
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.iterations += 1
+    incumbent = None
+    if prune and pareto_archive is None:
+        incumbent = bound_search(root)
     # Using heapq, which should be much faster than standard PriorityQueue implementation
     q = [(0, root)]
     visited_count = 0
+    first_solution = None
     #q = PriorityQueue()
     #q.put(root)
     end = False
     while not end and not len(q) < 1:
+        if max_expansions is not None and visited_count >= max_expansions:
+            break
         visited_count += 1
         score, tree_node = heappop(q)
         #print(tree_node)
@@ -116,15 +231,130 @@ def a_star(root):
 
         if tree_node.phase == 3:
             #print(f"Visited {visited_count} solutions")
-            return tree_node
+            if pareto_archive is None:
+                return tree_node
+            pareto_archive.add(*tree_node.get_objectives(), tree_node.solution)
+            if first_solution is None:
+                first_solution = tree_node
+            continue
 
+        stats.expansions += 1
         tree_node.create_children_nodes()
 
         for child in tree_node.children:
             #print(child.solution)
             heappush(q, (child.get_score(), child))
-    
-    return None
+        stats.generated += len(tree_node.children)
+        stats.pruned += tree_node.pruned_count
+        # Expanded nodes are kept only as parents of open ones
+        tree_node.children = None
+
+        if max_nodes is not None and len(q) > max_nodes:
+            kept = nsmallest(max_nodes // 2, q)
+            stats.dropped += len(q) - len(kept)
+            q = kept
+            heapify(q)
+        stats.hold(len(q))
+
+    # Nothing better than the incumbent was left in the open list or the budget ran out
+    if first_solution is None:
+        return incumbent
+    return first_solution
+
+
+# IDA*
+def ida_star(root, max_expansions=None, stats=None, prune=False):
+    """
+    Iterative deepening A*: depth-first searches of nodes with scores up to a threshold, raised after every search
+    to the lowest score above it. Returns the same solution as `a_star`, or None if there is none
+    or `max_expansions` nodes were expanded before it was found and no solution was found by `bound_search` either.
+    Only children of nodes on the current path are held, so memory grows with depth of the tree, not with the number of expansions.
+    Counts are added to `stats` if it is given. If `prune` is set, children scored above a quickly found solution are not created,
+    which keeps the optimum only if `heuristic_admissible` holds for the weights of the tree
+    """
+    if stats is None:
+        stats = SearchStats()
+    incumbent = None
+    if prune:
+        incumbent = bound_search(root)
+    threshold = root.get_score()
+    while threshold != float("inf"):
+        stats.iterations += 1
+        next_threshold = float("inf")
+        # Not yet visited children at every depth of the current path, the best one last
+        stack = [[(threshold, root)]]
+        held_count = 1
+        while stack:
+            if not stack[-1]:
+                stack.pop()
+                continue
+            score, tree_node = stack[-1].pop()
+            held_count -= 1
+            if score > threshold:
+                next_threshold = min(next_threshold, score)
+                continue
+            if tree_node.phase == 3:
+                return tree_node
+            if max_expansions is not None and stats.expansions >= max_expansions:
+                return incumbent
+
+            stats.expansions += 1
+            tree_node.create_children_nodes()
+            children = [(child.get_score(), child) for child in tree_node.children]
+            tree_node.children = None
+            children.sort(key=lambda child: child[0], reverse=True)
+            stack.append(children)
+            stats.generated += len(children)
+            stats.pruned += tree_node.pruned_count
+            held_count += len(children)
+            stats.hold(held_count + len(stack))
+        threshold = next_threshold
+    return incumbent
+
+
+# Beam search
+def beam_search(root, beam_width=BEAM_WIDTH, max_expansions=None, stats=None, prune=False):
+    """
+    Breadth-first search keeping only `beam_width` best scored nodes at every depth.
+    Returns the best complete solution found, which may be worse than the one of `a_star`,
+    or None if none was found. Counts are added to `stats` if it is given.
+    If `prune` is set, search starts with a quickly found solution as the best one
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.iterations += 1
+    beam = [(root.get_score(), root)]
+    best = None
+    if prune:
+        incumbent = bound_search(root)
+        if incumbent is not None:
+            best = (incumbent.get_score(), incumbent)
+    while beam:
+        next_beam = []
+        for score, tree_node in beam:
+            # Scores never overestimate, so the node can not lead to a better solution
+            if best is not None and score >= best[0]:
+                continue
+            if max_expansions is not None and stats.expansions >= max_expansions:
+                break
+
+            stats.expansions += 1
+            tree_node.create_children_nodes()
+            for child in tree_node.children:
+                child_score = child.get_score()
+                if child.phase == 3:
+                    if best is None or child_score < best[0]:
+                        best = (child_score, child)
+                        if prune:
+                            TreeNode.upper_bound = child_score
+                else:
+                    next_beam.append((child_score, child))
+            stats.generated += len(tree_node.children)
+            stats.pruned += tree_node.pruned_count
+            tree_node.children = None
+        stats.hold(len(beam) + len(next_beam))
+        beam = nsmallest(beam_width, next_beam, key=lambda node: node[0])
+    return None if best is None else best[1]
 
 
 # Usage example
@@ -139,17 +369,17 @@ if __name__ == "__main__":
     
     print(nodes_ids)
     print(links_data)
-    
-    min_cost = calculate_min_cost(network)
-    min_dist = calculate_min_dist(network)
-    
-    print(min_cost)
+
+    # Only rows of the end nodes are computed, instead of all pairs matrices
+    from heuristics import HeuristicCache
+    from candidates import METRIC_CAPACITY, METRIC_HOPS
+    heuristics = HeuristicCache(network)
 
     root = prepare_solution_tree(
         network, 
         network.nodes[network.nodes_ids_map.index("Norden")],
         network.nodes[network.nodes_ids_map.index("Passau")],
-        min_cost, min_dist,
+        heuristics.rows(METRIC_CAPACITY), heuristics.rows(METRIC_HOPS),
         1, 1
     )
     print(f"Found: {a_star(root)}")
@@ -0,0 +1,160 @@
+from admission_test import create_test_network
+import a_star
+import network as net
+import numpy as np
+from routing import Router, solution_to_paths
+import unittest
+
+
+def create_grid_network(size: int) -> net.Network:
+    nodes_ids = [f'n{row}_{column}' for row in range(size)
+                 for column in range(size)]
+    links_data = []
+    for row in range(size):
+        for column in range(size):
+            if column + 1 < size:
+                links_data.append((f'h{row}_{column}', f'n{row}_{column}',
+                                   f'n{row}_{column + 1}', 1, 1))
+            if row + 1 < size:
+                links_data.append((f'v{row}_{column}', f'n{row}_{column}',
+                                   f'n{row + 1}_{column}', 1, 1))
+    test_network = net.Network(nodes_ids, links_data)
+    rng = np.random.default_rng(3)
+    for link in test_network.links:
+        link.load = rng.uniform(0, 0.9)
+    return test_network
+
+
+def prepare_root(test_network, start_id, end_id):
+    return a_star.prepare_solution_tree(
+        test_network, test_network.nodes[start_id],
+        test_network.nodes[end_id],
+        a_star.calculate_min_cost(test_network),
+        a_star.calculate_min_dist(test_network), 1, 1)
+
+
+class TestBoundedSearches(unittest.TestCase):
+
+    def test_ida_star_matches_a_star(self):
+        for test_network, start_id, end_id in\
+                ((create_test_network(), 0, 1),
+                 (create_grid_network(3), 0, 8)):
+            expected = a_star.a_star(
+                prepare_root(test_network, start_id, end_id))
+            stats = a_star.SearchStats()
+
+            found = a_star.ida_star(
+                prepare_root(test_network, start_id, end_id), stats=stats)
+
+            self.assertAlmostEqual(found.get_goal_function(),
+                                   expected.get_goal_function())
+            self.assertGreaterEqual(stats.iterations, 1)
+            self.assertGreater(stats.expansions, 0)
+
+    def test_beam_search(self):
+        test_network = create_grid_network(3)
+        expected = a_star.a_star(prepare_root(test_network, 0, 8))
+        stats = a_star.SearchStats()
+
+        found = a_star.beam_search(prepare_root(test_network, 0, 8),
+                                   beam_width=4, stats=stats)
+
+        self.assertEqual(found.phase, 3)
+        self.assertGreaterEqual(found.get_goal_function(),
+                                expected.get_goal_function() - 1e-12)
+        # Beam and children of its nodes
+        self.assertLessEqual(stats.peak_nodes, 4 + 4 * 4)
+
+        wide = a_star.beam_search(prepare_root(test_network, 0, 8),
+                                  beam_width=10000)
+        self.assertAlmostEqual(wide.get_goal_function(),
+                               expected.get_goal_function())
+
+    def test_a_star_max_nodes(self):
+        test_network = create_grid_network(3)
+        stats = a_star.SearchStats()
+
+        found = a_star.a_star(prepare_root(test_network, 0, 8),
+                              stats=stats, max_nodes=8, prune=False)
+
+        self.assertIsNotNone(found)
+        self.assertLessEqual(stats.peak_nodes, 8)
+        self.assertGreater(stats.dropped, 0)
+
+    def test_pruning_keeps_optimum(self):
+        test_network = create_grid_network(6)
+        full_stats = a_star.SearchStats()
+        expected = a_star.a_star(prepare_root(test_network, 0, 35),
+                                 stats=full_stats)
+        stats = a_star.SearchStats()
+
+        found = a_star.a_star(prepare_root(test_network, 0, 35),
+                              stats=stats, prune=True)
+
+        self.assertAlmostEqual(found.get_goal_function(),
+                               expected.get_goal_function())
+        self.assertGreater(stats.pruned, 0)
+        self.assertLess(stats.generated, full_stats.generated)
+
+    def test_no_pruning_with_inadmissible_heuristic(self):
+        test_network = create_grid_network(4)
+        root = a_star.prepare_solution_tree(
+            test_network, test_network.nodes[0], test_network.nodes[15],
+            a_star.calculate_min_cost(test_network),
+            a_star.calculate_min_dist(test_network), 1, 2)
+        expected = a_star.a_star(root)
+        router = Router(test_network, weight_dist=1, weight_cost=2)
+
+        paths = router.route_a_star(0, 15)
+
+        self.assertFalse(a_star.heuristic_admissible(1, 2))
+        self.assertTrue(a_star.heuristic_admissible(1, 1))
+        self.assertListEqual(paths, solution_to_paths(expected.solution))
+        self.assertEqual(router.search_stats.pruned, 0)
+
+    def test_shortest_pair_solution(self):
+        test_network = create_test_network()
+        root = prepare_root(test_network, 0, 1)
+
+        incumbent = a_star.shortest_pair_solution(root)
+
+        self.assertEqual(incumbent.phase, 3)
+        # Lowest cost path S-a-b-K and the shortest path avoiding it,
+        # better than the shortest path S-a-K and a path avoiding it
+        self.assertEqual(incumbent.solution, [2, 1, 2, 0, 2, 1, 1])
+        self.assertAlmostEqual(incumbent.get_goal_function(),
+                               a_star.a_star(root).get_goal_function())
+
+    def test_saturated_masked_link(self):
+        test_network = create_grid_network(3)
+        test_network.links[0].load = test_network.links[0].capacity
+        test_network.link_mask = np.ones(len(test_network.links), dtype=bool)
+        test_network.link_mask[0] = False
+        expected = a_star.a_star(prepare_root(test_network, 0, 8))
+
+        found = a_star.a_star(prepare_root(test_network, 0, 8), prune=True)
+
+        self.assertAlmostEqual(found.get_goal_function(),
+                               expected.get_goal_function())
+        self.assertEqual(found.solution[0], 0)
+
+    def test_budget_returns_incumbent(self):
+        test_network = create_grid_network(4)
+        incumbent = a_star.shortest_pair_solution(
+            prepare_root(test_network, 0, 15))
+
+        for search in (a_star.a_star, a_star.ida_star):
+            found = search(prepare_root(test_network, 0, 15),
+                           max_expansions=1, prune=True)
+
+            self.assertEqual(found.solution, incumbent.solution)
+
+    def test_no_solution(self):
+        test_network = create_test_network()
+        # K is not reachable
+        test_network.link_mask = np.asarray(
+            [True, True, True, False, False, True, False])
+
+        self.assertIsNone(a_star.ida_star(prepare_root(test_network, 0, 1)))
+        self.assertIsNone(
+            a_star.beam_search(prepare_root(test_network, 0, 1)))
@@ -0,0 +1,93 @@
+import numpy as np
+import network as net
+from routing import Router, ALG_A_STAR
+
+
+class Flow:
+    """
+Demand admitted into a network.\n
+Contains numerical ids of its end nodes, reserved `load` and `paths` - two
+lists of ids of links routing it. `links` is an array with id of every link
+once for each of the paths it belongs to, so that links shared by both paths
+have the load reserved twice, and releasing the flow is a single vectorized
+operation.
+    """
+    def __init__(self, id: int, start_id: int, end_id: int, load: float,
+                 paths: list[list[int]]) -> None:
+        self.id = id
+        self.start_id = start_id
+        self.end_id = end_id
+        self.load = load
+        self.paths = paths
+        self.links = np.fromiter((link_id for path in paths
+                                  for link_id in path), dtype=np.intp)
+
+
+class AdmissionController:
+    """
+Admission control of demands in `network`.\n
+Every admitted demand is routed by `router` over links with enough residual
+capacity to bear it, has its load reserved on both of its paths and is kept
+in `flows` under its id until it is released.\n
+A demand is rejected if any of its links would be left without free
+capacity, in which case the network is left unchanged.
+    """
+    def __init__(self, network: net.Network, router: Router = None) -> None:
+        self.network = network
+        self.router = router
+        if self.router is None:
+            self.router = Router(network)
+        self.flows = dict[int, Flow]()
+        self.next_flow_id = 0
+        self.admitted_count = 0
+        self.rejected_count = 0
+
+    def admit(self, start_id: int, end_id: int, load: float,
+              algorithm: int = ALG_A_STAR) -> Flow:
+        """
+Routes demand of size `load` between nodes with numerical ids `start_id`
+and `end_id` and reserves its load.\n
+Returns admitted `Flow` or None if the demand was rejected
+        """
+        paths = self.router.route_demand(start_id, end_id, load, algorithm)
+        return self.reserve(start_id, end_id, load, paths)
+
+    def reserve(self, start_id: int, end_id: int, load: float,
+                paths: list[list[int]]) -> Flow:
+        """
+Reserves load of a demand already routed along `paths`.\n
+Returns admitted `Flow` or None if the demand was rejected
+        """
+        if paths is None:
+            self.rejected_count += 1
+            return None
+
+        flow = Flow(self.next_flow_id, start_id, end_id, load, paths)
+        if not self.can_reserve(flow.links, load):
+            self.rejected_count += 1
+            return None
+
+        self.network.change_links_load(flow.links, load)
+        self.flows[flow.id] = flow
+        self.next_flow_id += 1
+        self.admitted_count += 1
+        return flow
+
+    def release(self, flow_id: int) -> Flow:
+        """
+Removes load of the flow with given id from the network and returns it
+        """
+        try:
+            flow = self.flows.pop(flow_id)
+        except KeyError as err:
+            raise ValueError(f'there is no flow with {flow_id} id') from err
+        self.network.change_links_load(flow.links, -flow.load)
+        return flow
+
+    def can_reserve(self, link_ids: list[int], load: float) -> bool:
+        # Free capacity has to stay positive for -log10 costs to be finite
+        links_ids, counts = np.unique(np.asarray(link_ids, dtype=np.intp),
+                                      return_counts=True)
+        residuals = self.network.capacities()[links_ids] -\
+            self.network.loads[links_ids]
+        return bool(np.all(residuals > counts * load))
@@ -0,0 +1,113 @@
+import network as net
+from admission import AdmissionController
+from routing import ALG_A_STAR, ALG_ANT_COLONY, ALG_K_SHORTEST
+import unittest
+
+
+def create_test_network() -> net.Network:
+    nodes_ids = ['S', 'K', 'a', 'b', 'c', 'd']
+    links_data = [('L1', 'S', 'a', 1, 1),
+                  ('L2', 'S', 'c', 1, 1),
+                  ('L3', 'a', 'b', 1, 1),
+                  ('L4', 'a', 'K', 1, 1),
+                  ('L5', 'b', 'K', 1, 1),
+                  ('L6', 'c', 'd', 1, 1),
+                  ('L7', 'd', 'K', 1, 1)]
+    test_network = net.Network(nodes_ids, links_data)
+    test_network.links[2].load = 0.1
+    test_network.links[3].load = 0.5
+    test_network.links[4].load = 0.1
+    test_network.links[5].load = 0.9
+    return test_network
+
+
+class TestAdmissionController(unittest.TestCase):
+
+    def test_admit_reserves_load_on_both_paths(self):
+        test_network = create_test_network()
+        controller = AdmissionController(test_network)
+
+        flow = controller.admit(0, 1, 0.05, ALG_A_STAR)
+
+        self.assertIsNotNone(flow)
+        self.assertCountEqual(flow.paths[0], [1, 5, 6])
+        self.assertCountEqual(flow.paths[1], [0, 2, 4])
+        self.assertAlmostEqual(test_network.links[5].load, 0.95)
+        self.assertAlmostEqual(test_network.links[2].load, 0.15)
+        self.assertAlmostEqual(test_network.links[3].load, 0.5)
+        self.assertEqual(test_network.load_epoch, 1)
+
+    def test_release_restores_load(self):
+        test_network = create_test_network()
+        loads = [link.load for link in test_network.links]
+        controller = AdmissionController(test_network)
+
+        flow = controller.admit(0, 1, 0.05, ALG_A_STAR)
+        controller.release(flow.id)
+
+        self.assertDictEqual(controller.flows, {})
+        for link, load in zip(test_network.links, loads):
+            self.assertAlmostEqual(link.load, load)
+        with self.assertRaises(ValueError):
+            controller.release(flow.id)
+
+    def test_admit_rejects_without_changing_load(self):
+        test_network = create_test_network()
+        loads = [link.load for link in test_network.links]
+        controller = AdmissionController(test_network)
+
+        self.assertIsNone(controller.admit(0, 1, 0.6, ALG_A_STAR))
+        self.assertEqual(controller.rejected_count, 1)
+        self.assertEqual(test_network.load_epoch, 0)
+        self.assertListEqual([link.load for link in test_network.links],
+                             loads)
+
+    def test_admit_routes_around_links_without_capacity(self):
+        test_network = create_test_network()
+        controller = AdmissionController(test_network)
+
+        flow = controller.admit(0, 1, 0.2, ALG_A_STAR)
+
+        self.assertIsNotNone(flow)
+        self.assertNotIn(5, flow.links)
+
+    def test_admit_ant_colony(self):
+        test_network = create_test_network()
+        controller = AdmissionController(test_network)
+
+        flow = controller.admit(0, 1, 0.01, ALG_ANT_COLONY)
+
+        self.assertIsNotNone(flow)
+        for path in flow.paths:
+            for link_id in path:
+                self.assertLess(test_network.links[link_id].load,
+                                test_network.links[link_id].capacity)
+
+    def test_ant_colony_loads_follow_capacities(self):
+        nodes_ids = ['S', 'K', 'a']
+        links_data = [('L1', 'S', 'K', 40, 1),
+                      ('L2', 'S', 'a', 40, 1),
+                      ('L3', 'a', 'K', 40, 1)]
+        test_network = net.Network(nodes_ids, links_data)
+        test_network.links[1].load = 10.0
+        controller = AdmissionController(test_network)
+
+        controller.admit(0, 1, 1.0, ALG_ANT_COLONY)
+
+        # 1% of capacity on empty links, as when the colony was created
+        self.assertListEqual(
+            controller.router.ant_network.loads.tolist(), [0.4, 10.0, 0.4])
+
+    def test_admit_k_shortest(self):
+        test_network = create_test_network()
+        controller = AdmissionController(test_network)
+
+        flow = controller.admit(0, 1, 0.05, ALG_K_SHORTEST)
+
+        self.assertIsNotNone(flow)
+        self.assertListEqual(flow.paths, [[1, 5, 6], [0, 2, 4]])
+
+        flow = controller.admit(0, 1, 0.2, ALG_K_SHORTEST)
+
+        self.assertIsNotNone(flow)
+        self.assertNotIn(5, flow.links)
@@ -1,8 +1,49 @@
 import network as net
+from pareto import ParetoArchive
+from candidates import METRIC_COST
+from heuristics import HeuristicCache
+from local_search import PairLocalSearch
 import math
-import random
 import numpy as np
 from copy import deepcopy
+from itertools import count
+
+# Pheromone deposit strategies, see `RivalAntsAlgorithmNetwork.update_pheromones`
+DEPOSIT_ALL = 1
+DEPOSIT_GLOBAL_BEST = 2
+DEPOSIT_RANK = 3
+DEPOSIT_MMAS = 4
+
+# Costs of sets of paths are floored at this value where pheromones are
+# divided by them, costs of custom `cost_func` weights can reach 0 or less
+MIN_DEPOSIT_COST = 1e-9
+
+
+class RandomStream:
+    """
+Stream of random numbers uniformly distributed over [0, 1), drawn from
+`numpy.random.Generator` in blocks of `block_size` numbers.\n
+`seed` can be anything accepted by `numpy.random.default_rng`, including
+another `Generator`. `spawn` creates independent child streams, e.g. for
+worker processes.
+    """
+    def __init__(self, seed=None, block_size: int = 4096) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.block = list[float]()
+        self.position = 0
+
+    def random(self) -> float:
+        if self.position == len(self.block):
+            self.block = self.rng.random(self.block_size).tolist()
+            self.position = 0
+        value = self.block[self.position]
+        self.position += 1
+        return value
+
+    def spawn(self, count: int) -> list['RandomStream']:
+        return [RandomStream(child_rng, self.block_size)
+                for child_rng in self.rng.spawn(count)]
 
 
 class RivalAnt:
@@ -10,6 +51,11 @@ class RivalAnt:
     """
 Abstract class representing ant in ant colony optimization algorithm with
 rivalizing ants.\n
+Ants of a colony form castes, one for each type of pheromone.
+`pheromones_weights` is the row of the caste in the weights matrix of the
+colony - weights of amounts of every pheromone in value of a link for this
+ant. Subclasses only decide what criterion the ant follows, so castes with
+other weights need no new classes.
     """
     def __init__(self, pheromones_weights: tuple[float],
                  pheromone_influence: float = 1.0,
@@ -18,51 +64,69 @@ rivalizing ants.\n
         self.pheromone_influence = pheromone_influence
         self.criterion_influence = criterion_influence
         self.path = list[net.Link]()
+        self.visited = None
+        self.loops_count = 0
+        # Set by the network sending the ant
+        self.random_stream = None
+
+    def start_walk(self, start_node_id: int, nodes_count: int) -> None:
+        self.visited = np.zeros(nodes_count, dtype=bool)
+        self.visited[start_node_id] = True
+
+    def visit(self, node_id: int) -> None:
+        if self.visited[node_id]:
+            self.loops_count += 1
+        self.visited[node_id] = True
+
+    def backtrack(self) -> net.Link:
+        """
+Removes the last link from path of the ant and returns it
+        """
+        return self.path.pop()
 
     def calc_links_attractiveness(self) -> None:
         raise NotImplementedError('This is an instance of an abstract class \
 that does and will not have this method implemented')
 
     def choose_link(self, links_data:
-                    list[tuple[net.Link, float, list[float]]]) -> net.Link:
-        links, results_min_distances_to_dest, pheromones_amounts = [], [], []
+                    list[tuple[net.Link, float, float]]) -> net.Link:
+        last_link_id = self.path[-1].id if len(self.path) > 0 else -1
+        links, results_min_distances_to_dest, pheromones_impacts = [], [], []
         for record in links_data:
-            link, result_min_dist, pheromones_amount = record
-            if len(self.path) > 0 and link == self.path[-1]:
+            link, result_min_dist, pheromones_impact = record
+            if link.id == last_link_id:
                 continue
             links.append(link)
             results_min_distances_to_dest.append(result_min_dist)
-            pheromones_amounts.append(pheromones_amount)
+            pheromones_impacts.append(pheromones_impact)
+        if len(links) == 0:     # Dead-end
+            return None
         thresholds =\
-            self.calc_links_attractiveness(links, pheromones_amounts,
+            self.calc_links_attractiveness(links, pheromones_impacts,
                                            results_min_distances_to_dest)
         max_roll = sum(thresholds)
-        roll = random.uniform(0, max_roll)
+        roll = self.random_stream.random() * max_roll
         walking_sum = 0
         for i in range(len(thresholds)):
             walking_sum += thresholds[i]
             if roll <= walking_sum:
                 self.path.append(links[i])
                 return links[i]
+        # Roll may exceed sum of thresholds due to floating point rounding
+        self.path.append(links[-1])
+        return links[-1]
 
 
 class RivalDistanceAnt(RivalAnt):
     def calc_links_attractiveness(self, links: list[net.Link],
-                                  pheromones_amounts: list[tuple[float]],
+                                  pheromones_impacts: list[float],
                                   target_nodes_min_dest_dist: list[float])\
             -> list[float]:
         links_attractiveness = []
         for i in range(len(links)):
             link = links[i]
-            link_pheromones = pheromones_amounts[i]
+            pheromones_impact = pheromones_impacts[i]
             distance_heuristic = target_nodes_min_dest_dist[i]
-            pheromones_value = 0.0
-            for j in range(len(self.pheromones_weights)):
-                pheromones_value +=\
-                    link_pheromones[j] * self.pheromones_weights[j]
-            pheromones_value = max(self.MIN_PHEROMONE_VALUE, pheromones_value)
-            pheromones_impact =\
-                math.pow(pheromones_value, self.pheromone_influence)
             criterion_impact =\
                 math.pow(1/(link.cost + distance_heuristic),
                          self.criterion_influence)
@@ -83,10 +147,16 @@ class RivalCapacityAnt(RivalAnt):
         self.path_avg_capacity = 0
         self.path_avg_load = 0
         self.path_edges_count = 0
+        self.path_avgs_history = list[tuple[float, float, float]]()
 
     def choose_link(self, links_data:
-                    list[tuple[net.Link, float, list[float]]]) -> net.Link:
+                    list[tuple[net.Link, float, float]]) -> net.Link:
         link = super().choose_link(links_data)
+        if link is None:
+            return None
+        self.path_avgs_history.append((self.path_avg_length,
+                                       self.path_avg_capacity,
+                                       self.path_avg_load))
         self.path_avg_length =\
             (link.cost + self.path_avg_length * self.path_edges_count) / (self.path_edges_count + 1)
         self.path_avg_capacity =\
@@ -95,22 +165,20 @@ class RivalCapacityAnt(RivalAnt):
             (link.load + self.path_avg_load * self.path_edges_count) / (self.path_edges_count + 1)
         return link
 
+    def backtrack(self) -> net.Link:
+        self.path_avg_length, self.path_avg_capacity, self.path_avg_load =\
+            self.path_avgs_history.pop()
+        return super().backtrack()
+
     def calc_links_attractiveness(self, links: list[net.Link],
-                                  pheromones_amounts: list[tuple[float]],
+                                  pheromones_impacts: list[float],
                                   target_nodes_min_dest_dist: list[float])\
             -> list[float]:
         links_attractiveness = []
         for i in range(len(links)):
             link = links[i]
-            link_pheromones = pheromones_amounts[i]
+            pheromones_impact = pheromones_impacts[i]
             distance_heuristic = target_nodes_min_dest_dist[i]
-            pheromones_value = 0.0
-            for j in range(len(self.pheromones_weights)):
-                pheromones_value +=\
-                    link_pheromones[j] * self.pheromones_weights[j]
-            pheromones_value = max(self.MIN_PHEROMONE_VALUE, pheromones_value)
-            pheromones_impact =\
-                math.pow(pheromones_value, self.pheromone_influence)
             new_path_link_avg_length =\
                 (link.cost + self.path_avg_length * self.path_edges_count) / (self.path_edges_count + 1)
             new_path_link_avg_capacity =\
@@ -134,43 +202,106 @@ class RivalAntsAlgorithmNetwork(net.Network):
     def __init__(self, nodes_ids: list[str],
                  links_data: list[tuple[str, str, str, float, float]],
                  ant_types_count: int,
-                 pheromone_evaporation_coefficient: float = 0.5) -> None:
-        super().__init__(nodes_ids, links_data)
-        #min_link_cost = min([link.cost for link in self.links])
-        for i in range(len(self.links)):
-            #self.links[i].cost /= min_link_cost
-            self.links[i].cost = 1
-            self.links[i].load = 0.01 * self.links[i].capacity
+                 pheromone_evaporation_coefficient: float = 0.5,
+                 max_path_length: int = None, tabu_walk: bool = False,
+                 erase_loops: bool = False, rng=None,
+                 deposit: int = DEPOSIT_ALL, rank_count: int = 3,
+                 local_search: bool = False,
+                 links_costs: list[float] = None) -> None:
+        """
+Costs of links in `links_data` are replaced with `links_costs`, 1 for every
+link if it is None.\n
+Ants draw random numbers from `random_stream` seeded with `rng`, anything
+accepted by `numpy.random.default_rng`.\n
+`deposit` is the default pheromone deposit strategy of runs, `rank_count` -
+number of best sets of paths of a generation leaving pheromone in
+`DEPOSIT_RANK` strategy.\n
+If `local_search` is set, runs of two ants return the better of the best
+pair of paths found during exploration and the final pair, improved by
+`PairLocalSearch`.\n
+Walks of ants end after `max_path_length` steps, they are not bounded if it
+is None. If `tabu_walk` is set, ants do not enter nodes they already
+visited and backtrack from nodes with no unvisited neighbours. If
+`erase_loops` is set, loops are removed from paths of ants before
+pheromones are left on them and before they are returned.
+        """
+        if links_costs is None:
+            links_costs = [1] * len(links_data)
+        super().__init__(nodes_ids, [
+            (link_id, end1_id, end2_id, capacity, link_cost)
+            for (link_id, end1_id, end2_id, capacity, _), link_cost
+            in zip(links_data, links_costs)])
+        self.loads[:] = 0.01 * self.capacities()
+        self.links_int_ids = {link_str_id: link_id for link_id, link_str_id
+                              in enumerate(self.links_ids_map)}
         self.pheromones_amounts =\
             np.ones((ant_types_count, len(self.links)))
         self.pheromone_evaporation_coefficient =\
             pheromone_evaporation_coefficient
-        self.minimal_nodes_distances = np.asarray(self.nodes_min_distance())
+        # Rows of distances towards destinations, computed when first needed
+        more_than_longest_path =\
+            max([link.cost for link in self.links]) * len(self.links) + 1
+        self.heuristics = HeuristicCache(self,
+                                         unreachable=more_than_longest_path)
+        self.unreachable_distance = more_than_longest_path
+        self.minimal_nodes_distances = self.heuristics.rows(METRIC_COST)
+        self.max_path_length = max_path_length
+        self.walk_attempts = 10
+        self.random_stream = RandomStream(rng)
+        self.pareto_archive = None
+        self.tabu_walk = tabu_walk
+        self.erase_loops = erase_loops
+        # Statistics of all walks, including backtracking steps
+        self.walks_count = 0
+        self.walks_steps_count = 0
+        self.deposit = deposit
+        self.rank_count = rank_count
+        # Cost of the best set of paths after each generation of the last run
+        self.best_costs = list[float]()
+        # (cost, paths) of the best set of paths of the last run
+        self.best_paths = None
+        self.local_search = None
+        if local_search:
+            self.local_search = PairLocalSearch(self)
 
     def rival_ants_algorithm(self, start_id: str, destination_id: str,
                              ants_originals: list[RivalAnt], cost_func,
                              ants_per_generation: int = 5,
-                             generations_number: int = 100)\
+                             generations_number: int = 100, rng=None,
+                             pareto_archive: ParetoArchive = None,
+                             deposit: int = None)\
             -> list[list[str]]:
         """
 `ants_per_generation` copies of each `RivalAnt` in `ants_originals`,
 will be sent to explore graph and leave pheromone, in each of
 `generation_number` generations.\n
 After that one copy of each `RivalAnt` in `ants_originals`
-will be sent and their paths will be returned.\n
+will be sent and their paths will be returned, or None if any of them
+could not reach destination.\n
 All paths are returned in order corresponding to `RivalAnts`
 in `ants_originals`.\n
 `cost_func` needs to be a callable with arguments of types
 `list[list[network.Link]]` - paths generated by ants; and `int` - number of all
 links in network; calculating cost of each set of paths assuming that their
-order in list argument corresponds to order of `RivalAnts` in `ants_originals`
+order in list argument corresponds to order of `RivalAnts` in `ants_originals`\n
+If `rng` is given, `random_stream` is seeded with it before the run.\n
+If `pareto_archive` is given, every set of paths found during the run is
+offered to it with objectives calculated by `pareto_objectives`, as lists
+of ids of links.\n
+`deposit` strategy overrides the default one of the network for this run.
         """
+        if rng is not None:
+            self.random_stream = RandomStream(rng)
+        self.pareto_archive = pareto_archive
         self.reset_pheromones()
         start = self.get_node_by_id(start_id)
         destination = self.get_node_by_id(destination_id)
         self.explore(start, destination, ants_originals, cost_func,
-                     ants_per_generation, generations_number)
+                     ants_per_generation, generations_number,
+                     self.deposit if deposit is None else deposit)
         paths = self.get_paths(start, destination, ants_originals)
+        if self.local_search is not None and len(ants_originals) == 2:
+            paths = self.improve_paths(paths, start, cost_func)
         return paths
 
     def get_node_by_id(self, id: str):
@@ -191,141 +322,367 @@ order in list argument corresponds to order of `RivalAnts` in `ants_originals`
     def explore(self, start: net.Node, destination: net.Node,
                 ants_originals: list[RivalAnt], cost_func,
                 ants_per_generation: int = 5,
-                generations_number: int = 100) -> None:
+                generations_number: int = 100,
+                deposit: int = DEPOSIT_ALL) -> None:
         """
 `ants_per_generation` copies of each `RivalAnt` in `ants_originals`,
 will be sent to explore graph and leave pheromone, in each of
-`generation_number` generations.
+`generation_number` generations, according to `deposit` strategy.
         """
         added_pheromones = np.zeros(self.pheromones_amounts.shape)
+        best = None
+        self.best_costs = []
         for _ in range(generations_number):
+            pheromones_impacts = self.pheromones_impacts(ants_originals)
+            generation = []
             for _ in range(ants_per_generation):
                 paths = []
-                for ant in ants_originals:
+                for ant, impacts in zip(ants_originals, pheromones_impacts):
                     new_ant = deepcopy(ant)
-                    paths.append(self.send_ant(new_ant, start, destination))
-                alloted_pheromones = self.allot_pheromones(paths, cost_func)
-                np.add(added_pheromones, alloted_pheromones,
-                       out=added_pheromones)
+                    paths.append(self.send_ant(new_ant, start, destination,
+                                               impacts))
+                if None in paths:
+                    continue
+                if self.erase_loops:
+                    paths = [erase_loops(path, start.id) for path in paths]
+                if self.pareto_archive is not None:
+                    self.archive_paths(paths)
+                generation.append((cost_func(paths, len(self.links)), paths))
+            generation.sort(key=lambda paths_set: paths_set[0])
+            if generation and (best is None or generation[0][0] < best[0]):
+                best = generation[0]
+            self.update_pheromones(deposit, generation, best,
+                                   added_pheromones)
+            self.best_costs.append(float('inf') if best is None else best[0])
+        self.best_paths = best
+
+    def update_pheromones(self, deposit: int,
+                          generation: list[tuple[float, list[list[net.Link]]]],
+                          best: tuple[float, list[list[net.Link]]],
+                          added_pheromones: np.ndarray) -> None:
+        """
+Leaves pheromones after a generation, `generation` being (cost, paths) of
+all its sets of paths sorted by cost and `best` - the best one of the run:\n
+`DEPOSIT_ALL` - every set leaves `1/cost`, and all that was left during the
+run is added again each generation,\n
+`DEPOSIT_GLOBAL_BEST` - pheromones evaporate and only the best set of the
+run leaves `1/cost`,\n
+`DEPOSIT_RANK` - pheromones evaporate, `rank_count` best sets of the
+generation leave `1/cost` times `rank_count` minus their rank, and the best
+set of the run times `rank_count`,\n
+`DEPOSIT_MMAS` - pheromones evaporate, the best set of the generation
+leaves `1/cost` and amounts are clamped between `tau_max = 1/(evaporation
+coefficient * best cost)` and `tau_max / (2 * number of links)`.\n
+Costs are floored at `MIN_DEPOSIT_COST`. Strategies other than
+`DEPOSIT_ALL` need evaporation coefficient in (0, 1].
+        """
+        if deposit == DEPOSIT_ALL:
+            np.add(added_pheromones,
+                   self.deposit_pheromones(generation, [1] * len(generation)),
+                   out=added_pheromones)
             np.add(self.pheromones_amounts, added_pheromones,
                    out=self.pheromones_amounts)
+            return
+        if deposit not in (DEPOSIT_GLOBAL_BEST, DEPOSIT_RANK, DEPOSIT_MMAS):
+            raise ValueError(f'unknown deposit strategy {deposit}')
+        if not 0 < self.pheromone_evaporation_coefficient <= 1:
+            raise ValueError(
+                f'evaporation coefficient has to be in (0, 1], not '
+                f'{self.pheromone_evaporation_coefficient}')
+        if best is None:
+            return
+
+        self.pheromones_amounts *= 1 - self.pheromone_evaporation_coefficient
+        if deposit == DEPOSIT_GLOBAL_BEST:
+            sets, weights = [best], [1]
+        elif deposit == DEPOSIT_RANK:
+            sets = generation[:self.rank_count] + [best]
+            weights = [self.rank_count - rank
+                       for rank in range(len(sets) - 1)] + [self.rank_count]
+        else:
+            sets, weights = generation[:1], [1]
+        np.add(self.pheromones_amounts,
+               self.deposit_pheromones(sets, weights),
+               out=self.pheromones_amounts)
+        if deposit == DEPOSIT_MMAS:
+            tau_max = 1 / (self.pheromone_evaporation_coefficient *
+                           max(best[0], MIN_DEPOSIT_COST))
+            np.clip(self.pheromones_amounts,
+                    tau_max / (2 * len(self.links)), tau_max,
+                    out=self.pheromones_amounts)
+
+    def deposit_pheromones(
+            self, sets: list[tuple[float, list[list[net.Link]]]],
+            weights: list[float]) -> np.ndarray:
+        """
+Returns pheromones left by (cost, paths) `sets`, `weight / cost` on every
+link of every path for the type of the ant that walked it, added in one
+scatter over arrays of ids of links. Costs are floored at `MIN_DEPOSIT_COST`
+        """
+        rows, links_ids, amounts = [], [], []
+        for (cost, paths), weight in zip(sets, weights):
+            for ant_type, path in enumerate(paths):
+                path_links_ids = np.unique(np.asarray(
+                    [link.id for link in path], dtype=np.int64))
+                rows.append(np.full(len(path_links_ids), ant_type))
+                links_ids.append(path_links_ids)
+                amounts.append(np.full(len(path_links_ids),
+                                       weight / max(cost, MIN_DEPOSIT_COST)))
+        deposited = np.zeros_like(self.pheromones_amounts)
+        if rows:
+            np.add.at(deposited,
+                      (np.concatenate(rows), np.concatenate(links_ids)),
+                      np.concatenate(amounts))
+        return deposited
 
     def get_paths(self, start: net.Node, destination: net.Node,
                   ants_originals: list[RivalAnt]) -> list[list[str]]:
         """
 One copy of each `RivalAnt` in `ants_originals` will be sent and their paths
-will be returned.
+will be returned.\n
+Copy that fails to reach destination is sent again, up to `walk_attempts`
+times. If all of them fail, None is returned.
         """
         paths = []
-        for ant in ants_originals:
-            new_ant = deepcopy(ant)
-            path = self.send_ant(new_ant, start, destination)
-            path = [self.links_ids_map[link.id] for link in path]
+        pheromones_impacts = self.pheromones_impacts(ants_originals)
+        for ant, impacts in zip(ants_originals, pheromones_impacts):
+            path = None
+            for _ in range(self.walk_attempts):
+                new_ant = deepcopy(ant)
+                path = self.send_ant(new_ant, start, destination, impacts)
+                if path is not None:
+                    break
+            if path is None:
+                return None
+            if self.erase_loops:
+                path = erase_loops(path, start.id)
             paths.append(path)
-        return paths
+        if self.pareto_archive is not None:
+            self.archive_paths(paths)
+        return [[self.links_ids_map[link.id] for link in path]
+                for path in paths]
+
+    def improve_paths(self, paths: list[list[str]], start: net.Node,
+                      cost_func) -> list[list[str]]:
+        """
+Returns the better of `paths` and the best paths found during exploration,
+after improving it with `local_search`. The improvement is kept only if
+`cost_func` confirms it
+        """
+        candidates = []
+        if paths is not None:
+            links_paths = [[self.links[self.links_int_ids[link_str_id]]
+                            for link_str_id in path] for path in paths]
+            links_paths = [erase_loops(path, start.id)
+                           for path in links_paths]
+            candidates.append((cost_func(links_paths, len(self.links)),
+                               links_paths))
+        if self.best_paths is not None:
+            best_cost, best_paths = self.best_paths
+            candidates.append((best_cost, [erase_loops(path, start.id)
+                                           for path in best_paths]))
+        if not candidates:
+            return None
+        cost, best_paths = min(candidates, key=lambda candidate: candidate[0])
+        improved_paths = self.local_search.improve(best_paths, start.id)
+        if cost_func(improved_paths, len(self.links)) < cost:
+            best_paths = improved_paths
+        return [[self.links_ids_map[link.id] for link in path]
+                for path in best_paths]
+
+    def archive_paths(self, paths: list[list[net.Link]]) -> None:
+        self.pareto_archive.add(
+            *pareto_objectives(paths),
+            [[self.links_ids_map[link.id] for link in path] for path in paths])
+
+    def pheromones_impacts(self, ants: list[RivalAnt]) -> list[list[float]]:
+        """
+Returns impact of pheromones on attractiveness of every link for each of
+`ants`, all computed with one product of the weights matrix - rows of
+`pheromones_weights` of the ants - and `pheromones_amounts`. Values lower
+than `MIN_PHEROMONE_VALUE` are raised to it, and then to the power of
+`pheromone_influence` of the ant
+        """
+        weights = np.asarray([ant.pheromones_weights for ant in ants],
+                             dtype=float)
+        influences = np.asarray([ant.pheromone_influence for ant in ants],
+                                dtype=float)
+        values = np.maximum(weights @ self.pheromones_amounts,
+                            RivalAnt.MIN_PHEROMONE_VALUE)
+        return np.power(values, influences[:, None]).tolist()
 
     def send_ant(self, ant: RivalAnt, start_node: net.Node,
-                 destination_node: net.Node) -> list[net.Link]:
-        current_node = start_node
-        while current_node != destination_node:
+                 destination_node: net.Node,
+                 pheromones_impacts: list[float] = None) -> list[net.Link]:
+        """
+Walks `ant` from `start_node` to `destination_node`, comparing nodes by
+their numerical ids and marking them as visited by the ant.\n
+`pheromones_impacts` of links for the ant are calculated if not given.\n
+Returns path of the ant, or None if it reached a dead-end or did not reach
+destination in `max_path_length` steps. Without that bound walks end at
+once if there is no path to destination.\n
+In `tabu_walk` mode links to visited nodes are not available and a dead-end
+makes the ant step back, unless it is at `start_node`.
+        """
+        self.walks_count += 1
+        ant.random_stream = self.random_stream
+        if pheromones_impacts is None:
+            pheromones_impacts = self.pheromones_impacts([ant])[0]
+        mask = self.link_mask
+        destination_id = destination_node.id
+        current_id = start_node.id
+        destination_min_distances =\
+            self.minimal_nodes_distances[destination_id]
+        ant.start_walk(current_id, len(self.nodes))
+        # Walks without a bound would never end
+        if self.max_path_length is None and\
+                destination_min_distances[current_id] >=\
+                self.unreachable_distance:
+            return None
+        steps = count() if self.max_path_length is None else\
+            range(self.max_path_length)
+        for step in steps:
+            if current_id == destination_id:
+                self.walks_steps_count += step
+                return ant.path
             # links_data =\
-            #   [(link available from current_node, min distance between node
+            #   [(link available from current node, min distance between node
             #     at the other end of this link and destination_node,
-            #     pheromone amounts for all ant types on this link)]
+            #     impact of pheromones on this link for the ant)]
             links_data = []
-            for link_id in current_node.links:
+            for link_id in self.nodes[current_id].links:
+                if mask is not None and not mask[link_id]:
+                    continue
                 available_link = self.links[link_id]
-                other_end_id = available_link.get_other_end(current_node.id)
-                other_end_destination_min_distance =\
-                    self.minimal_nodes_distances[destination_node.id][other_end_id]
-                pheromones_amounts = self.pheromones_amounts[:, link_id]
+                other_end_id = available_link.get_other_end(current_id)
+                if self.tabu_walk and ant.visited[other_end_id]:
+                    continue
                 links_data.append((available_link,
-                                   other_end_destination_min_distance,
-                                   pheromones_amounts))
+                                   destination_min_distances[other_end_id],
+                                   pheromones_impacts[link_id]))
             link = ant.choose_link(links_data)
-            current_node = self.nodes[link.get_other_end(current_node.id)]
-        return ant.path
+            if link is None:
+                if not self.tabu_walk or len(ant.path) == 0:
+                    self.walks_steps_count += step
+                    return None
+                link = ant.backtrack()
+                current_id = link.get_other_end(current_id)
+                continue
+            current_id = link.get_other_end(current_id)
+            ant.visit(current_id)
+        self.walks_steps_count += self.max_path_length
+        if current_id == destination_id:
+            return ant.path
+        return None
 
-    def allot_pheromones(self, paths: list[list[net.Link]],
-                         cost_func) -> list[list[float]]:
-        alloted_pheromone = np.zeros_like(self.pheromones_amounts)
-        cost = cost_func(paths, len(self.links))
-        for i in range(len(paths)):
-            for link in paths[i]:
-                alloted_pheromone[i][link.id] = 1/cost
-        return alloted_pheromone
+    def average_walk_steps(self) -> float:
+        if self.walks_count == 0:
+            return 0.0
+        return self.walks_steps_count / self.walks_count
 
 
-def cost_func(paths: list[list[net.Link]], all_links_count: int,
-              distance_weight: float = 5, capacity_weight: float = 5) -> float:
-    present_in_paths = []
-    for _ in range(all_links_count):
-        present_in_paths.append([False] * len(paths))
+def erase_loops(path: list[net.Link], start_id: int) -> list[net.Link]:
+    """
+Returns `path` starting at node with `start_id` id, with every loop removed
+in the order they were closed
+    """
+    loop_free_path = []
+    # nodes_ids[i] is the node reached after i links of loop_free_path
+    nodes_ids = [start_id]
+    nodes_positions = {start_id: 0}
+    for link in path:
+        node_id = link.get_other_end(nodes_ids[-1])
+        if node_id in nodes_positions:
+            position = nodes_positions[node_id]
+            for removed_node_id in nodes_ids[position + 1:]:
+                del nodes_positions[removed_node_id]
+            del nodes_ids[position + 1:]
+            del loop_free_path[position:]
+        else:
+            loop_free_path.append(link)
+            nodes_ids.append(node_id)
+            nodes_positions[node_id] = len(loop_free_path)
+    return loop_free_path
+
 
+def pareto_objectives(paths: list[list[net.Link]])\
+        -> tuple[int, float, float]:
+    """
+Returns objectives of a pair of paths minimized separately by `cost_func`:
+number of links shared by both paths, sum of costs of links of the first
+path and sum of `-log10` free capacity fractions of links of the second one
+    """
+    shared = len({link.id for link in paths[0]} &
+                 {link.id for link in paths[1]})
+    distance_cost = sum(link.cost for link in paths[0])
+    capacity_cost = sum(link.get_a_star_cost() for link in paths[1])
+    return shared, distance_cost, capacity_cost
+
+
+def cost_func(paths: list[list[net.Link]], all_links_count: int,
+              distance_weight: float = 5, capacity_weight: float = 5,
+              conflict_index=None, ends_mask: np.ndarray = None) -> float:
+    """
+Cost of a set of paths, lower is better. First path is the distance path,
+all other ones are capacity paths, valued by the average of their free
+capacity fractions. Every pair of paths is penalized for each link they
+share, or, if `conflict_index` is given, for each element it counts as
+shared other than ones outside of `ends_mask`
+    """
     distance_path_cost = 0.0
-    capacity_path_cost = 1
     for link in paths[0]:
-        present_in_paths[link.id][0] = True
         distance_path_cost += link.cost
-    for link in paths[1]:
-        present_in_paths[link.id][1] = True
-        capacity_path_cost *= (link.capacity - link.load)/link.capacity
-    common_edges_count = present_in_paths.count([True, True])
+    capacity_path_cost = 0.0
+    for path in paths[1:]:
+        free_fraction = 1
+        for link in path:
+            free_fraction *= (link.capacity - link.load)/link.capacity
+        capacity_path_cost += free_fraction / (len(paths) - 1)
+
+    paths_links_ids = [[link.id for link in path] for path in paths]
+    if conflict_index is None:
+        # Number of paths using each link, every path counted once
+        counts = np.zeros(all_links_count, dtype=np.int64)
+        for links_ids in paths_links_ids:
+            counts[np.unique(links_ids).astype(np.int64)] += 1
+        common_edges_count = int((counts * (counts - 1) // 2).sum())
+    else:
+        common_edges_count = sum(
+            conflict_index.count(paths_links_ids[i], paths_links_ids[j],
+                                 ends_mask)
+            for i in range(len(paths)) for j in range(i + 1, len(paths)))
 
     return (capacity_weight + distance_weight) * (common_edges_count + 1) -\
         (distance_weight / distance_path_cost) -\
         (capacity_weight * capacity_path_cost)
 
 
+def create_castes(pheromones_weights: np.ndarray, ants_types: list[type],
+                  pheromone_influence: float = 1.0,
+                  criterion_influence: float = 1.0) -> list[RivalAnt]:
+    """
+Returns ants of a colony with one caste for every row of square matrix
+`pheromones_weights`, following criterion of the corresponding class in
+`ants_types`, e.g. `[RivalDistanceAnt, RivalCapacityAnt, RivalCapacityAnt]`
+for a distance path and two protection paths. Influences can be given for
+all castes at once or as sequences
+    """
+    castes_count = len(ants_types)
+    if np.shape(pheromones_weights) != (castes_count, castes_count):
+        raise ValueError('pheromones weights need a row and a column for '
+                         'every caste')
+    pheromone_influences = np.broadcast_to(pheromone_influence,
+                                           castes_count).tolist()
+    criterion_influences = np.broadcast_to(criterion_influence,
+                                           castes_count).tolist()
+    return [ant_type(tuple(weights), pheromone_influences[i],
+                     criterion_influences[i])
+            for i, (ant_type, weights)
+            in enumerate(zip(ants_types, np.asarray(pheromones_weights,
+                                                    dtype=float).tolist()))]
+
+
 if __name__ == '__main__':
-    import logging
-    import random
-    # distance ants: love towards capacity ants, pheromone influence, criterion influence;
-    # capacity ants: love towards distance ants, pheromone influence, criterion influence
-    params = (-0.9, 1, 3, -0.9, 1, 45)
-    logging.basicConfig(filename='rival_ants.log', format='%(levelname)s - %(message)s')
-
-    nodes_data, links_data = net.parse_xml('data/network_structure.xml')
-    test_network = RivalAntsAlgorithmNetwork(nodes_data, links_data, 2)
-
-    for i in range(1000):
-        new_dist_cap_love = random.normalvariate(params[0], 0.25)
-        new_dist_pheromone = random.normalvariate(params[1], 1)
-        new_dist_criterion = random.normalvariate(params[2], 1)
-        new_cap_dist_love = random.normalvariate(params[3], 0.25)
-        new_cap_pheromone = random.normalvariate(params[4], 1)
-        new_cap_criterion = random.normalvariate(params[5], 1)
-
-        if(new_dist_cap_love >= 0):
-            new_dist_cap_love = params[0]
-        if(new_dist_pheromone < 0):
-            new_dist_pheromone = params[1]
-        if(new_dist_criterion < 0):
-            new_dist_criterion = params[2]
-        if(new_cap_dist_love >= 0):
-            new_cap_dist_love = params[3]
-        if(new_cap_pheromone < 0):
-            new_cap_pheromone = params[4]
-        if(new_cap_criterion < 0):
-            new_cap_criterion = params[5]
-
-        params = (new_dist_cap_love, new_dist_pheromone, new_dist_criterion,
-                  new_cap_dist_love, new_cap_pheromone, new_cap_criterion)
-        summary = [[], [], []]
-        logging.critical(params)
-        for i in range(10):
-            paths =\
-                test_network.rival_ants_algorithm('Aachen', 'Passau',
-                                                  [(RivalDistanceAnt((1, params[0]), params[1], params[2])),
-                                                   (RivalCapacityAnt((params[3], 1), params[4], params[5]))],
-                                                  cost_func, 5, 25)
-
-            summary[0].append(len(paths[0]))
-            summary[1].append(len(paths[1]))
-            summary[2].append(len(set(paths[0]) & set(paths[1])))
-            logging.error(f'shortest distance path {len(paths[0])} edges, \
-lowest load path {len(paths[1])} edges, \
-common edges count {len(set(paths[0]) & set(paths[1]))}')
-        logging.error(f'shortest distance path {sum(summary[0])/len(summary[0]):.2f} edges on average, \
-lowest load path {sum(summary[1])/len(summary[1]):.2f} edges on average, \
-common edges count {sum(summary[2])/len(summary[2]):.2f} on average')
+    # Tuning of parameters of both types of ants, see tuning.py for options
+    import tuning
+    tuning.main()
@@ -0,0 +1,249 @@
+import ant
+import numpy as np
+import unittest
+
+
+def create_test_network(**kwargs) -> ant.RivalAntsAlgorithmNetwork:
+    nodes_ids = ['A', 'B', 'C', 'D']
+    links_data = [('L1', 'A', 'B', 10.0, 1.0),
+                  ('L2', 'B', 'C', 10.0, 1.0),
+                  ('L3', 'C', 'A', 10.0, 1.0),
+                  ('L4', 'C', 'D', 10.0, 1.0)]
+    return ant.RivalAntsAlgorithmNetwork(nodes_ids, links_data, 2, **kwargs)
+
+
+class TestSendAnt(unittest.TestCase):
+
+    def test_reaches_destination(self):
+        test_network = create_test_network()
+        test_ant = ant.RivalDistanceAnt((1, -0.9))
+
+        path = test_network.send_ant(test_ant, test_network.nodes[0],
+                                     test_network.nodes[3])
+
+        self.assertIsNotNone(path)
+        self.assertEqual(path[-1].id, 3)
+        self.assertTrue(test_ant.visited[3])
+
+    def test_dead_end(self):
+        test_network = create_test_network()
+        test_network.link_mask = np.asarray([True, False, False, True])
+        test_ant = ant.RivalDistanceAnt((1, -0.9))
+
+        path = test_network.send_ant(test_ant, test_network.nodes[0],
+                                     test_network.nodes[3])
+
+        self.assertIsNone(path)
+
+    def test_max_path_length(self):
+        test_network = create_test_network(max_path_length=7)
+        test_network.link_mask = np.asarray([True, True, True, False])
+        test_ant = ant.RivalDistanceAnt((1, -0.9))
+
+        path = test_network.send_ant(test_ant, test_network.nodes[0],
+                                     test_network.nodes[3])
+
+        self.assertIsNone(path)
+        self.assertEqual(len(test_ant.path), 7)
+        self.assertEqual(test_ant.loops_count, 5)
+
+    def test_rival_ants_algorithm_unreachable_destination(self):
+        test_network = create_test_network()
+        test_network.link_mask = np.asarray([True, True, True, False])
+
+        paths = test_network.rival_ants_algorithm(
+            'A', 'D', [ant.RivalDistanceAnt((1, -0.9)),
+                       ant.RivalCapacityAnt((-0.9, 1))],
+            ant.cost_func, generations_number=2)
+
+        self.assertIsNone(paths)
+
+    def test_tabu_walk_backtracks(self):
+        nodes_ids = ['A', 'B', 'C', 'D', 'E']
+        links_data = [('L1', 'A', 'B', 10.0, 1.0),
+                      ('L2', 'B', 'C', 10.0, 1.0),
+                      ('L3', 'A', 'D', 10.0, 1.0),
+                      ('L4', 'D', 'E', 10.0, 1.0)]
+        test_network = ant.RivalAntsAlgorithmNetwork(
+            nodes_ids, links_data, 2, max_path_length=6, tabu_walk=True)
+
+        for _ in range(20):
+            test_ant = ant.RivalCapacityAnt((-0.9, 1))
+            path = test_network.send_ant(test_ant, test_network.nodes[0],
+                                         test_network.nodes[4])
+            self.assertListEqual([link.id for link in path], [2, 3])
+            self.assertEqual(test_ant.loops_count, 0)
+            self.assertEqual(len(test_ant.path_avgs_history), 2)
+
+    def test_erase_loops(self):
+        test_network = create_test_network()
+        links = test_network.links
+        # A -> B -> C -> A -> B -> C -> D
+        path = [links[0], links[1], links[2], links[0], links[1], links[3]]
+
+        self.assertListEqual(ant.erase_loops(path, 0),
+                             [links[0], links[1], links[3]])
+        # A -> C -> B -> A -> C -> D
+        path = [links[2], links[1], links[0], links[2], links[3]]
+        self.assertListEqual(ant.erase_loops(path, 0),
+                             [links[2], links[3]])
+        self.assertListEqual(ant.erase_loops([], 0), [])
+
+
+class TestRandomStream(unittest.TestCase):
+
+    def test_seeded_streams_repeat(self):
+        stream1 = ant.RandomStream(7, block_size=3)
+        stream2 = ant.RandomStream(7, block_size=5)
+
+        values = [stream1.random() for _ in range(10)]
+
+        self.assertListEqual(values, [stream2.random() for _ in range(10)])
+        for value in values:
+            self.assertTrue(0 <= value < 1)
+
+    def test_spawned_streams_differ(self):
+        child1, child2 = ant.RandomStream(7).spawn(2)
+        self.assertNotEqual([child1.random() for _ in range(5)],
+                            [child2.random() for _ in range(5)])
+
+    def test_seeded_colony_repeats(self):
+        test_network = create_test_network(max_path_length=1000)
+        ants_originals = [ant.RivalDistanceAnt((1, -0.9)),
+                          ant.RivalCapacityAnt((-0.9, 1))]
+
+        paths = [test_network.rival_ants_algorithm(
+                    'B', 'D', ants_originals, ant.cost_func,
+                    generations_number=3, rng=11)
+                 for _ in range(2)]
+
+        self.assertListEqual(paths[0], paths[1])
+
+
+class TestCastes(unittest.TestCase):
+
+    def test_pheromones_impacts(self):
+        test_network = create_test_network()
+        test_network.pheromones_amounts = np.asarray([[1.0, 2.0, 0.5, 0.0],
+                                                      [3.0, 0.0, 1.0, 0.2]])
+        ants_originals = [ant.RivalDistanceAnt((1, -0.5), 2.0),
+                          ant.RivalCapacityAnt((-0.5, 1))]
+
+        impacts = test_network.pheromones_impacts(ants_originals)
+
+        np.testing.assert_allclose(impacts, [[0.01 ** 2, 4.0, 0.01 ** 2, 0.01 ** 2],
+                                             [2.5, 0.01, 0.75, 0.2]])
+
+    def test_create_castes(self):
+        weights = [[1, -0.5, -0.5], [-0.5, 1, -0.5], [-0.5, -0.5, 1]]
+        castes = ant.create_castes(
+            weights, [ant.RivalDistanceAnt, ant.RivalCapacityAnt,
+                      ant.RivalCapacityAnt], criterion_influence=(1, 3, 3))
+
+        self.assertListEqual([type(caste) for caste in castes],
+                             [ant.RivalDistanceAnt, ant.RivalCapacityAnt,
+                              ant.RivalCapacityAnt])
+        self.assertTupleEqual(castes[2].pheromones_weights, (-0.5, -0.5, 1))
+        self.assertListEqual([caste.criterion_influence for caste in castes],
+                             [1, 3, 3])
+        with self.assertRaises(ValueError):
+            ant.create_castes(weights, [ant.RivalDistanceAnt])
+
+    def test_three_paths(self):
+        nodes_ids = ['A', 'B', 'C', 'D', 'E']
+        links_data = [('L1', 'A', 'B', 10.0, 1.0),
+                      ('L2', 'B', 'E', 10.0, 1.0),
+                      ('L3', 'A', 'C', 10.0, 1.0),
+                      ('L4', 'C', 'E', 10.0, 1.0),
+                      ('L5', 'A', 'D', 10.0, 1.0),
+                      ('L6', 'D', 'E', 10.0, 1.0)]
+        test_network = ant.RivalAntsAlgorithmNetwork(
+            nodes_ids, links_data, 3, tabu_walk=True, rng=5)
+        castes = ant.create_castes(
+            [[1, -0.9, -0.9], [-0.9, 1, -0.9], [-0.9, -0.9, 1]],
+            [ant.RivalDistanceAnt, ant.RivalCapacityAnt,
+             ant.RivalCapacityAnt])
+
+        paths = test_network.rival_ants_algorithm(
+            'A', 'E', castes, ant.cost_func, generations_number=5)
+
+        self.assertEqual(len(paths), 3)
+        for path in paths:
+            self.assertEqual(len(path), 2)
+
+    def test_cost_func_counts_every_pair(self):
+        test_network = create_test_network()
+        links = test_network.links
+        two_paths = [[links[0], links[1]], [links[0], links[3]]]
+        three_paths = two_paths + [[links[0], links[1]]]
+
+        self.assertAlmostEqual(ant.cost_func(two_paths, len(links)),
+                               10 * 2 - 5 / 2 - 5 * 0.99 ** 2)
+        # Link 0 is shared by 3 pairs, link 1 by one pair
+        self.assertAlmostEqual(ant.cost_func(three_paths, len(links)),
+                               10 * 5 - 5 / 2 - 5 * 0.99 ** 2)
+
+
+class TestDeposit(unittest.TestCase):
+
+    def test_deposit_pheromones(self):
+        test_network = create_test_network()
+        links = test_network.links
+        sets = [(2.0, [[links[0], links[1], links[0]], [links[3]]]),
+                (4.0, [[links[0]], [links[2]]])]
+
+        deposited = test_network.deposit_pheromones(sets, [2, 1])
+
+        np.testing.assert_allclose(deposited, [[1.25, 1.0, 0, 0],
+                                               [0, 0, 0.25, 1.0]])
+
+    def test_strategies(self):
+        ants_originals = [ant.RivalDistanceAnt((1, -0.9)),
+                          ant.RivalCapacityAnt((-0.9, 1))]
+        for deposit in (ant.DEPOSIT_ALL, ant.DEPOSIT_GLOBAL_BEST,
+                        ant.DEPOSIT_RANK, ant.DEPOSIT_MMAS):
+            test_network = create_test_network(tabu_walk=True)
+
+            paths = test_network.rival_ants_algorithm(
+                'B', 'D', ants_originals, ant.cost_func,
+                generations_number=4, rng=3, deposit=deposit)
+
+            self.assertIsNotNone(paths)
+            self.assertEqual(len(test_network.best_costs), 4)
+            self.assertListEqual(test_network.best_costs,
+                                 sorted(test_network.best_costs,
+                                        reverse=True))
+            if deposit == ant.DEPOSIT_MMAS:
+                tau_max = 1 / (0.5 * test_network.best_costs[-1])
+                self.assertLessEqual(test_network.pheromones_amounts.max(),
+                                     tau_max + 1e-12)
+                self.assertGreaterEqual(test_network.pheromones_amounts.min(),
+                                        tau_max / 8 - 1e-12)
+
+        with self.assertRaises(ValueError):
+            test_network.rival_ants_algorithm(
+                'B', 'D', ants_originals, ant.cost_func,
+                generations_number=1, deposit=0)
+
+    def test_mmas_non_positive_costs(self):
+        ants_originals = [ant.RivalDistanceAnt((1, -0.9)),
+                          ant.RivalCapacityAnt((-0.9, 1))]
+
+        def negative_cost_func(paths, all_links_count):
+            return ant.cost_func(paths, all_links_count) - 100
+
+        test_network = create_test_network(tabu_walk=True)
+        test_network.rival_ants_algorithm(
+            'B', 'D', ants_originals, negative_cost_func,
+            generations_number=3, rng=3, deposit=ant.DEPOSIT_MMAS)
+
+        self.assertLess(test_network.best_costs[-1], 0)
+        self.assertTrue(np.all(np.isfinite(test_network.pheromones_amounts)))
+        self.assertGreater(test_network.pheromones_amounts.min(), 0)
+
+        test_network = create_test_network(
+            tabu_walk=True, pheromone_evaporation_coefficient=0)
+        with self.assertRaises(ValueError):
+            test_network.rival_ants_algorithm(
+                'B', 'D', ants_originals, ant.cost_func,
+                generations_number=1, deposit=ant.DEPOSIT_MMAS)
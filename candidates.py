@@ -0,0 +1,250 @@
+from collections import OrderedDict
+from heapq import heappush, heappop
+import numpy as np
+import network as net
+
+METRIC_COST = 1         # Sum of `Link.cost`
+METRIC_HOPS = 2         # Number of links
+METRIC_CAPACITY = 3     # Sum of `Link.get_a_star_cost`, -log10 of free capacity
+
+
+def metric_weights(network: net.Network, metric: int) -> np.ndarray:
+    """
+Returns weights of all links of `network` under `metric`, infinite for
+links hidden by its `link_mask` and, under `METRIC_CAPACITY`, for full links
+    """
+    if metric == METRIC_COST:
+        weights = np.fromiter((link.cost for link in network.links),
+                              dtype=float, count=len(network.links))
+    elif metric == METRIC_HOPS:
+        weights = np.ones(len(network.links))
+    elif metric == METRIC_CAPACITY:
+        capacities = network.capacities()
+        free_fractions = (capacities - network.loads) / capacities
+        weights = np.full(len(network.links), float('inf'))
+        free = free_fractions > 0
+        weights[free] = -np.log10(free_fractions[free])
+    else:
+        raise ValueError(f'unknown metric {metric}')
+    if network.link_mask is not None:
+        weights[~network.link_mask] = float('inf')
+    return weights
+
+
+def shortest_path(network: net.Network, source_id: int, target_id: int,
+                  weights: np.ndarray, removed_links: set[int] = frozenset(),
+                  removed_nodes: set[int] = frozenset())\
+        -> tuple[float, list[int], list[int]]:
+    """
+Dijkstra between nodes with numerical ids, skipping links hidden by
+`link_mask` of the network, `removed_links` and `removed_nodes`.\n
+Returns cost, ids of links and ids of nodes of the path, or None if there
+is no path
+    """
+    mask = network.link_mask
+    costs = {source_id: 0.0}
+    previous = dict[int, tuple[int, int]]()  # node -> (link, previous node)
+    q = [(0.0, source_id)]
+    while q:
+        cost, node_id = heappop(q)
+        if node_id == target_id:
+            break
+        if cost > costs[node_id]:
+            continue
+        for link_id in network.nodes[node_id].links:
+            if link_id in removed_links or\
+                    (mask is not None and not mask[link_id]):
+                continue
+            other_end_id = network.links[link_id].get_other_end(node_id)
+            if other_end_id in removed_nodes:
+                continue
+            new_cost = cost + weights[link_id]
+            if new_cost < costs.get(other_end_id, float('inf')):
+                costs[other_end_id] = new_cost
+                previous[other_end_id] = (link_id, node_id)
+                heappush(q, (new_cost, other_end_id))
+    else:
+        return None
+
+    links_ids = []
+    nodes_ids = [target_id]
+    node_id = target_id
+    while node_id != source_id:
+        link_id, node_id = previous[node_id]
+        links_ids.append(link_id)
+        nodes_ids.append(node_id)
+    links_ids.reverse()
+    nodes_ids.reverse()
+    return costs[target_id], links_ids, nodes_ids
+
+
+def k_shortest_paths(network: net.Network, source_id: int, target_id: int,
+                     k: int, weights: np.ndarray)\
+        -> list[tuple[float, list[int]]]:
+    """
+Yen's algorithm. Returns up to `k` loopless paths between nodes with
+numerical ids, as (cost, ids of links) sorted by cost
+    """
+    first_path = shortest_path(network, source_id, target_id, weights)
+    if first_path is None:
+        return []
+    paths = [first_path]
+    candidates = []
+    seen = {tuple(first_path[1])}
+    while len(paths) < k:
+        _, last_links, last_nodes = paths[-1]
+        for i in range(len(last_links)):
+            root_links = last_links[:i]
+            removed_links = {links[i] for _, links, _ in paths
+                             if len(links) > i and links[:i] == root_links}
+            spur_path = shortest_path(network, last_nodes[i], target_id,
+                                      weights, removed_links,
+                                      set(last_nodes[:i]))
+            if spur_path is None:
+                continue
+            links = root_links + spur_path[1]
+            if tuple(links) in seen:
+                continue
+            seen.add(tuple(links))
+            cost = float(weights[root_links].sum()) + spur_path[0]
+            heappush(candidates, (cost, len(seen), links,
+                                  last_nodes[:i] + spur_path[2]))
+        if not candidates:
+            break
+        cost, _, links, nodes = heappop(candidates)
+        paths.append((cost, links, nodes))
+    return [(cost, links) for cost, links, _ in paths]
+
+
+class CandidatePaths:
+    """
+Candidate paths between two nodes: `paths` (lists of ids of links),
+`incidence` matrix with a row of used links for each of them and values of
+the criterion of `cost_func` they are candidates for - `costs` (sum of
+distance weights) for distance paths and `free_fractions` (product of free
+capacity fractions) for capacity paths, computed from `distance_costs` -
+weights of links under the distance metric of the pool, and
+`capacity_costs` - weights of links under `METRIC_CAPACITY`.
+    """
+    def __init__(self, paths: list[tuple[float, list[int]]],
+                 distance_costs: np.ndarray, capacity_costs: np.ndarray)\
+            -> None:
+        self.paths = [links for _, links in paths]
+        self.incidence = np.zeros((len(paths), len(distance_costs)),
+                                  dtype=np.int32)
+        for row, links in enumerate(self.paths):
+            self.incidence[row, links] = 1
+        # Sums over links of paths only, weights of other links may be
+        # infinite
+        self.costs = np.asarray([distance_costs[links].sum()
+                                 for links in self.paths], dtype=float)
+        self.free_fractions = np.power(
+            10.0, -np.asarray([capacity_costs[links].sum()
+                               for links in self.paths], dtype=float))
+
+
+class CandidatePool:
+    """
+Pools of `k` shortest loopless paths of `network`, used to find pairs of
+paths without exploring the whole space of solutions.\n
+For every demand, distance path candidates are the shortest ones under
+`distance_metric` and capacity path candidates - under `-log10` free
+capacity. The pair with the lowest `ant.cost_func` value, with distance
+measured under `distance_metric`, is chosen by evaluating all k×k pairs at
+once.\n
+Candidates are kept under the token of `net.mask_token` of `link_mask` of
+the network they were found with, so equal masks share them, up to
+`max_size` of them in LRU order. Capacity candidates are also dropped when
+`load_epoch` of the network changes, and so are weights of links under
+every metric, computed once for all demands under the current mask.
+    """
+    def __init__(self, network: net.Network, k: int = 20,
+                 distance_metric: int = METRIC_COST,
+                 distance_weight: float = 5, capacity_weight: float = 5,
+                 max_size: int = 4096) -> None:
+        self.network = network
+        self.k = k
+        self.distance_metric = distance_metric
+        self.distance_weight = distance_weight
+        self.capacity_weight = capacity_weight
+        self.max_size = max_size
+        self.pools = OrderedDict[tuple, CandidatePaths]()
+        self.weights = dict[int, np.ndarray]()
+        self.weights_token = None
+        self.weights_epoch = network.load_epoch
+        self.pools_epoch = network.load_epoch
+
+    def get_candidates(self, source_id: int, target_id: int, metric: int)\
+            -> CandidatePaths:
+        if self.pools_epoch != self.network.load_epoch:
+            for key in [key for key in self.pools
+                        if key[2] == METRIC_CAPACITY]:
+                del self.pools[key]
+            self.pools_epoch = self.network.load_epoch
+
+        key = (source_id, target_id, metric,
+               net.mask_token(self.network.link_mask))
+        candidates = self.pools.get(key)
+        if candidates is not None:
+            self.pools.move_to_end(key)
+            return candidates
+        paths = k_shortest_paths(self.network, source_id, target_id,
+                                 self.k, self.get_weights(metric))
+        candidates = CandidatePaths(paths,
+                                    self.get_weights(self.distance_metric),
+                                    self.get_weights(METRIC_CAPACITY))
+        self.pools[key] = candidates
+        if len(self.pools) > self.max_size:
+            self.pools.popitem(last=False)
+        return candidates
+
+    def get_weights(self, metric: int) -> np.ndarray:
+        token = net.mask_token(self.network.link_mask)
+        if self.weights_token != token:
+            self.weights.clear()
+            self.weights_token = token
+        if self.weights_epoch != self.network.load_epoch:
+            self.weights.pop(METRIC_CAPACITY, None)
+            self.weights_epoch = self.network.load_epoch
+        weights = self.weights.get(metric)
+        if weights is None:
+            weights = metric_weights(self.network, metric)
+            self.weights[metric] = weights
+        return weights
+
+    def best_pair(self, source_id: int, target_id: int) -> list[list[int]]:
+        """
+Returns the best pair of candidate paths between nodes with numerical ids,
+first one - distance path, second - capacity path, or None if there is no
+path between them
+        """
+        pairs = self.best_pairs(source_id, target_id, 1)
+        if not pairs:
+            return None
+        return pairs[0]
+
+    def best_pairs(self, source_id: int, target_id: int, count: int)\
+            -> list[list[list[int]]]:
+        """
+Returns up to `count` best pairs of candidate paths, best first
+        """
+        if source_id == target_id:
+            return [[[], []]]
+        distance_candidates = self.get_candidates(source_id, target_id,
+                                                  self.distance_metric)
+        capacity_candidates = self.get_candidates(source_id, target_id,
+                                                  METRIC_CAPACITY)
+        if len(distance_candidates.paths) == 0:
+            return []
+
+        shared = distance_candidates.incidence @\
+            capacity_candidates.incidence.T
+        weights_sum = self.distance_weight + self.capacity_weight
+        costs = weights_sum * (shared + 1) -\
+            (self.distance_weight / distance_candidates.costs)[:, None] -\
+            (self.capacity_weight * capacity_candidates.free_fractions)[None, :]
+        order = np.argsort(costs, axis=None, kind='stable')[:count]
+        return [[distance_candidates.paths[distance_index],
+                 capacity_candidates.paths[capacity_index]]
+                for distance_index, capacity_index
+                in zip(*np.unravel_index(order, costs.shape))]
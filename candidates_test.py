@@ -0,0 +1,128 @@
+from admission_test import create_test_network
+import candidates
+import network as net
+import numpy as np
+import unittest
+
+
+def simple_paths(network, source_id, target_id):
+    paths = []
+
+    def extend(node_id, links, nodes):
+        if node_id == target_id:
+            paths.append(links)
+            return
+        for link_id in network.nodes[node_id].links:
+            other_end_id = network.links[link_id].get_other_end(node_id)
+            if other_end_id not in nodes:
+                extend(other_end_id, links + [link_id],
+                       nodes | {other_end_id})
+
+    extend(source_id, [], {source_id})
+    return paths
+
+
+class TestKShortestPaths(unittest.TestCase):
+
+    def test_matches_enumeration(self):
+        test_network = create_test_network()
+        # Extra links for more paths: a-c, b-d
+        weights = np.asarray([1.0, 2.0, 1.5, 4.0, 1.0, 0.5, 1.0])
+
+        paths = candidates.k_shortest_paths(test_network, 0, 1, 10, weights)
+
+        expected = sorted(weights[links].sum() for links
+                          in simple_paths(test_network, 0, 1))
+        self.assertListEqual([cost for cost, _ in paths], expected)
+        for cost, links in paths:
+            self.assertAlmostEqual(cost, weights[links].sum())
+        self.assertEqual(len({tuple(links) for _, links in paths}),
+                         len(paths))
+
+    def test_respects_link_mask(self):
+        test_network = create_test_network()
+        test_network.link_mask = np.asarray([True] * 6 + [False])
+
+        paths = candidates.k_shortest_paths(test_network, 0, 1, 10,
+                                            np.ones(7))
+
+        self.assertListEqual([links for _, links in paths],
+                             [[0, 3], [0, 2, 4]])
+
+    def test_no_path(self):
+        test_network = create_test_network()
+        test_network.link_mask = np.asarray([False, False] + [True] * 5)
+
+        self.assertListEqual(
+            candidates.k_shortest_paths(test_network, 0, 1, 3, np.ones(7)),
+            [])
+
+
+class TestCandidatePool(unittest.TestCase):
+
+    def test_best_pair(self):
+        test_network = create_test_network()
+        pool = candidates.CandidatePool(test_network, k=5,
+                                        distance_metric=candidates.METRIC_HOPS,
+                                        distance_weight=1, capacity_weight=1)
+
+        paths = pool.best_pair(0, 1)
+
+        self.assertListEqual(paths, [[1, 5, 6], [0, 2, 4]])
+
+    def test_capacity_candidates_follow_load(self):
+        test_network = create_test_network()
+        pool = candidates.CandidatePool(test_network, k=1)
+
+        self.assertListEqual(pool.best_pair(0, 1)[1], [0, 2, 4])
+        test_network.change_links_load([2], 0.8)
+        self.assertListEqual(pool.best_pair(0, 1)[1], [0, 3])
+
+    def test_full_and_masked_links(self):
+        test_network = create_test_network()
+        test_network.links[2].load = 1.0
+        test_network.link_mask = np.asarray([True] * 6 + [False])
+        pool = candidates.CandidatePool(test_network, k=5)
+
+        weights = candidates.metric_weights(test_network,
+                                            candidates.METRIC_CAPACITY)
+        paths = pool.best_pair(0, 1)
+
+        self.assertTrue(np.isinf(weights[2]))
+        self.assertTrue(np.isinf(weights[6]))
+        self.assertTrue(np.all(np.isfinite(weights[[0, 1, 3, 4, 5]])))
+        # Capacity path avoids the full link
+        self.assertListEqual(paths[1], [0, 3])
+
+    def test_candidates_shared_by_equal_masks(self):
+        test_network = create_test_network()
+        pool = candidates.CandidatePool(test_network, k=5)
+
+        test_network.link_mask = np.asarray([True] * 6 + [False])
+        masked_candidates = pool.get_candidates(0, 1,
+                                                candidates.METRIC_HOPS)
+        test_network.link_mask = None
+        candidates_without_mask = pool.get_candidates(
+            0, 1, candidates.METRIC_HOPS)
+        test_network.link_mask = np.asarray([True] * 6 + [False])
+
+        self.assertIs(pool.get_candidates(0, 1, candidates.METRIC_HOPS),
+                      masked_candidates)
+        self.assertIsNot(candidates_without_mask, masked_candidates)
+        self.assertNotIn([1, 5, 6], masked_candidates.paths)
+
+    def test_distance_scored_under_distance_metric(self):
+        base_network = create_test_network()
+        test_network = net.Network(
+            base_network.get_node_id_str_list(),
+            [link_data[:4] + (1000.0,)
+             for link_data in base_network.get_link_data_list()])
+        pool = candidates.CandidatePool(test_network, k=5,
+                                        distance_metric=candidates.METRIC_HOPS)
+
+        distance_candidates = pool.get_candidates(0, 1,
+                                                  candidates.METRIC_HOPS)
+
+        self.assertListEqual(
+            distance_candidates.costs.tolist(),
+            [float(len(links)) for links in distance_candidates.paths])
@@ -0,0 +1,172 @@
+import time
+
+# Measured from import of this module, interpreter startup is not included
+STARTED = time.perf_counter()
+
+import argparse
+import sys
+
+DEFAULT_NETWORK = 'data/network_structure.xml'
+# Files with this suffix hold networks written by `save_network`
+PICKLE_SUFFIX = '.pickle'
+# Names of algorithms of `routing.Router`, without the `ALG_` prefix
+ALGORITHMS = ('a_star', 'ant_colony', 'k_shortest', 'ida_star', 'beam')
+
+# Heavy modules (NumPy, solvers) are imported only by commands which use them
+
+
+def load_network(path: str):
+    """
+Returns network read from SNDlib XML file or from a file written by
+`save_network`, which skips parsing
+    """
+    if path.endswith(PICKLE_SUFFIX):
+        import pickle
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    import network as net
+    return net.Network(*net.parse_xml(path))
+
+
+def save_network(network, path: str) -> None:
+    import pickle
+    with open(path, 'wb') as file:
+        pickle.dump(network, file, pickle.HIGHEST_PROTOCOL)
+
+
+def get_algorithm(name: str) -> int:
+    import routing
+    return getattr(routing, f'ALG_{name.upper()}')
+
+
+def solve(args: argparse.Namespace) -> None:
+    network = load_network(args.network)
+    loaded = time.perf_counter()
+    from routing import Router
+    router = Router(network, weight_dist=args.weights[0],
+                    weight_cost=args.weights[1])
+    nodes_int_ids = {node_str_id: node_id for node_id, node_str_id
+                     in enumerate(network.nodes_ids_map)}
+    start_id = nodes_int_ids[args.start]
+    end_id = nodes_int_ids[args.end]
+    algorithm = get_algorithm(args.algorithm)
+    imported = time.perf_counter()
+    if args.load is None:
+        paths = router.solve(start_id, end_id, algorithm)
+    else:
+        paths = router.solve_demand(start_id, end_id, args.load, algorithm)
+    routed = time.perf_counter()
+
+    if paths is None:
+        print('No paths found')
+    else:
+        for name, path in zip(('distance', 'capacity'), paths):
+            print(f'{name} path: ' +
+                  ' '.join(network.links_ids_map[link_id]
+                           for link_id in path))
+    if args.timing:
+        print(f'network loaded in {(loaded - STARTED) * 1000:.1f} ms, '
+              f'solvers imported in {(imported - loaded) * 1000:.1f} ms, '
+              f'routed in {(routed - imported) * 1000:.1f} ms, '
+              f'first route after {(routed - STARTED) * 1000:.1f} ms')
+
+
+def bench(args: argparse.Namespace) -> None:
+    import numpy as np
+    from routing import Router
+    from tuning import random_demands
+    network = load_network(args.network)
+    demands_rng, loads_rng = np.random.default_rng(args.seed).spawn(2)
+    network.randomize_loads(args.loads[0], args.loads[1], loads_rng)
+    nodes_int_ids = {node_str_id: node_id for node_id, node_str_id
+                     in enumerate(network.nodes_ids_map)}
+    demands = [(nodes_int_ids[start_id], nodes_int_ids[end_id])
+               for start_id, end_id in random_demands(
+                   network.nodes_ids_map, args.demands, demands_rng)]
+
+    for name in args.algorithms:
+        algorithm = get_algorithm(name)
+        router = Router(network, weight_dist=args.weights[0],
+                        weight_cost=args.weights[1], rng=args.seed)
+        latencies = []
+        found_count = 0
+        for start_id, end_id in demands:
+            demand_start = time.perf_counter()
+            paths = router.solve(start_id, end_id, algorithm)
+            latencies.append(time.perf_counter() - demand_start)
+            found_count += paths is not None
+        latencies = np.asarray(latencies) * 1000
+        print(f'{name}: {found_count}/{len(demands)} found, latency '
+              f'mean {latencies.mean():.2f} ms, '
+              f'p50 {np.percentile(latencies, 50):.2f} ms, '
+              f'p95 {np.percentile(latencies, 95):.2f} ms, '
+              f'first {latencies[0]:.2f} ms')
+
+
+def tune(args: argparse.Namespace) -> None:
+    import tuning
+    tuning.main(args.args)
+
+
+def pickle_network(args: argparse.Namespace) -> None:
+    save_network(load_network(args.network), args.output)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Routing of pairs of paths of demands')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    solve_parser = commands.add_parser(
+        'solve', help='route a single demand and print its paths')
+    solve_parser.add_argument('start', help='id of the start node')
+    solve_parser.add_argument('end', help='id of the end node')
+    solve_parser.add_argument('--network', default=DEFAULT_NETWORK,
+                              help=f'XML file or {PICKLE_SUFFIX} file '
+                                   f'written by the pickle command')
+    solve_parser.add_argument('--algorithm', choices=ALGORITHMS,
+                              default='a_star')
+    solve_parser.add_argument('--load', type=float, default=None,
+                              help='route only over links able to bear it')
+    solve_parser.add_argument('--weights', type=float, nargs=2,
+                              default=(1, 1), metavar=('DIST', 'COST'))
+    solve_parser.add_argument('--timing', action='store_true',
+                              help='print time to the first route')
+    solve_parser.set_defaults(handler=solve)
+
+    bench_parser = commands.add_parser(
+        'bench', help='measure latency of algorithms on random demands')
+    bench_parser.add_argument('--network', default=DEFAULT_NETWORK)
+    bench_parser.add_argument('--algorithms', choices=ALGORITHMS, nargs='+',
+                              default=['a_star', 'ant_colony'])
+    bench_parser.add_argument('--demands', type=int, default=20)
+    bench_parser.add_argument('--loads', type=float, nargs=2,
+                              default=(0.4, 0.6), metavar=('MIN', 'MAX'),
+                              help='range of random loads as fractions of '
+                                   'capacities')
+    bench_parser.add_argument('--weights', type=float, nargs=2,
+                              default=(1, 1), metavar=('DIST', 'COST'))
+    bench_parser.add_argument('--seed', type=int, default=None)
+    bench_parser.set_defaults(handler=bench)
+
+    tune_parser = commands.add_parser(
+        'tune', help='tune parameters of the ant colony, see tuning.py')
+    tune_parser.add_argument('args', nargs=argparse.REMAINDER,
+                             help='arguments of tuning.py')
+    tune_parser.set_defaults(handler=tune)
+
+    pickle_parser = commands.add_parser(
+        'pickle', help='save a parsed network for faster loading')
+    pickle_parser.add_argument('network')
+    pickle_parser.add_argument('output')
+    pickle_parser.set_defaults(handler=pickle_network)
+    return parser
+
+
+def main(argv: list[str] = None) -> None:
+    args = create_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
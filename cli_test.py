@@ -0,0 +1,60 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import cli
+import unittest
+
+TEST_NETWORK = os.path.join('test_data', 'test_network_structure.xml')
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_cli(self, *argv) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            cli.main(list(argv))
+        return output.getvalue()
+
+    def test_import_is_light(self):
+        modules = subprocess.run(
+            [sys.executable, '-c',
+             'import sys, cli; print(" ".join(sys.modules))'],
+            capture_output=True, text=True, check=True).stdout.split()
+
+        for module in ('numpy', 'network', 'routing', 'ant'):
+            self.assertNotIn(module, modules)
+
+    def test_pickled_network(self):
+        path = os.path.join(self.directory.name, 'network.pickle')
+        network = cli.load_network(TEST_NETWORK)
+        network.links[1].load = 5.0
+        cli.save_network(network, path)
+
+        loaded = cli.load_network(path)
+
+        self.assertEqual(loaded.links_ids_map, network.links_ids_map)
+        self.assertEqual(loaded.links[1].load, 5.0)
+        loaded.loads[2] = 3.0
+        self.assertEqual(loaded.links[2].load, 3.0)
+
+    def test_solve(self):
+        path = os.path.join(self.directory.name, 'network.pickle')
+        self.run_cli('pickle', TEST_NETWORK, path)
+
+        for network_path in (TEST_NETWORK, path):
+            output = self.run_cli('solve', 'Aachen', 'Berlin', '--network',
+                                  network_path, '--timing')
+
+            lines = output.splitlines()
+            self.assertEqual(lines[0], 'distance path: L5')
+            self.assertEqual(lines[1], 'capacity path: L1 L2')
+            self.assertIn('first route after', lines[2])
@@ -2,33 +2,39 @@ from network import Network, parse_xml
 from a_star import *
 from os import path
 import time
-import random
+import numpy as np
 from ant import *
 
 ALG_A_STAR = 1
 ALG_ANT_COLONY = 2
 REPEAT = 100
+SEED = 2022 # Seed of all random numbers used in the tests, for them to be reproducible
 
 # Test params, will be changed later for the next test
 # A simple test to check correctness
 # Optimal paths: Path: [S->c->d->K, S->a->b->K] or [2, 1, 2, 0, 2, 1, 1] edge-wise
 WEIGHT_COST = 1
 WEIGHT_DIST = 1
-nodes_ids = ['S', 'K', 'a', 'b', 'c', 'd']
-links_data = [ # Load will be set to 0 everywhere, except specified nodes: 
-    ('L1', 'S', 'a', 1, 1),
-    ('L2', 'S', 'c', 1, 1),
-    ('L3', 'a', 'b', 1, 1), # Load = 0.1
-    ('L4', 'a', 'K', 1, 1), # Load = 0.5
-    ('L5', 'b', 'K', 1, 1), # Load = 0.1
-    ('L6', 'c', 'd', 1, 1), # Load = 0.9
-    ('L7', 'd', 'K', 1, 1)
-]
-network = Network(nodes_ids, links_data)
-network.links[2].load = 0.1
-network.links[3].load = 0.5
-network.links[4].load = 0.1
-network.links[5].load = 0.9
+# Network the tests run on, set by `main`
+network = None
+
+def create_simple_network():
+    nodes_ids = ['S', 'K', 'a', 'b', 'c', 'd']
+    links_data = [ # Load will be set to 0 everywhere, except specified nodes: 
+        ('L1', 'S', 'a', 1, 1),
+        ('L2', 'S', 'c', 1, 1),
+        ('L3', 'a', 'b', 1, 1), # Load = 0.1
+        ('L4', 'a', 'K', 1, 1), # Load = 0.5
+        ('L5', 'b', 'K', 1, 1), # Load = 0.1
+        ('L6', 'c', 'd', 1, 1), # Load = 0.9
+        ('L7', 'd', 'K', 1, 1)
+    ]
+    simple_network = Network(nodes_ids, links_data)
+    simple_network.links[2].load = 0.1
+    simple_network.links[3].load = 0.5
+    simple_network.links[4].load = 0.1
+    simple_network.links[5].load = 0.9
+    return simple_network
 
 def is_solution_valid(solution, start_node_id, end_node_id):
     """
@@ -116,7 +122,10 @@ def rate_solution_ant_colony(paths, network):
     link_paths = [[network.get_link_by_id(link_id) for link_id in paths[0]], [network.get_link_by_id(link_id) for link_id in paths[1]]]
     return cost_func(link_paths, len(network.links), WEIGHT_DIST, WEIGHT_COST)
 
-def test(algorithm, start_node_id, end_node_id):
+def test(algorithm, start_node_id, end_node_id, rng=None):
+    """
+    `rng` seeds random numbers of the ant colony, anything accepted by `numpy.random.default_rng`
+    """
     solution = None
     score = 0
     time_prep = time.time()
@@ -130,7 +139,7 @@ def test(algorithm, start_node_id, end_node_id):
 
     if algorithm == ALG_ANT_COLONY:
         # Ant colony algorithm has its own network that needs conversion to
-        test_network = RivalAntsAlgorithmNetwork(network.get_node_id_str_list(), network.get_link_data_list(), 2)
+        test_network = RivalAntsAlgorithmNetwork(network.get_node_id_str_list(), network.get_link_data_list(), 2, rng=rng)
 
         for index, link in enumerate(test_network.links):
             if network.links[index].load == 0:
@@ -173,6 +182,10 @@ def test(algorithm, start_node_id, end_node_id):
         
         time_run = time.time() - time_run
 
+        if paths is None:
+            print("Ant colony didn't find a solution")
+            return paths, float("-inf"), time_prep, time_run
+
         #for i in range(len(test_network.pheromones_amounts[0])):
         #    print(f'{test_network.links_ids_map[i]}: {test_network.pheromones_amounts[0][i]}, {test_network.pheromones_amounts[1][i]}')
 
@@ -188,14 +201,16 @@ def test(algorithm, start_node_id, end_node_id):
     return solution, score, time_prep, time_run
 
 
-def test_random_pair():
+def test_random_pair(rng=None):
     # Both algorithms receive same, randomized tasks
+    # Tasks and ant colony use separate streams, so that changing one doesn't change the other
+    tasks_rng, colony_rng = np.random.default_rng(rng).spawn(2)
     score_sum = [0, 0]
     time_prep_sum = [0, 0]
     time_run_sum = [0, 0]
     for i in range(REPEAT):
-        start_id = random.randrange(len(network.nodes))
-        end_id = random.randrange(len(network.nodes))
+        start_id = int(tasks_rng.integers(len(network.nodes)))
+        end_id = int(tasks_rng.integers(len(network.nodes)))
         if start_id == end_id:
             continue
 
@@ -206,7 +221,7 @@ def test_random_pair():
         time_prep_sum[0] += time_prep
         time_run_sum[0] += time_run
         
-        solution, score, time_prep, time_run = test(ALG_ANT_COLONY, start_id, end_id)
+        solution, score, time_prep, time_run = test(ALG_ANT_COLONY, start_id, end_id, colony_rng)
         score_sum[1] += score
         time_prep_sum[1] += time_prep
         time_run_sum[1] += time_run
@@ -217,26 +232,20 @@ def test_random_pair():
 
     print(f"Algorithms: A*, Ant colony\n Score: {score_avg}, prep time: {time_prep_avg}, run time: {time_run_avg}")
 
-def randomize_network_load(network, capacity_min, capacity_max):
+def randomize_network_load(network, capacity_min, capacity_max, rng=None):
     """
     Randomizes load on links uniformly between given values (fraction of link's capacity)
     """
-    for link in network.links:
-        link.load = random.uniform(capacity_min, capacity_max * link.capacity)
+    network.randomize_loads(capacity_min, capacity_max, rng)
 
 def reset_network_load():
-    for link in network.links:
-        link.load = 0
+    network.reset_loads()
 
 def get_network_load():
-    load = []
-    for link in network.links:
-        load.append(link.load)
-    return load
+    return network.get_loads()
 
 def set_network_load(load_tab):
-    for index, link in enumerate(network.links):
-        link.load = load_tab[index]
+    network.set_loads(load_tab)
 
 
 def apply_load(solution, load):
@@ -263,45 +272,29 @@ def apply_load(solution, load):
 
         if value == 2 or value == 3:
             network.links[edge].load = min(network.links[edge].load + load, network.links[edge].capacity - 0.0001)
-    
+
+    network.notify_load_change()
     return load
 
 def get_network_to_fit(load):
     """
-    Returns a sub-network consisting only of links that can bear given load (have enough capacity left)
+    Returns a view of the network, in which only links that can bear given load (have enough capacity left) are visible
+    Meant to be used as a context: `with get_network_to_fit(load):`
     """
-    node_list = network.get_node_id_str_list()
-    link_list = network.get_link_data_list()
-
-    removed = True
-    while removed:
-        removed = False
-        for i in range(len(link_list)):
-            link_id = network.links_ids_map.index(link_list[i][0])
-            if network.links[link_id].capacity - network.links[link_id].load < load: # Link's capacity too low
-                link_list.pop(i)
-                print(f"Removed link: {link_list[i]}")
-                removed = True
-                break
-    
-    new_network = Network(node_list, link_list)
-    for index, link in enumerate(new_network.links):
-        link.load = network.links[network.links_ids_map.index(new_network.links_ids_map[index])].load
-    
-    return new_network
+    return network.masked_view(network.capacity_mask(load))
 
-def test_cumulative_network_load(task_load_min, task_load_max):
-    global network
+def test_cumulative_network_load(task_load_min, task_load_max, rng=None):
+    tasks_rng, colony_rng = np.random.default_rng(rng).spawn(2)
 
     # Both algorithms receive same, randomized tasks
     task_list = []
     for i in range(REPEAT):
-        start_id = random.randrange(len(network.nodes))
-        end_id = random.randrange(len(network.nodes))
+        start_id = int(tasks_rng.integers(len(network.nodes)))
+        end_id = int(tasks_rng.integers(len(network.nodes)))
         if start_id == end_id:
             continue
 
-        load = random.uniform(task_load_min, task_load_max)
+        load = tasks_rng.uniform(task_load_min, task_load_max)
 
         task_list.append((start_id, end_id, load))
 
@@ -310,7 +303,7 @@ def test_cumulative_network_load(task_load_min, task_load_max):
     time_run_sum = [0, 0]
 
     # Backup state, to load it before running second algorithm
-    network_backup = network.get_network_copy()
+    loads_backup = network.snapshot_loads()
 
     for task in task_list:
         start_id = task[0]
@@ -318,7 +311,7 @@ def test_cumulative_network_load(task_load_min, task_load_max):
         load = task[2]
         #print(f"{network.nodes_ids_map[start_id]} {network.nodes_ids_map[end_id]}")
 
-        #network = get_network_to_fit(load)
+        #with get_network_to_fit(load):
 
         solution, score, time_prep, time_run = test(ALG_A_STAR, start_id, end_id)
 
@@ -328,7 +321,7 @@ def test_cumulative_network_load(task_load_min, task_load_max):
         time_prep_sum[0] += time_prep
         time_run_sum[0] += time_run
 
-    network = network_backup.get_network_copy()
+    network.restore_loads(loads_backup)
 
     for task in task_list:
         start_id = task[0]
@@ -336,7 +329,7 @@ def test_cumulative_network_load(task_load_min, task_load_max):
         load = task[2]
         #print(f"{network.nodes_ids_map[start_id]} {network.nodes_ids_map[end_id]}")
 
-        solution, score, time_prep, time_run = test(ALG_ANT_COLONY, start_id, end_id)
+        solution, score, time_prep, time_run = test(ALG_ANT_COLONY, start_id, end_id, colony_rng)
 
         apply_load(solution, load)
         
@@ -348,47 +341,56 @@ def test_cumulative_network_load(task_load_min, task_load_max):
     time_prep_avg = [time_prep_sum[0]/REPEAT, time_prep_sum[1]/REPEAT]
     time_run_avg = [time_run_sum[0]/REPEAT, time_run_sum[1]/REPEAT]
 
-    network = network_backup.get_network_copy()
+    network.restore_loads(loads_backup)
 
     print(f"Algorithms: A*, Ant colony\n Score: {score_avg}, prep time: {time_prep_avg}, run time: {time_run_avg}")
 
-# First case is so simple, that time differences hard to measure accurately
-# It is run only to check correctness and score
-solution, score, time_prep, time_run = test(ALG_A_STAR, network.nodes_ids_map.index("S"), network.nodes_ids_map.index("K"))
-print(f"A* found solution: {solution}")
-solution, score, time_prep, time_run = test(ALG_ANT_COLONY, network.nodes_ids_map.index("S"), network.nodes_ids_map.index("K"))
-print(f"Ant colony found solution: {solution}")
+def main():
+    global network, WEIGHT_COST, WEIGHT_DIST
+    network = create_simple_network()
 
-# A simple test to check single path predictions in a completly free network (germany-50)
-WEIGHT_COST = 1
-WEIGHT_DIST = 1
-nodes_ids, links_data = parse_xml(path.normpath(path.join('data', 'network_structure.xml')))
-network = Network(nodes_ids, links_data)
+    # First case is so simple, that time differences hard to measure accurately
+    # It is run only to check correctness and score
+    rng = np.random.default_rng(SEED)
+    solution, score, time_prep, time_run = test(ALG_A_STAR, network.nodes_ids_map.index("S"), network.nodes_ids_map.index("K"))
+    print(f"A* found solution: {solution}")
+    solution, score, time_prep, time_run = test(ALG_ANT_COLONY, network.nodes_ids_map.index("S"), network.nodes_ids_map.index("K"), rng)
+    print(f"Ant colony found solution: {solution}")
+
+    # A simple test to check single path predictions in a completly free network (germany-50)
+    WEIGHT_COST = 1
+    WEIGHT_DIST = 1
+    nodes_ids, links_data = parse_xml(path.normpath(path.join('data', 'network_structure.xml')))
+    network = Network(nodes_ids, links_data)
+
+    print("Minimal load:")
+    randomize_network_load(network, 0.1, 0.2, rng)
+    test_random_pair(rng)
+
+    print("Average load:")
+    randomize_network_load(network, 0.4, 0.6, rng)
+    test_random_pair(rng)
 
-print("Minimal load:")
-randomize_network_load(network, 0.1, 0.2)
-test_random_pair()
+    print("Almost full:")
+    randomize_network_load(network, 0.8, 0.9, rng)
+    test_random_pair(rng)
 
-print("Average load:")
-randomize_network_load(network, 0.4, 0.6)
-test_random_pair()
+    # A more complicated test that accumulates load (but doesn't remove full links)
+    print("Cumulative load:")
+    randomize_network_load(network, 0.4, 0.6, rng)
+    test_cumulative_network_load(1, 5, rng)
 
-print("Almost full:")
-randomize_network_load(network, 0.8, 0.9)
-test_random_pair()
+    # A test to show A* unacceptable computing times when forced to include a common link in a solution
+    for link_data in links_data:
+        if link_data[0] == "L85":
+            links_data.remove(link_data)
+            break
 
-# A more complicated test that accumulates load (but doesn't remove full links)
-print("Cumulative load:")
-randomize_network_load(network, 0.4, 0.6)
-test_cumulative_network_load(1, 5)
+    network = Network(nodes_ids, links_data)
 
-# A test to show A* unacceptable computing times when forced to include a common link in a solution
-for link_data in links_data:
-    if link_data[0] == "L85":
-        links_data.remove(link_data)
-        break
+    test(ALG_A_STAR, network.nodes_ids_map.index("Passau"), network.nodes_ids_map.index("Aachen"))
+    print("A* colony finished common edge test. Never actually going to happen")
 
-network = Network(nodes_ids, links_data)
 
-test(ALG_A_STAR, network.nodes_ids_map.index("Passau"), network.nodes_ids_map.index("Aachen"))
-print("A* colony finished common edge test. Never actually going to happen")
+if __name__ == "__main__":
+    main()
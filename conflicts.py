@@ -0,0 +1,100 @@
+import numpy as np
+import network as net
+
+# Kinds of elements two paths of a demand should not share, can be combined
+CONFLICT_LINKS = 1
+CONFLICT_NODES = 2
+CONFLICT_SRLGS = 4
+
+
+def parse_srlgs(path: str) -> dict[str, list[str]]:
+    """
+Reads shared risk link groups from a sidecar file of a network. Every line
+holds id of a group, a colon and ids of links belonging to it, separated by
+whitespace, e.g. `duct-7: L12 L40`. Text after `#` is ignored
+    """
+    srlgs = {}
+    with open(path) as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            group_id, separator, links_ids = line.partition(':')
+            if not separator:
+                raise ValueError(f'line {line_number} of {path} has no '
+                                 'colon after id of the group')
+            srlgs.setdefault(group_id.strip(), []).extend(links_ids.split())
+    return srlgs
+
+
+class ConflictIndex:
+    """
+Elements of `network` whose failure every link depends on, kept as
+a bitmask per link so that elements shared by two paths are counted with
+a vectorized OR over links of each path, AND of the results and popcount.\n
+Depending on `mode`, elements are links themselves, their end nodes and
+shared risk link groups from `srlgs` (id of a group -> ids of its links).
+End nodes of a demand are shared by both of its paths, so counting leaves
+them out with a mask from `ends_mask`.
+    """
+    def __init__(self, network: net.Network, mode: int = CONFLICT_LINKS,
+                 srlgs: dict[str, list[str]] = None) -> None:
+        self.mode = mode
+        links_count = len(network.links)
+        nodes_count = len(network.nodes)
+        links_int_ids = {link_str_id: link_id for link_id, link_str_id
+                         in enumerate(network.links_ids_map)}
+        self.groups_ids = list(srlgs) if srlgs else []
+        self.nodes_offset = links_count
+        self.groups_offset = links_count + nodes_count
+        bits_count = self.groups_offset + len(self.groups_ids)
+
+        self.masks = np.zeros((links_count, (bits_count + 63) // 64),
+                              dtype=np.uint64)
+        if mode & CONFLICT_LINKS:
+            for link_id in range(links_count):
+                self.set_bit(link_id, link_id)
+        if mode & CONFLICT_NODES:
+            for link in network.links:
+                for node_id in link.ends:
+                    self.set_bit(link.id, self.nodes_offset + node_id)
+        if mode & CONFLICT_SRLGS:
+            for group_index, group_id in enumerate(self.groups_ids):
+                for link_str_id in srlgs[group_id]:
+                    try:
+                        link_id = links_int_ids[link_str_id]
+                    except KeyError as err:
+                        raise ValueError(f'there is no link with '
+                                         f'{link_str_id} id') from err
+                    self.set_bit(link_id, self.groups_offset + group_index)
+
+    def set_bit(self, link_id: int, bit: int) -> None:
+        self.masks[link_id, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+
+    def path_elements(self, links_ids: list[int]) -> np.ndarray:
+        if len(links_ids) == 0:
+            return np.zeros(self.masks.shape[1], dtype=np.uint64)
+        return np.bitwise_or.reduce(self.masks[links_ids], axis=0)
+
+    def ends_mask(self, start_id: int, end_id: int) -> np.ndarray:
+        """
+Returns mask of all elements other than end nodes of a demand
+        """
+        mask = np.full(self.masks.shape[1], np.iinfo(np.uint64).max,
+                       dtype=np.uint64)
+        for node_id in (start_id, end_id):
+            bit = self.nodes_offset + node_id
+            mask[bit // 64] &= ~(np.uint64(1) << np.uint64(bit % 64))
+        return mask
+
+    def count(self, first_path: list[int], second_path: list[int],
+              ends_mask: np.ndarray = None) -> int:
+        """
+Returns number of elements shared by paths given as ids of links, only of
+those in `ends_mask` if it is given
+        """
+        shared = self.path_elements(first_path) &\
+            self.path_elements(second_path)
+        if ends_mask is not None:
+            shared &= ends_mask
+        return int(np.unpackbits(shared.view(np.uint8)).sum())
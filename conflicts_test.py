@@ -0,0 +1,101 @@
+import os
+import tempfile
+import network as net
+from ant import cost_func
+from conflicts import ConflictIndex, parse_srlgs, CONFLICT_LINKS,\
+    CONFLICT_NODES, CONFLICT_SRLGS
+from routing import Router
+import unittest
+
+
+def create_test_network() -> net.Network:
+    # S - a - m - b - K, S - c - m - d - K and S - e - f - g - h - K
+    nodes_ids = ['S', 'K', 'a', 'b', 'c', 'd', 'm', 'e', 'f', 'g', 'h']
+    links_data = [('L1', 'S', 'a', 1, 1),
+                  ('L2', 'a', 'm', 1, 1),
+                  ('L3', 'm', 'b', 1, 1),
+                  ('L4', 'b', 'K', 1, 1),
+                  ('L5', 'S', 'c', 1, 1),
+                  ('L6', 'c', 'm', 1, 1),
+                  ('L7', 'm', 'd', 1, 1),
+                  ('L8', 'd', 'K', 1, 1),
+                  ('L9', 'S', 'e', 1, 1),
+                  ('L10', 'e', 'f', 1, 1),
+                  ('L11', 'f', 'g', 1, 1),
+                  ('L12', 'g', 'h', 1, 1),
+                  ('L13', 'h', 'K', 1, 1)]
+    return net.Network(nodes_ids, links_data)
+
+
+def path_nodes(network: net.Network, path: list[int]) -> set[int]:
+    return {node_id for link_id in path
+            for node_id in network.links[link_id].ends}
+
+
+class TestConflictIndex(unittest.TestCase):
+
+    def test_links_mode(self):
+        test_network = create_test_network()
+        index = ConflictIndex(test_network, CONFLICT_LINKS)
+
+        self.assertEqual(index.count([0, 1, 2, 3], [0, 1, 6, 7]), 2)
+        self.assertEqual(index.count([0, 1, 2, 3], [4, 5, 6, 7]), 0)
+
+    def test_nodes_mode(self):
+        test_network = create_test_network()
+        index = ConflictIndex(test_network, CONFLICT_NODES)
+        ends_mask = index.ends_mask(0, 1)
+
+        self.assertEqual(index.count([0, 1, 2, 3], [4, 5, 6, 7], ends_mask),
+                         1)
+        self.assertEqual(index.count([0, 1, 2, 3], [4, 5, 6, 7]), 3)
+        self.assertEqual(index.count([0, 1, 2, 3], [8, 9, 10, 11, 12],
+                                     ends_mask), 0)
+
+    def test_srlgs(self):
+        test_network = create_test_network()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'srlgs.txt')
+            with open(path, 'w') as file:
+                file.write('# groups of links\n'
+                           'duct-1: L1 L5  # leaving S\n'
+                           'duct-2: L4\n'
+                           'duct-2: L13\n')
+            srlgs = parse_srlgs(path)
+        self.assertDictEqual(srlgs, {'duct-1': ['L1', 'L5'],
+                                     'duct-2': ['L4', 'L13']})
+
+        index = ConflictIndex(test_network, CONFLICT_LINKS | CONFLICT_SRLGS,
+                              srlgs)
+        self.assertEqual(index.count([0, 1, 2, 3], [4, 5, 6, 7]), 1)
+        self.assertEqual(index.count([0, 1, 2, 3], [8, 9, 10, 11, 12]), 1)
+        self.assertEqual(index.count([0, 1, 2, 3], [0, 1, 2, 3]), 6)
+
+        with self.assertRaises(ValueError):
+            ConflictIndex(test_network, CONFLICT_SRLGS, {'duct': ['L99']})
+
+    def test_cost_func(self):
+        test_network = create_test_network()
+        index = ConflictIndex(test_network, CONFLICT_NODES)
+        paths = [[test_network.links[link_id] for link_id in path]
+                 for path in ([0, 1, 2, 3], [4, 5, 6, 7])]
+
+        self.assertAlmostEqual(
+            cost_func(paths, len(test_network.links), conflict_index=index,
+                      ends_mask=index.ends_mask(0, 1)) -
+            cost_func(paths, len(test_network.links)), 10)
+
+    def test_a_star_node_disjoint(self):
+        test_network = create_test_network()
+        for link_id in range(8, 13):
+            test_network.links[link_id].load = 0.3
+        router = Router(test_network)
+
+        paths = router.route(0, 1)
+        self.assertEqual(len(path_nodes(test_network, paths[0]) &
+                             path_nodes(test_network, paths[1])), 3)
+
+        router.conflict_index = ConflictIndex(test_network, CONFLICT_NODES)
+        paths = router.route(0, 1)
+        self.assertEqual(len(path_nodes(test_network, paths[0]) &
+                             path_nodes(test_network, paths[1])), 2)
@@ -0,0 +1,223 @@
+import network as net
+from a_star import prepare_solution_tree, a_star, heuristic_admissible
+from ant import RivalAnt, RivalAntsAlgorithmNetwork
+from candidates import METRIC_HOPS, METRIC_CAPACITY
+from heuristics import HeuristicCache
+
+
+def contract_chains(network: net.Network, kept_nodes_ids: set[int] = ())\
+        -> tuple[list[int], list[tuple[int, int, list[int]]]]:
+    """
+Finds chains of links of `network` passing through nodes with exactly two
+links visible under `link_mask`, other than nodes in `kept_nodes_ids`.\n
+Returns ids of nodes left after removing inner nodes of the chains and
+chains as (first node id, last node id, ids of links in order from the
+first node). Chains leading back to their first node are left out, as no
+simple path can use them.
+    """
+    mask = network.link_mask
+    visible_links = [[link_id for link_id in node.links
+                      if mask is None or mask[link_id]]
+                     for node in network.nodes]
+    kept = [len(links) != 2 or node_id in kept_nodes_ids
+            for node_id, links in enumerate(visible_links)]
+
+    chains = []
+    used_links = set[int]()
+    for node_id in range(len(network.nodes)):
+        if not kept[node_id]:
+            continue
+        for link_id in visible_links[node_id]:
+            if link_id in used_links:
+                continue
+            chain = [link_id]
+            used_links.add(link_id)
+            end_id = network.links[link_id].get_other_end(node_id)
+            while not kept[end_id]:
+                first, second = visible_links[end_id]
+                link_id = second if first == link_id else first
+                chain.append(link_id)
+                used_links.add(link_id)
+                end_id = network.links[link_id].get_other_end(end_id)
+            if end_id != node_id:
+                chains.append((node_id, end_id, chain))
+    return [node_id for node_id in range(len(network.nodes))
+            if kept[node_id]], chains
+
+
+class ContractedNetwork:
+    """
+Smaller view of `network` in which chains of links through nodes of degree
+2 are replaced by single links, so that shortest path precomputations, A*
+and ant walks only deal with nodes where paths can branch.\n
+Nodes in `kept_nodes_ids` are never contracted, e.g. ends of demands that
+are going to be routed. Contraction follows `link_mask` of `network` at the
+moment of creation.\n
+Link of `reduced` network standing for a chain has capacity 1 and load
+making its free capacity fraction equal to the product of free capacity
+fractions of the chain, its cost is the sum of their costs. `expansions`
+hold ids of original links of every chain and `link_lengths` their counts,
+used as distances of A* and ants so that they still count original links.
+Paths found in the reduced network are returned as ids of original links.
+    """
+    def __init__(self, network: net.Network, kept_nodes_ids: set[int] = (),
+                 weight_dist: float = 1, weight_cost: float = 1) -> None:
+        self.network = network
+        self.weight_dist = weight_dist
+        self.weight_cost = weight_cost
+        nodes_ids, chains = contract_chains(network, set(kept_nodes_ids))
+
+        links_data = []
+        self.expansions = list[list[int]]()
+        for first_id, last_id, chain in chains:
+            str_ids = [network.links_ids_map[link_id] for link_id in chain]
+            links_data.append(('+'.join(str_ids),
+                               network.nodes_ids_map[first_id],
+                               network.nodes_ids_map[last_id], 1,
+                               sum(network.links[link_id].cost
+                                   for link_id in chain)))
+            self.expansions.append(chain)
+        self.link_lengths = [len(chain) for chain in self.expansions]
+        self.reduced = net.Network(
+            [network.nodes_ids_map[node_id] for node_id in nodes_ids],
+            links_data)
+        self.reduced_nodes_ids = {node_id: reduced_id for reduced_id, node_id
+                                  in enumerate(nodes_ids)}
+        self.reduced_links_ids = {link_str_id: link_id for link_id, link_str_id
+                                  in enumerate(self.reduced.links_ids_map)}
+
+        self.loads_epoch = None
+        self.heuristics = HeuristicCache(self.reduced)
+        self.ant_network = None
+
+    def get_reduced_node(self, node_id: int) -> net.Node:
+        try:
+            return self.reduced.nodes[self.reduced_nodes_ids[node_id]]
+        except KeyError as err:
+            raise ValueError(f'node {node_id} was contracted, it has to be '
+                             'kept to be an end of a demand') from err
+
+    def refresh_loads(self) -> None:
+        """
+Brings loads of reduced links up to date with `network`
+        """
+        if self.loads_epoch == self.network.load_epoch:
+            return
+        for link, chain in zip(self.reduced.links, self.expansions):
+            free_fraction = 1.0
+            for link_id in chain:
+                original_link = self.network.links[link_id]
+                free_fraction *= (original_link.capacity -
+                                  original_link.load) / original_link.capacity
+            link.load = 1 - free_fraction
+        self.reduced.notify_load_change()
+        self.loads_epoch = self.network.load_epoch
+
+    def expand_path(self, reduced_path: list[int], start_id: int)\
+            -> list[int]:
+        """
+Returns ids of original links of a path through reduced links with given
+ids, starting at original node with `start_id` id
+        """
+        path = []
+        node_id = self.reduced_nodes_ids[start_id]
+        for link_id in reduced_path:
+            chain = self.expansions[link_id]
+            ends = self.reduced.links[link_id].ends
+            if node_id == ends[0]:
+                path.extend(chain)
+                node_id = ends[1]
+            else:
+                path.extend(reversed(chain))
+                node_id = ends[0]
+        return path
+
+    def route_a_star(self, start_id: int, end_id: int) -> list[list[int]]:
+        """
+A* between original nodes with numerical ids, returns the same kind of
+paths as `routing.Router.route_a_star`
+        """
+        self.refresh_loads()
+        root = prepare_solution_tree(
+            self.reduced,
+            self.get_reduced_node(start_id),
+            self.get_reduced_node(end_id),
+            self.heuristics.rows(METRIC_CAPACITY),
+            self.heuristics.rows(METRIC_HOPS),
+            self.weight_dist, self.weight_cost,
+            self.link_lengths
+        )
+        solution_node = a_star(root, prune=heuristic_admissible(
+            self.weight_dist, self.weight_cost))
+        if solution_node is None:
+            return None
+        paths = [[], []]
+        for link_id, value in enumerate(solution_node.solution):
+            if value == 1 or value == 3:
+                paths[0].extend(self.expansions[link_id])
+            if value == 2 or value == 3:
+                paths[1].extend(self.expansions[link_id])
+        return [sorted(path) for path in paths]
+
+    def create_ant_network(self, ant_types_count: int, **kwargs)\
+            -> RivalAntsAlgorithmNetwork:
+        """
+Creates ant colony network of the reduced network, with lengths of chains
+as costs of links. `kwargs` are passed to `RivalAntsAlgorithmNetwork`
+        """
+        return RivalAntsAlgorithmNetwork(
+            self.reduced.get_node_id_str_list(),
+            self.reduced.get_link_data_list(), ant_types_count,
+            links_costs=self.link_lengths, **kwargs)
+
+    def route_ant_colony(self, start_id: int, end_id: int,
+                         ants_originals: list[RivalAnt],
+                         generations_number: int = 10, rng=None)\
+            -> list[list[int]]:
+        """
+Runs ant colony between original nodes with numerical ids, paths are
+returned as ids of original links in order from `start_id` node
+        """
+        self.refresh_loads()
+        if self.ant_network is None:
+            self.ant_network = self.create_ant_network(len(ants_originals),
+                                                       rng=rng)
+        # Ant colony needs some load on every link, same as in `Router`.
+        # Changed loads are announced, so that detours cached by local
+        # search of the colony are dropped
+        loads = self.reduced.get_loads()
+        loads[loads == 0] = 0.01
+        self.ant_network.set_loads(loads)
+
+        paths = self.ant_network.rival_ants_algorithm(
+            self.network.nodes_ids_map[start_id],
+            self.network.nodes_ids_map[end_id],
+            ants_originals, chain_cost_func,
+            generations_number=generations_number, rng=rng)
+        if paths is None:
+            return None
+        return [self.expand_path([self.reduced_links_ids[link_str_id]
+                                  for link_str_id in path], start_id)
+                for path in paths]
+
+
+def chain_cost_func(paths: list[list[net.Link]], all_links_count: int,
+                    distance_weight: float = 5, capacity_weight: float = 5)\
+        -> float:
+    """
+`ant.cost_func` for ant networks of contracted networks, where cost of
+a link is the number of original links it stands for, also counted when
+the link is shared by both paths
+    """
+    distance_path_cost = sum(link.cost for link in paths[0])
+    capacity_path_cost = 1
+    for link in paths[1]:
+        capacity_path_cost *= (link.capacity - link.load)/link.capacity
+    distance_links = {link.id: link for link in paths[0]}
+    common_edges_count = sum(distance_links[link_id].cost for link_id in
+                             distance_links.keys() &
+                             {link.id for link in paths[1]})
+
+    return (capacity_weight + distance_weight) * (common_edges_count + 1) -\
+        (distance_weight / distance_path_cost) -\
+        (capacity_weight * capacity_path_cost)
@@ -0,0 +1,103 @@
+import network as net
+from contraction import ContractedNetwork, contract_chains
+from routing import Router, default_ants
+import numpy as np
+import unittest
+
+
+def create_test_network() -> net.Network:
+    # S - a - b - K, S - c - K and S - d - e - f - c, with a loop at K
+    nodes_ids = ['S', 'K', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+    links_data = [('L1', 'S', 'a', 1, 1),
+                  ('L2', 'a', 'b', 1, 1),
+                  ('L3', 'b', 'K', 1, 1),
+                  ('L4', 'S', 'c', 1, 1),
+                  ('L5', 'c', 'K', 1, 1),
+                  ('L6', 'S', 'd', 1, 1),
+                  ('L7', 'd', 'e', 1, 1),
+                  ('L8', 'e', 'f', 1, 1),
+                  ('L9', 'f', 'c', 1, 1),
+                  ('L10', 'K', 'g', 1, 1),
+                  ('L11', 'g', 'h', 1, 1),
+                  ('L12', 'h', 'K', 1, 1)]
+    test_network = net.Network(nodes_ids, links_data)
+    test_network.links[1].load = 0.2
+    test_network.links[3].load = 0.6
+    test_network.links[6].load = 0.1
+    return test_network
+
+
+class TestContraction(unittest.TestCase):
+
+    def test_contract_chains(self):
+        test_network = create_test_network()
+
+        nodes_ids, chains = contract_chains(test_network)
+
+        self.assertListEqual(nodes_ids, [0, 1, 4])
+        self.assertCountEqual(chains, [(0, 1, [0, 1, 2]), (0, 4, [3]),
+                                       (0, 4, [5, 6, 7, 8]), (1, 4, [4])])
+
+    def test_kept_nodes_and_mask(self):
+        test_network = create_test_network()
+        test_network.link_mask = np.ones(len(test_network.links), dtype=bool)
+        test_network.link_mask[4] = False
+
+        nodes_ids, chains = contract_chains(test_network, {2})
+
+        # c is left with two visible links, so S - c - f - e - d - S is a loop
+        self.assertListEqual(nodes_ids, [0, 1, 2])
+        self.assertCountEqual(chains, [(0, 2, [0]), (1, 2, [2, 1])])
+
+    def test_reduced_loads(self):
+        test_network = create_test_network()
+        contracted = ContractedNetwork(test_network)
+        contracted.refresh_loads()
+
+        for link, chain in zip(contracted.reduced.links,
+                               contracted.expansions):
+            free_fraction = np.prod([1 - test_network.links[link_id].load
+                                     for link_id in chain])
+            self.assertAlmostEqual(1 - link.load, free_fraction)
+            self.assertAlmostEqual(link.get_a_star_cost(),
+                                   sum(test_network.links[link_id]
+                                       .get_a_star_cost()
+                                       for link_id in chain))
+
+        epoch = contracted.reduced.load_epoch
+        contracted.refresh_loads()
+        self.assertEqual(contracted.reduced.load_epoch, epoch)
+        test_network.change_links_load([0], 0.5)
+        contracted.refresh_loads()
+        self.assertAlmostEqual(contracted.reduced.links[0].load, 0.6)
+
+    def test_a_star_matches_flat_network(self):
+        test_network = create_test_network()
+        contracted = ContractedNetwork(test_network)
+
+        self.assertListEqual(contracted.route_a_star(0, 1),
+                             Router(test_network).route(0, 1))
+
+    def test_contracted_end(self):
+        test_network = create_test_network()
+        contracted = ContractedNetwork(test_network)
+
+        with self.assertRaises(ValueError):
+            contracted.route_a_star(0, 2)
+
+        contracted = ContractedNetwork(test_network, {2})
+        self.assertListEqual(contracted.route_a_star(0, 2),
+                             Router(test_network).route(0, 2))
+
+    def test_ant_colony_paths(self):
+        test_network = create_test_network()
+        contracted = ContractedNetwork(test_network)
+
+        paths = contracted.route_ant_colony(0, 1, default_ants(), rng=2022)
+
+        self.assertIsNotNone(paths)
+        for path in paths:
+            node_id = 0
+            for link_id in path:
+                node_id = test_network.links[link_id].get_other_end(node_id)
+            self.assertEqual(node_id, 1)
@@ -0,0 +1,94 @@
+import numpy as np
+import network as net
+from ant import RivalAntsAlgorithmNetwork, cost_func, DEPOSIT_ALL,\
+    DEPOSIT_GLOBAL_BEST, DEPOSIT_RANK, DEPOSIT_MMAS
+from routing import Router, default_ants
+from tuning import random_demands
+
+DEPOSITS_NAMES = {DEPOSIT_ALL: 'all', DEPOSIT_GLOBAL_BEST: 'global-best',
+                  DEPOSIT_RANK: 'rank', DEPOSIT_MMAS: 'mmas'}
+
+
+def target_costs(ant_network: RivalAntsAlgorithmNetwork,
+                 demands: list[tuple[str, str]], tolerance: float)\
+        -> list[float]:
+    """
+Returns costs the colony has to reach for every demand - cost of optimal
+paths found by A* with weights of `cost_func`, increased by `tolerance`
+fraction, or infinity if there are no paths between its nodes
+    """
+    network = ant_network.get_network_copy()
+    router = Router(network, weight_dist=5, weight_cost=5)
+    nodes_int_ids = {node_str_id: node_id for node_id, node_str_id
+                     in enumerate(network.nodes_ids_map)}
+    costs = []
+    for start_id, end_id in demands:
+        paths = router.route(nodes_int_ids[start_id], nodes_int_ids[end_id])
+        if paths is None:
+            costs.append(float('inf'))
+            continue
+        links_paths = [[ant_network.links[link_id] for link_id in path]
+                       for path in paths]
+        costs.append(cost_func(links_paths, len(ant_network.links)) *
+                     (1 + tolerance))
+    return costs
+
+
+def generations_to_target(ant_network: RivalAntsAlgorithmNetwork,
+                          demands: list[tuple[str, str]],
+                          targets: list[float], deposit: int,
+                          generations_number: int, ants_per_generation: int,
+                          seed) -> list[int]:
+    """
+Runs the colony with `deposit` strategy for every demand and returns the
+number of generations after which its best paths cost at most the target
+of the demand, or None if they never did. Demands with infinite targets
+have no paths and are not run
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(demands))
+    results = []
+    for (start_id, end_id), target, demand_seed\
+            in zip(demands, targets, seeds):
+        if target == float('inf'):
+            results.append(None)
+            continue
+        ant_network.rival_ants_algorithm(
+            start_id, end_id, default_ants(), cost_func, ants_per_generation,
+            generations_number, rng=demand_seed, deposit=deposit)
+        results.append(next((generation + 1 for generation, cost
+                             in enumerate(ant_network.best_costs)
+                             if cost <= target), None))
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Generations needed by pheromone deposit strategies to '
+                    'reach quality of optimal paths')
+    parser.add_argument('network', nargs='?',
+                        default='data/network_structure.xml')
+    parser.add_argument('--demands', type=int, default=20)
+    parser.add_argument('--generations', type=int, default=100)
+    parser.add_argument('--ants', type=int, default=5,
+                        help='ants of each type per generation')
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help='allowed excess over the optimal cost')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    nodes_ids, links_data = net.parse_xml(args.network)
+    ant_network = RivalAntsAlgorithmNetwork(nodes_ids, links_data, 2,
+                                            tabu_walk=True)
+    demands_rng, colony_rng = np.random.default_rng(args.seed).spawn(2)
+    demands = random_demands(nodes_ids, args.demands, demands_rng)
+    targets = target_costs(ant_network, demands, args.tolerance)
+    colony_seed = int(colony_rng.integers(2**32))
+    for deposit, name in DEPOSITS_NAMES.items():
+        generations = generations_to_target(
+            ant_network, demands, targets, deposit, args.generations,
+            args.ants, colony_seed)
+        reached = [count for count in generations if count is not None]
+        average = np.mean(reached) if reached else float('nan')
+        print(f'{name}: target reached for {len(reached)}/{len(demands)} '
+              f'demands, after {average:.1f} generations on average')
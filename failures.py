@@ -0,0 +1,206 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import network as net
+from admission import Flow
+from routing import Router, ALG_A_STAR
+
+# Failure sweep of a worker process, created once by `init_worker`
+worker_sweep = None
+
+
+def router_settings(router: Router) -> dict:
+    """
+Returns arguments of `Router` which make a router configured like `router`
+    """
+    return {'weight_dist': router.weight_dist,
+            'weight_cost': router.weight_cost,
+            'ants_originals': router.ants_originals,
+            'generations_number': router.generations_number,
+            'rng': router.rng, 'k_shortest': router.k_shortest,
+            'beam_width': router.beam_width}
+
+
+def init_worker(nodes_ids: list[str],
+                links_data: list[tuple[str, str, str, float, float]],
+                loads: np.ndarray, link_mask: np.ndarray, flows: list[Flow],
+                algorithm: int, settings: dict, conflict_index) -> None:
+    global worker_sweep
+    network = net.Network(nodes_ids, links_data)
+    network.set_loads(loads)
+    network.link_mask = link_mask
+    router = Router(network, **settings)
+    router.conflict_index = conflict_index
+    worker_sweep = FailureSweep(network, flows, algorithm, router)
+
+
+def analyze_in_worker(link_id: int) -> 'FailureImpact':
+    return worker_sweep.analyze(link_id)
+
+
+class FailureImpact:
+    """
+Impact of a failure of link `link_id` on flows of a network: ids of flows
+routed through it (`affected`), of those which had it on both paths and
+lost connectivity (`disconnected`), new paths of flows re-routed around it
+(`rerouted`, id of a flow -> paths) and ids of flows which could not be
+re-routed (`unrecoverable`) with sum of their loads (`lost_load`).
+`reused_count` is the number of re-routes which reused paths found for
+the demand without the failure.
+    """
+    def __init__(self, link_id: int) -> None:
+        self.link_id = link_id
+        self.affected = list[int]()
+        self.disconnected = list[int]()
+        self.rerouted = dict[int, list[list[int]]]()
+        self.unrecoverable = list[int]()
+        self.lost_load = 0.0
+        self.reused_count = 0
+
+    def __str__(self):
+        return f'Link {self.link_id}: {len(self.affected)} flows affected, ' \
+               f'{len(self.disconnected)} disconnected, ' \
+               f'{len(self.rerouted)} re-routed, ' \
+               f'{len(self.unrecoverable)} unrecoverable ' \
+               f'({self.lost_load:g} load lost)'
+
+
+class FailureSweep:
+    """
+What-if analysis of single link failures for `flows` admitted into
+`network`, without changing its loads.\n
+For a failure of a link, flows with it on any of their paths lose
+protection and are re-routed by `router` with `algorithm` over links with
+enough residual capacity for their load, with the failed link hidden by
+`link_mask`. Reservations of the flows are kept during re-routing, so its
+results are conservative.\n
+Removing a link can not improve paths, so paths found for a demand without
+the failure are reused for every failure of a link they don't use. These
+and re-routes under failures are kept in `result_cache` of the network
+under keys of the router extended with id of the failed link and token of
+`net.mask_token` of `link_mask` of the network.
+    """
+    def __init__(self, network: net.Network, flows: list[Flow],
+                 algorithm: int = ALG_A_STAR, router: Router = None) -> None:
+        self.network = network
+        self.flows = flows
+        self.algorithm = algorithm
+        self.router = router
+        if self.router is None:
+            self.router = Router(network)
+        self.links_flows = [list[Flow]() for _ in network.links]
+        for flow in flows:
+            for link_id in set(flow.links):
+                self.links_flows[link_id].append(flow)
+
+    def analyze(self, link_id: int) -> FailureImpact:
+        """
+Returns impact of a failure of link with numerical id `link_id`
+        """
+        impact = FailureImpact(link_id)
+        for flow in self.links_flows[link_id]:
+            impact.affected.append(flow.id)
+            if all(link_id in path for path in flow.paths):
+                impact.disconnected.append(flow.id)
+
+            # Without a solution for all links there is none without one
+            paths = self.router.route_demand(flow.start_id, flow.end_id,
+                                             flow.load, self.algorithm)
+            if paths is not None:
+                if all(link_id not in path for path in paths):
+                    impact.reused_count += 1
+                else:
+                    paths = self.reroute(flow, link_id)
+
+            if paths is None:
+                impact.unrecoverable.append(flow.id)
+                impact.lost_load += flow.load
+            else:
+                impact.rerouted[flow.id] = paths
+        return impact
+
+    def reroute(self, flow: Flow, link_id: int) -> list[list[int]]:
+        key = self.router.cache_key(flow.start_id, flow.end_id,
+                                    self.algorithm, flow.load) +\
+            (link_id, net.mask_token(self.network.link_mask))
+        result = self.network.result_cache.get(key)
+        if result is not None:
+            return result.paths
+        mask = np.ones(len(self.network.links), dtype=bool)
+        mask[link_id] = False
+        if self.network.link_mask is not None:
+            mask &= self.network.link_mask
+        with self.network.masked_view(mask):
+            paths = self.router.route_demand(flow.start_id, flow.end_id,
+                                             flow.load, self.algorithm)
+        self.network.result_cache.put(key, paths, flow.load)
+        return paths
+
+    def sweep(self, links_ids: list[int] = None, workers_count: int = 0)\
+            -> list[FailureImpact]:
+        """
+Returns impacts of failures of every link in `links_ids`, all links of
+the network if it is None.\n
+Failures are analyzed in a pool of `workers_count` processes, each keeping
+its own network copy, with the same loads and `link_mask`, a router with
+the same settings and its cache between failures, or in this process if it
+is 0. Links without flows are not sent to workers.
+        """
+        if links_ids is None:
+            links_ids = range(len(self.network.links))
+        impacts = {link_id: FailureImpact(link_id) for link_id in links_ids}
+        used_links_ids = [link_id for link_id in impacts
+                          if self.links_flows[link_id]]
+        if workers_count == 0:
+            for link_id in used_links_ids:
+                impacts[link_id] = self.analyze(link_id)
+        else:
+            with ProcessPoolExecutor(
+                    workers_count, initializer=init_worker,
+                    initargs=(self.network.get_node_id_str_list(),
+                              self.network.get_link_data_list(),
+                              self.network.get_loads(),
+                              self.network.link_mask, self.flows,
+                              self.algorithm, router_settings(self.router),
+                              self.router.conflict_index)) as executor:
+                chunksize = max(1, len(used_links_ids) //
+                                (4 * (workers_count or os.cpu_count() or 1)))
+                for impact in executor.map(analyze_in_worker, used_links_ids,
+                                           chunksize=chunksize):
+                    impacts[impact.link_id] = impact
+        return list(impacts.values())
+
+
+if __name__ == '__main__':
+    import argparse
+    from admission import AdmissionController
+    from tuning import random_demands
+    parser = argparse.ArgumentParser(
+        description='Impact of single link failures on admitted demands')
+    parser.add_argument('network', nargs='?',
+                        default='data/network_structure.xml')
+    parser.add_argument('--demands', type=int, default=100)
+    parser.add_argument('--load', type=float, default=1.0,
+                        help='load of every demand')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='size of the process pool, 0 to run in place')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    network = net.Network(*net.parse_xml(args.network))
+    controller = AdmissionController(network)
+    nodes_int_ids = {node_str_id: node_id for node_id, node_str_id
+                     in enumerate(network.nodes_ids_map)}
+    for start_id, end_id in random_demands(network.nodes_ids_map,
+                                           args.demands, args.seed):
+        controller.admit(nodes_int_ids[start_id], nodes_int_ids[end_id],
+                         args.load)
+
+    sweep = FailureSweep(network, list(controller.flows.values()),
+                         router=controller.router)
+    impacts = sweep.sweep(workers_count=args.workers)
+    impacts.sort(key=lambda impact: (impact.lost_load, len(impact.affected)),
+                 reverse=True)
+    for impact in impacts[:args.top]:
+        print(f'{network.links_ids_map[impact.link_id]} - {impact}')
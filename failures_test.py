@@ -0,0 +1,99 @@
+from a_star_test import create_grid_network
+from admission import AdmissionController, Flow
+from admission_test import create_test_network
+from conflicts import ConflictIndex, CONFLICT_NODES
+from failures import FailureSweep
+from routing import Router, ALG_K_SHORTEST
+import numpy as np
+import unittest
+
+
+class TestFailureSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.test_network = create_test_network()
+        self.controller = AdmissionController(self.test_network)
+        # Paths [1, 5, 6] and [0, 2, 4]
+        self.flow = self.controller.admit(0, 1, 0.04)
+
+    def test_reroutes_affected_flows(self):
+        sweep = FailureSweep(self.test_network, [self.flow],
+                             router=self.controller.router)
+
+        impacts = sweep.sweep()
+
+        self.assertListEqual([impact.link_id for impact in impacts],
+                             list(range(7)))
+        for impact in impacts:
+            used = impact.link_id in self.flow.links
+            self.assertListEqual(impact.affected, [0] if used else [])
+            self.assertListEqual(impact.disconnected, [])
+            self.assertListEqual(impact.unrecoverable, [])
+            if used:
+                for path in impact.rerouted[0]:
+                    self.assertNotIn(impact.link_id, path)
+        # Only S-c-d-K is left without S-a
+        self.assertListEqual(impacts[0].rerouted[0], [[1, 5, 6], [1, 5, 6]])
+        self.assertIsNone(self.test_network.link_mask)
+        self.assertAlmostEqual(self.test_network.links[5].load, 0.94)
+
+    def test_disconnected_and_unrecoverable(self):
+        shared_flow = Flow(1, 0, 1, 0.5, [[0, 3], [0, 2, 4]])
+        sweep = FailureSweep(self.test_network, [self.flow, shared_flow])
+
+        impact = sweep.analyze(0)
+
+        self.assertListEqual(impact.affected, [0, 1])
+        self.assertListEqual(impact.disconnected, [1])
+        # Link c-d is too loaded for the second flow
+        self.assertListEqual(impact.unrecoverable, [1])
+        self.assertAlmostEqual(impact.lost_load, 0.5)
+        self.assertListEqual(list(impact.rerouted), [0])
+
+    def test_reuses_paths(self):
+        sweep = FailureSweep(self.test_network, [self.flow])
+        # Paths found without failures don't use link c-d
+        self.test_network.change_links_load([5], 0.03)
+        paths = sweep.router.route_demand(0, 1, 0.04)
+
+        impact = sweep.analyze(5)
+
+        self.assertEqual(impact.reused_count, 1)
+        self.assertListEqual(impact.rerouted[0], paths)
+
+    def test_reroute_follows_link_mask(self):
+        sweep = FailureSweep(self.test_network, [self.flow])
+        self.assertListEqual(sweep.reroute(self.flow, 0),
+                             [[1, 5, 6], [1, 5, 6]])
+
+        # S is left without links
+        self.test_network.link_mask = np.asarray([True, False] + [True] * 5)
+
+        self.assertIsNone(sweep.reroute(self.flow, 0))
+
+    def test_process_pool(self):
+        sweep = FailureSweep(self.test_network, [self.flow])
+
+        impacts = sweep.sweep(workers_count=2)
+
+        expected = FailureSweep(self.test_network, [self.flow]).sweep()
+        self.assertListEqual([impact.rerouted for impact in impacts],
+                             [impact.rerouted for impact in expected])
+
+    def test_process_pool_router_settings(self):
+        test_network = create_grid_network(4)
+        test_network.reset_loads()
+        test_network.link_mask = np.ones(len(test_network.links), dtype=bool)
+        test_network.link_mask[[1, 9]] = False
+        router = Router(test_network, weight_dist=20, k_shortest=2)
+        router.conflict_index = ConflictIndex(test_network, CONFLICT_NODES)
+        controller = AdmissionController(test_network, router)
+        flows = [controller.admit(start_id, end_id, 0.1, ALG_K_SHORTEST)
+                 for start_id, end_id in ((0, 15), (3, 12), (1, 14))]
+
+        sweep = FailureSweep(test_network, flows, ALG_K_SHORTEST, router)
+        expected = [impact.rerouted for impact in sweep.sweep()]
+        impacts = sweep.sweep(workers_count=2)
+
+        self.assertListEqual([impact.rerouted for impact in impacts],
+                             expected)
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from heapq import heappush, heappop
+import numpy as np
+import network as net
+from candidates import METRIC_CAPACITY, metric_weights
+
+
+def distances_from(network: net.Network, source_id: int,
+                   weights: np.ndarray, unreachable: float = float('inf'))\
+        -> np.ndarray:
+    """
+Dijkstra from node with numerical id `source_id` to all nodes of `network`,
+skipping links hidden by its `link_mask`. As links are symmetrical, these
+are also distances from all nodes to it. Nodes without a path to it get
+`unreachable` distance
+    """
+    mask = network.link_mask
+    distances = np.full(len(network.nodes), float('inf'))
+    distances[source_id] = 0
+    q = [(0.0, source_id)]
+    while q:
+        distance, node_id = heappop(q)
+        if distance > distances[node_id]:
+            continue
+        for link_id in network.nodes[node_id].links:
+            if mask is not None and not mask[link_id]:
+                continue
+            other_end_id = network.links[link_id].get_other_end(node_id)
+            new_distance = distance + weights[link_id]
+            if new_distance < distances[other_end_id]:
+                distances[other_end_id] = new_distance
+                heappush(q, (new_distance, other_end_id))
+    distances[np.isinf(distances)] = unreachable
+    return distances
+
+
+class HeuristicCache:
+    """
+Rows of minimal distances between every node of `network` and a single
+target node, computed with one Dijkstra on first access instead of full
+all pairs matrices. Links hidden by `link_mask` of the network are
+skipped, and so are full links under `METRIC_CAPACITY`, as their weights
+are infinite.\n
+Up to `max_size` rows are kept in LRU order under (target, metric, load
+epoch, mask token) keys, with the epoch only for `METRIC_CAPACITY`, which
+depends on loads - rows of other metrics survive load changes. The token
+of `net.mask_token` stands for contents of `link_mask`, so rows are shared
+by equal masks, like capacity masks rebuilt for every demand.
+    """
+    def __init__(self, network: net.Network, max_size: int = 64,
+                 unreachable: float = float('inf')) -> None:
+        self.network = network
+        self.max_size = max_size
+        self.unreachable = unreachable
+        self.rows_cache = OrderedDict[tuple, np.ndarray]()
+        self.hits = 0
+        self.misses = 0
+
+    def row(self, target_id: int, metric: int) -> np.ndarray:
+        epoch = self.network.load_epoch if metric == METRIC_CAPACITY else None
+        key = (target_id, metric, epoch,
+               net.mask_token(self.network.link_mask))
+        row = self.rows_cache.get(key)
+        if row is not None:
+            self.rows_cache.move_to_end(key)
+            self.hits += 1
+            return row
+
+        self.misses += 1
+        row = distances_from(self.network, target_id,
+                             metric_weights(self.network, metric),
+                             self.unreachable)
+        self.rows_cache[key] = row
+        if len(self.rows_cache) > self.max_size:
+            self.rows_cache.popitem(last=False)
+        return row
+
+    def rows(self, metric: int) -> 'HeuristicRows':
+        return HeuristicRows(self, metric)
+
+
+class HeuristicRows:
+    """
+View of `cache` indexed like a matrix of minimal distances: `rows[target]`
+is a row of distances of all nodes to node with `target` id under `metric`
+    """
+    def __init__(self, cache: HeuristicCache, metric: int) -> None:
+        self.cache = cache
+        self.metric = metric
+
+    def __getitem__(self, target_id: int) -> np.ndarray:
+        return self.cache.row(target_id, self.metric)
@@ -0,0 +1,95 @@
+from admission_test import create_test_network
+from a_star import calculate_min_cost, calculate_min_dist
+from candidates import METRIC_COST, METRIC_HOPS, METRIC_CAPACITY
+from heuristics import HeuristicCache
+import numpy as np
+import unittest
+
+
+class TestHeuristicCache(unittest.TestCase):
+
+    def test_rows_match_matrices(self):
+        test_network = create_test_network()
+        cache = HeuristicCache(test_network)
+        min_dist = calculate_min_dist(test_network)
+        min_cost = calculate_min_cost(test_network)
+
+        for target_id in range(len(test_network.nodes)):
+            np.testing.assert_allclose(
+                cache.rows(METRIC_HOPS)[target_id],
+                [row[target_id] for row in min_dist])
+            np.testing.assert_allclose(
+                cache.rows(METRIC_CAPACITY)[target_id],
+                [row[target_id] for row in min_cost])
+
+    def test_lru(self):
+        test_network = create_test_network()
+        cache = HeuristicCache(test_network, max_size=2)
+
+        cache.row(0, METRIC_HOPS)
+        cache.row(1, METRIC_HOPS)
+        cache.row(0, METRIC_HOPS)
+        cache.row(2, METRIC_HOPS)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+        cache.row(0, METRIC_HOPS)
+        cache.row(1, METRIC_HOPS)
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_load_epoch(self):
+        test_network = create_test_network()
+        cache = HeuristicCache(test_network)
+        capacity_row = cache.row(1, METRIC_CAPACITY)
+        cost_row = cache.row(1, METRIC_COST)
+
+        test_network.change_links_load([4], 0.8)
+
+        self.assertIs(cache.row(1, METRIC_COST), cost_row)
+        self.assertIsNot(cache.row(1, METRIC_CAPACITY), capacity_row)
+        self.assertAlmostEqual(cache.row(1, METRIC_CAPACITY)[3],
+                               calculate_min_cost(test_network)[3][1])
+        self.assertGreater(cache.row(1, METRIC_CAPACITY)[3], capacity_row[3])
+
+    def test_link_mask(self):
+        test_network = create_test_network()
+        cache = HeuristicCache(test_network, unreachable=100)
+        self.assertEqual(cache.row(0, METRIC_HOPS)[1], 2)
+
+        mask = np.ones(len(test_network.links), dtype=bool)
+        mask[[0, 1]] = False
+        with test_network.masked_view(mask):
+            self.assertEqual(cache.row(0, METRIC_HOPS)[1], 100)
+        self.assertEqual(cache.row(0, METRIC_HOPS)[1], 2)
+
+    def test_rows_shared_by_equal_masks(self):
+        test_network = create_test_network()
+        cache = HeuristicCache(test_network)
+        mask = np.ones(len(test_network.links), dtype=bool)
+        mask[0] = False
+
+        with test_network.masked_view(mask):
+            hops_row = cache.row(0, METRIC_HOPS)
+        row = cache.row(0, METRIC_HOPS)
+        test_network.change_links_load([4], 0.5)
+
+        # Rows of masks with the same contents are reused, hop rows also
+        # after load changes
+        with test_network.masked_view(mask.copy()):
+            self.assertIs(cache.row(0, METRIC_HOPS), hops_row)
+        self.assertIs(cache.row(0, METRIC_HOPS), row)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_full_link(self):
+        test_network = create_test_network()
+        cache = HeuristicCache(test_network)
+        test_network.change_links_load([1], 1.0)
+        mask = np.ones(len(test_network.links), dtype=bool)
+        mask[3] = False
+
+        with test_network.masked_view(mask):
+            row = cache.row(1, METRIC_CAPACITY)
+
+        # S reaches K only through a-b-K, not through the full link S-c
+        self.assertAlmostEqual(row[0], -2 * np.log10(0.9))
+        self.assertAlmostEqual(row[4], 1)
+        self.assertTrue(np.all(np.isfinite(row)))
@@ -0,0 +1,146 @@
+import numpy as np
+import network as net
+from candidates import shortest_path, metric_weights, METRIC_COST,\
+    METRIC_CAPACITY
+
+DISTANCE_PATH = 0
+CAPACITY_PATH = 1
+
+
+def path_nodes_ids(path: list[net.Link], start_id: int) -> list[int]:
+    nodes_ids = [start_id]
+    for link in path:
+        nodes_ids.append(link.get_other_end(nodes_ids[-1]))
+    return nodes_ids
+
+
+def free_fraction(links: list[net.Link]) -> float:
+    fraction = 1.0
+    for link in links:
+        fraction *= (link.capacity - link.load) / link.capacity
+    return fraction
+
+
+class PairLocalSearch:
+    """
+Local search improving a pair of loop-free paths - distance path and
+capacity path - under the objective of `ant.cost_func` with the same
+weights.\n
+A move replaces a segment of one of the paths with a detour between its
+ends: the best one by criterion of that path, and the best one avoiding
+links of the other path. Detours never enter nodes of the rest of the path,
+so paths stay loop-free. Moves are evaluated by the change of the objective
+computed from the segment and the detour only, and the first improving one
+is applied until there is none or `max_moves` were made.\n
+Detours, and weights of links they are found with, are cached as long as
+the same search is used for the same loads, under the token of
+`net.mask_token` of `link_mask` of the network.
+    """
+    def __init__(self, network: net.Network, distance_weight: float = 5,
+                 capacity_weight: float = 5, max_moves: int = 100) -> None:
+        self.network = network
+        self.distance_weight = distance_weight
+        self.capacity_weight = capacity_weight
+        self.max_moves = max_moves
+        self.detours = dict[tuple, list[int]]()
+        self.weights = dict[tuple[int, bytes], np.ndarray]()
+        self.detours_epoch = network.load_epoch
+        self.moves_count = 0
+
+    def cost(self, paths: list[list[net.Link]]) -> float:
+        shared = len({link.id for link in paths[0]} &
+                     {link.id for link in paths[1]})
+        return (self.capacity_weight + self.distance_weight) * (shared + 1) -\
+            self.distance_weight / sum(link.cost for link in paths[0]) -\
+            self.capacity_weight * free_fraction(paths[1])
+
+    def get_detour(self, kind: int, source_id: int, target_id: int,
+                   removed_nodes: frozenset[int],
+                   removed_links: frozenset[int]) -> list[int]:
+        if self.detours_epoch != self.network.load_epoch:
+            self.detours.clear()
+            self.weights.clear()
+            self.detours_epoch = self.network.load_epoch
+        token = net.mask_token(self.network.link_mask)
+        key = (kind, source_id, target_id, removed_nodes, removed_links,
+               token)
+        if key not in self.detours:
+            path = shortest_path(self.network, source_id, target_id,
+                                 self.get_weights(kind, token),
+                                 removed_links, removed_nodes)
+            self.detours[key] = None if path is None else path[1]
+        return self.detours[key]
+
+    def get_weights(self, kind: int, token: bytes) -> np.ndarray:
+        weights = self.weights.get((kind, token))
+        if weights is None:
+            # Full links cannot be entered by capacity detours
+            weights = metric_weights(
+                self.network,
+                METRIC_COST if kind == DISTANCE_PATH else METRIC_CAPACITY)
+            self.weights[(kind, token)] = weights
+        return weights
+
+    def improve(self, paths: list[list[net.Link]], start_id: int)\
+            -> list[list[net.Link]]:
+        """
+Returns improved copy of `paths` starting at node with `start_id` id
+        """
+        paths = [list(path) for path in paths]
+        for _ in range(self.max_moves):
+            if not self.make_move(paths, start_id):
+                break
+            self.moves_count += 1
+        return paths
+
+    def make_move(self, paths: list[list[net.Link]], start_id: int) -> bool:
+        distance = sum(link.cost for link in paths[0])
+        capacity = free_fraction(paths[1])
+        for kind in (DISTANCE_PATH, CAPACITY_PATH):
+            path = paths[kind]
+            other_links_ids = frozenset(link.id for link in paths[1 - kind])
+            nodes_ids = path_nodes_ids(path, start_id)
+            for i in range(len(path)):
+                for j in range(i + 1, len(path) + 1):
+                    removed_nodes = frozenset(nodes_ids[:i] +
+                                              nodes_ids[j + 1:])
+                    for removed_links in (frozenset(), other_links_ids):
+                        detour = self.get_detour(kind, nodes_ids[i],
+                                                 nodes_ids[j], removed_nodes,
+                                                 removed_links)
+                        if detour is None:
+                            continue
+                        detour_links = [self.network.links[link_id]
+                                        for link_id in detour]
+                        if self.gain(kind, path[i:j], detour_links,
+                                     other_links_ids, distance,
+                                     capacity) > 1e-12:
+                            path[i:j] = detour_links
+                            return True
+        return False
+
+    def gain(self, kind: int, segment: list[net.Link],
+             detour: list[net.Link], other_links_ids: frozenset[int],
+             distance: float, capacity: float) -> float:
+        """
+Returns decrease of the objective after replacing `segment` of a path of
+`kind` with `detour`, given current distance of the distance path and
+free capacity fraction of the capacity path
+        """
+        shared_change =\
+            sum(link.id in other_links_ids for link in detour) -\
+            sum(link.id in other_links_ids for link in segment)
+        gain = -(self.capacity_weight + self.distance_weight) * shared_change
+        if kind == DISTANCE_PATH:
+            new_distance = distance - sum(link.cost for link in segment) +\
+                sum(link.cost for link in detour)
+            gain += self.distance_weight / new_distance -\
+                self.distance_weight / distance
+        else:
+            segment_fraction = free_fraction(segment)
+            if segment_fraction == 0:
+                return float('inf')
+            new_capacity = capacity / segment_fraction *\
+                free_fraction(detour)
+            gain += self.capacity_weight * (new_capacity - capacity)
+        return gain
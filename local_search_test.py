@@ -0,0 +1,119 @@
+from admission_test import create_test_network
+import ant
+import local_search
+import numpy as np
+from routing import Router
+import unittest
+
+
+class TestPairLocalSearch(unittest.TestCase):
+
+    def test_separates_paths(self):
+        test_network = create_test_network()
+        search = local_search.PairLocalSearch(test_network)
+        path = [test_network.links[link_id] for link_id in (1, 5, 6)]
+        paths = [path, list(path)]
+
+        improved = search.improve(paths, 0)
+
+        self.assertLess(search.cost(improved), search.cost(paths))
+        self.assertEqual([link.id for link in improved[0]], [0, 3])
+        self.assertEqual([link.id for link in improved[1]], [1, 5, 6])
+        self.assertGreater(search.moves_count, 0)
+        # Given paths are left intact
+        self.assertEqual([link.id for link in paths[0]], [1, 5, 6])
+
+    def test_gain_matches_cost(self):
+        test_network = create_test_network()
+        search = local_search.PairLocalSearch(test_network)
+        links = test_network.links
+        paths = [[links[0], links[2], links[4]], [links[1], links[5], links[6]]]
+        for kind, segment, detour in\
+                ((local_search.DISTANCE_PATH, slice(1, 3), [links[3]]),
+                 (local_search.CAPACITY_PATH, slice(0, 3),
+                  [links[0], links[3]])):
+            changed = [list(path) for path in paths]
+            changed[kind][segment] = detour
+
+            gain = search.gain(kind, paths[kind][segment], detour,
+                               frozenset(link.id for link
+                                         in paths[1 - kind]),
+                               sum(link.cost for link in paths[0]),
+                               local_search.free_fraction(paths[1]))
+
+            self.assertAlmostEqual(gain, search.cost(paths) -
+                                   search.cost(changed))
+
+    def test_detours_follow_loads(self):
+        test_network = create_test_network()
+        search = local_search.PairLocalSearch(test_network)
+        detour = search.get_detour(local_search.CAPACITY_PATH, 0, 1,
+                                   frozenset(), frozenset())
+        self.assertEqual(detour, [0, 2, 4])
+
+        test_network.change_links_load([2], 0.8)
+
+        detour = search.get_detour(local_search.CAPACITY_PATH, 0, 1,
+                                   frozenset(), frozenset())
+        self.assertEqual(detour, [0, 3])
+
+    def test_detours_follow_link_mask(self):
+        test_network = create_test_network()
+        search = local_search.PairLocalSearch(test_network)
+        detour = search.get_detour(local_search.CAPACITY_PATH, 0, 1,
+                                   frozenset(), frozenset())
+        self.assertEqual(detour, [0, 2, 4])
+
+        # Mask changes at the same load epoch
+        with test_network.masked_view(np.asarray([True] * 2 + [False] +
+                                                 [True] * 4)):
+            detour = search.get_detour(local_search.CAPACITY_PATH, 0, 1,
+                                       frozenset(), frozenset())
+        self.assertEqual(detour, [0, 3])
+        self.assertEqual(search.get_detour(local_search.CAPACITY_PATH, 0, 1,
+                                           frozenset(), frozenset()),
+                         [0, 2, 4])
+
+
+class TestColonyLocalSearch(unittest.TestCase):
+
+    def test_router_sync_drops_detours(self):
+        test_network = create_test_network()
+        router = Router(test_network, generations_number=1, rng=1)
+        router.route_ant_colony(0, 1)
+        search = local_search.PairLocalSearch(router.ant_network)
+        self.assertEqual(search.get_detour(local_search.CAPACITY_PATH, 0, 1,
+                                           frozenset(), frozenset()),
+                         [0, 2, 4])
+
+        test_network.change_links_load([2], 0.8)
+        router.route_ant_colony(0, 1)
+
+        self.assertEqual(search.get_detour(local_search.CAPACITY_PATH, 0, 1,
+                                           frozenset(), frozenset()),
+                         [0, 3])
+
+    def test_not_worse_than_colony(self):
+        nodes_ids = ['A', 'B', 'C', 'D', 'E', 'F']
+        links_data = [('L1', 'A', 'B', 10.0, 1.0),
+                      ('L2', 'B', 'F', 10.0, 1.0),
+                      ('L3', 'A', 'C', 10.0, 2.0),
+                      ('L4', 'C', 'D', 10.0, 1.0),
+                      ('L5', 'D', 'F', 10.0, 2.0),
+                      ('L6', 'B', 'E', 10.0, 1.0),
+                      ('L7', 'E', 'F', 10.0, 1.0),
+                      ('L8', 'C', 'B', 10.0, 1.0)]
+        costs = []
+        for with_search in (False, True):
+            test_network = ant.RivalAntsAlgorithmNetwork(
+                nodes_ids, links_data, 2, local_search=with_search)
+            test_network.links[0].load = 8.0
+            paths = test_network.rival_ants_algorithm(
+                'A', 'F', [ant.RivalDistanceAnt((1, -0.9)),
+                           ant.RivalCapacityAnt((1, -0.9))],
+                ant.cost_func, 2, 3, rng=7)
+            links_paths = [[test_network.get_link_by_id(link_id)
+                            for link_id in path] for path in paths]
+            costs.append(ant.cost_func(links_paths, len(links_data)))
+
+        self.assertLessEqual(costs[1], costs[0] + 1e-12)
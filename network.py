@@ -1,27 +1,57 @@
 from xml.etree import ElementTree as ET
-from collections import Counter
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
 from math import log10
 from queue import SimpleQueue
+from contextlib import contextmanager
+from typing import Iterator
 import numpy as np
 
+SNDLIB_NS = '{http://sndlib.zib.de/network}'
+
+# Zero load of links not yet attached to loads of a network
+NO_LOADS = np.zeros(1)
+NO_LOADS.setflags(write=False)
+
+
+def mask_token(mask: np.ndarray) -> bytes:
+    """
+Returns hashable token of contents of link `mask`, equal for masks with
+equal contents even if they are different arrays, None for no mask
+    """
+    if mask is None:
+        return None
+    return np.packbits(mask).tobytes()
+
 
 class Node:
     """
 Node of a network.\n
-Contains `id` and a list `links` containing ids of links it belongs to.\n
-Two nodes are equal if their `id`s are equal and
-their `links` contain the same ids
+Contains `id` and a tuple `links` containing ids of links it belongs to,
+extended only with `add_link` while the network is built.\n
+Two nodes are equal if their `id`s are equal, `same_structure` also
+compares their `links`. `id` and `links` can not be changed.
     """
+    __slots__ = ('_id', '_links', 'comp')
+
     def __init__(self, id: int) -> None:
-        self.id = id
-        self.links = list[int]()
+        self._id = id
+        self._links = tuple[int, ...]()
         self.comp = 0   # To make custom comparisions e.g. with PriorityQueue
 
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def links(self) -> tuple[int, ...]:
+        return self._links
+
     def add_link(self, link_id: int) -> None:
-        if link_id not in self.links:
-            self.links.append(link_id)
+        if link_id not in self._links:
+            self._links += (link_id,)
 
-    def __eq__(self, other: 'Node') -> bool:
+    def same_structure(self, other: 'Node') -> bool:
         if len(self.links) != len(other.links):
             return False
 
@@ -30,8 +60,18 @@ their `links` contain the same ids
 
         return self.id == other.id
 
+    def __eq__(self, other: 'Node') -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.id == other.id
+
     def __ne__(self, other: 'Node') -> bool:
-        return not self == other
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.id != other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
 
     def __lt__(self, other):
         return self.comp < other.comp
@@ -41,18 +81,52 @@ class Link:
     """
 Link between nodes of a network.\n
 Consists of tuple `ends` containing ids of nodes
-on both ends of the link, `capacity` and `cost`\n
-Two links are equal if values of their `id`, `capacity` and `cost` are equal,
-and their `ends` contain the same ids.
+on both ends of the link, `capacity` and `cost`, which can not be changed\n
+Two links are equal if their `id`s are equal, `same_structure` checks
+whether values of their `id`, `capacity` and `cost` are equal,
+and their `ends` contain the same ids.\n
+`load` is kept in element `load_index` of array `loads`, shared by all links
+of a network. Links outside of a network share read-only `NO_LOADS` until
+their load is set.
     """
+    __slots__ = ('_id', '_ends', '_capacity', '_cost', 'loads', 'load_index')
+
     def __init__(self, self_id: int, end1_id: int, end2_id: int,
                  capacity: float, cost: float)\
             -> None:
-        self.id = self_id
-        self.ends = (end1_id, end2_id)
-        self.capacity = capacity
-        self.load = 0
-        self.cost = cost
+        self._id = self_id
+        self._ends = (end1_id, end2_id)
+        self._capacity = capacity
+        self.loads = NO_LOADS
+        self.load_index = 0
+        self._cost = cost
+
+    # Read-only, writes of other attributes are not slowed down by checks
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def ends(self) -> tuple[int, int]:
+        return self._ends
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    @property
+    def cost(self) -> float:
+        return self._cost
+
+    @property
+    def load(self) -> float:
+        return self.loads.item(self.load_index)
+
+    @load.setter
+    def load(self, value: float) -> None:
+        if self.loads is NO_LOADS:
+            self.loads = np.zeros(1)
+        self.loads[self.load_index] = value
 
     def get_other_end(self, end: int) -> int:
         if end == self.ends[0]:
@@ -65,7 +139,7 @@ and their `ends` contain the same ids.
         return -log10((self.capacity - self.load)/self.capacity) # Negative to turn log() into a positive value, for it to be processed by Dijkstra
         #return self.cost
 
-    def __eq__(self, other: 'Link') -> bool:
+    def same_structure(self, other: 'Link') -> bool:
         return ((self.ends[0] == other.ends[0] and
                  self.ends[1] == other.ends[1]) or
                 (self.ends[0] == other.ends[1] and
@@ -74,8 +148,18 @@ and their `ends` contain the same ids.
                self.cost == other.cost and\
                self.id == other.id
 
+    def __eq__(self, other: 'Link') -> bool:
+        if not isinstance(other, Link):
+            return NotImplemented
+        return self.id == other.id
+
     def __ne__(self, other: 'Link') -> bool:
-        return not self == other
+        if not isinstance(other, Link):
+            return NotImplemented
+        return self.id != other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
 
     def __str__(self):
         return f"Link {self.id} between {self.ends[0]} and {self.ends[1]}, capacity: {self.capacity}, cost: {self.cost}"
@@ -87,7 +171,16 @@ Network of nodes connected by symmetrical links\n
 Contains `nodes` and `links` lists containing all
 nodes and links of the network.\n
 Contains `nodes_ids_map` and `links_ids_map` lists, allowing
-to return from internal, numerical ids to original string ids.
+to return from internal, numerical ids to original string ids.\n
+Loads of all links are kept in `loads` array, changed in place only.
+Load changes made through `change_links_load`, bulk operations or announced
+with `notify_load_change` increase `load_epoch`, record it in
+`links_epochs` of changed links and are reported to callables in
+`load_listeners`, so that structures derived from loads can refresh only
+what the change affected. `snapshot_loads` and `restore_loads` save and
+bring back loads of all links for what-if runs.\n
+If `link_mask` is set, links for which it is False are skipped by solvers
+and shortest paths calculations, without copying the network.
     """
     def __init__(self, nodes_ids: list[str],
                  links_data: list[tuple[str, str, str, float, float]]) -> None:
@@ -120,6 +213,114 @@ to return from internal, numerical ids to original string ids.
                 link_int_id += 1
         self.links = np.asarray(self.links)
 
+        # Capacities can not change, so they are kept as a read-only array
+        self.links_capacities = np.asarray(
+            [link.capacity for link in self.links], dtype=float)
+        self.links_capacities.setflags(write=False)
+        self.loads = np.zeros(len(self.links))
+        for link in self.links:
+            link.loads = self.loads
+            link.load_index = link.id
+
+        self.load_epoch = 0
+        # Epoch of the last change of load of every link
+        self.links_epochs = np.zeros(len(self.links), dtype=np.int64)
+        self.load_listeners = []
+        self.link_mask = None
+        self.residual_capacity_index = None
+        self.result_cache = None
+
+    def change_links_load(self, link_ids: list[int], delta: float) -> None:
+        """
+Adds `delta` to load of every link in `link_ids`, a link listed more than
+once receives `delta` once for each occurrence.\n
+Every listener in `load_listeners` is then called with `link_ids`.
+        """
+        links_indices = np.asarray(link_ids, dtype=np.intp)
+        np.add.at(self.loads, links_indices, delta)
+        if delta < 0:
+            # Rounding errors of repeated releases must not leave negative
+            # loads, their -log10 costs would be negative
+            self.loads[links_indices] = \
+                np.maximum(self.loads[links_indices], 0.0)
+        self.notify_load_change(link_ids)
+
+    def notify_load_change(self, link_ids: list[int] = None) -> None:
+        """
+Increases `load_epoch` and calls every listener in `load_listeners` with
+`link_ids`. Needs to be called after loads of links were set directly,
+`None` stands for all links of the network.
+        """
+        if link_ids is None:
+            link_ids = list(range(len(self.links)))
+        self.load_epoch += 1
+        self.links_epochs[np.asarray(link_ids, dtype=np.intp)] =\
+            self.load_epoch
+        for listener in self.load_listeners:
+            listener(link_ids)
+
+    def changed_links(self, epoch: int) -> np.ndarray:
+        """
+Returns mask of links whose load changed after `epoch`
+        """
+        return self.links_epochs > epoch
+
+    def capacities(self) -> np.ndarray:
+        return self.links_capacities
+
+    def set_loads(self, loads: np.ndarray) -> None:
+        """
+Sets loads of all links, reporting only links whose load changed
+        """
+        loads = np.asarray(loads, dtype=float)
+        changed = np.flatnonzero(self.loads != loads)
+        self.loads[:] = loads
+        if len(changed) > 0:
+            self.notify_load_change(changed.tolist())
+
+    def get_loads(self) -> np.ndarray:
+        return self.loads.copy()
+
+    def reset_loads(self) -> None:
+        self.set_loads(np.zeros(len(self.links)))
+
+    def randomize_loads(self, fraction_min: float, fraction_max: float,
+                        rng=None) -> None:
+        """
+Sets load of every link to a fraction of its capacity drawn uniformly
+between `fraction_min` and `fraction_max`
+        """
+        rng = np.random.default_rng(rng)
+        capacities = self.capacities()
+        self.set_loads(rng.uniform(fraction_min * capacities,
+                                   fraction_max * capacities))
+
+    def snapshot_loads(self) -> np.ndarray:
+        return self.get_loads()
+
+    def restore_loads(self, snapshot: np.ndarray) -> None:
+        self.set_loads(snapshot)
+
+    @contextmanager
+    def masked_view(self, mask: np.ndarray):
+        """
+Context in which only links with True in `mask` are visible to solvers
+        """
+        previous_mask = self.link_mask
+        self.link_mask = mask
+        try:
+            yield self
+        finally:
+            self.link_mask = previous_mask
+
+    def capacity_mask(self, demand: float) -> np.ndarray:
+        """
+Returns mask of links with residual capacity not lower than `demand`
+        """
+        if self.residual_capacity_index is None:
+            self.residual_capacity_index = ResidualCapacityIndex(self)
+        return self.residual_capacity_index.mask(demand)
+
     def get_node_id_str_list(self) -> list[str]:
         list = []
         for index, node in enumerate(self.nodes):
@@ -141,13 +342,11 @@ to return from internal, numerical ids to original string ids.
 
     def get_network_copy(self) -> "Network":
         network = Network(self.get_node_id_str_list(), self.get_link_data_list())
-
-        for index, link in enumerate(network.links):
-            link.load = self.links[index].load
-
+        network.loads[:] = self.loads
         return network
 
     def nodes_min_distance(self) -> list[list[float]]:
+        mask = self.link_mask
         min_dist = []
         MORE_THAN_LONGEST_PATH =\
             max([link.cost for link in self.links]) * len(self.links) + 1
@@ -165,6 +364,8 @@ to return from internal, numerical ids to original string ids.
                 node = q.get()
 
                 for link_id in node.links:
+                    if mask is not None and not mask[link_id]:
+                        continue
                     link = self.links[link_id]
                     new_dist = min_dist[start_node.id][node.id] + link.cost
 
@@ -175,6 +376,245 @@ to return from internal, numerical ids to original string ids.
         return min_dist
 
 
+class ResidualCapacityIndex:
+    """
+Index of residual capacities of links of a network, kept sorted.\n
+Mask of links able to bear a demand is found with a binary search over
+sorted residual capacities: it holds links with residual capacity above
+`t`, the highest residual capacity lower than the demand, so demands falling
+between the same two residual capacities share one mask. Up to `max_masks`
+masks are kept under their `t` in LRU order, as read-only arrays.\n
+The index is brought up to date lazily, when `load_epoch` of the network is
+different than the one it was updated at, and only for links whose load
+changed since then. Cached masks whose contents do not change are kept as
+the same objects, others are replaced by updated copies.
+    """
+    def __init__(self, network: Network, max_masks: int = 64) -> None:
+        self.network = network
+        self.max_masks = max_masks
+        self.residuals = network.capacities() - network.loads
+        self.sorted_residuals = np.sort(self.residuals)
+        self.epoch = network.load_epoch
+        self.masks = OrderedDict[float, np.ndarray]()
+
+    def update(self) -> None:
+        changed = np.flatnonzero(self.network.changed_links(self.epoch))
+        self.epoch = self.network.load_epoch
+        new_residuals = self.network.capacities()[changed] -\
+            self.network.loads[changed]
+        moved = self.residuals[changed] != new_residuals
+        changed = changed[moved]
+        if len(changed) == 0:
+            return
+        new_residuals = new_residuals[moved]
+
+        # Old values are removed from the sorted array one occurrence each,
+        # equal values at consecutive positions
+        old_residuals = np.sort(self.residuals[changed])
+        positions = np.searchsorted(self.sorted_residuals, old_residuals) +\
+            np.arange(len(old_residuals)) -\
+            np.searchsorted(old_residuals, old_residuals)
+        remaining = np.delete(self.sorted_residuals, positions)
+        inserted = np.sort(new_residuals)
+        self.sorted_residuals = np.insert(
+            remaining, np.searchsorted(remaining, inserted), inserted)
+        self.residuals[changed] = new_residuals
+
+        for threshold, mask in list(self.masks.items()):
+            fits = new_residuals > threshold
+            if np.any(mask[changed] != fits):
+                mask = mask.copy()
+                mask[changed] = fits
+                mask.setflags(write=False)
+                self.masks[threshold] = mask
+
+    def mask(self, demand: float) -> np.ndarray:
+        if self.epoch != self.network.load_epoch:
+            self.update()
+        bucket = int(np.searchsorted(self.sorted_residuals, demand, 'left'))
+        threshold = float(self.sorted_residuals[bucket - 1]) if bucket > 0\
+            else -float('inf')
+        mask = self.masks.get(threshold)
+        if mask is not None:
+            self.masks.move_to_end(threshold)
+            return mask
+        mask = self.residuals > threshold
+        mask.setflags(write=False)
+        self.masks[threshold] = mask
+        if len(self.masks) > self.max_masks:
+            self.masks.popitem(last=False)
+        return mask
+
+
+class CachedResult:
+    """
+Paths found for a demand, stored in `ResultCache`.\n
+Along with `paths` contains set of ids of `links` they use, number of links
+`shared` by both paths, `free_fraction` - product of free capacity fractions
+of links of the lowest load path, size of the demand (`load`, None if it was
+routed without a capacity view) and `load_epoch` the paths were found at.
+    """
+    def __init__(self, paths: list[list[int]], network: Network,
+                 load: float) -> None:
+        self.paths = paths
+        self.load = load
+        self.load_epoch = network.load_epoch
+        self.links = set[int]()
+        self.shared = 0
+        self.free_fraction = 0.0
+        if paths is not None:
+            self.links = set(paths[0]) | set(paths[1])
+            self.shared = len(set(paths[0]) & set(paths[1]))
+            self.free_fraction = 1.0
+            for link_id in paths[1]:
+                link = network.links[link_id]
+                self.free_fraction *= (link.capacity - link.load)/link.capacity
+
+
+class ValueIndex:
+    """
+Keys ordered by values, so that keys with values in a range are found with
+a binary search
+    """
+    def __init__(self) -> None:
+        self.values = list[float]()
+        self.keys = list[tuple]()
+
+    def add(self, value: float, key: tuple) -> None:
+        index = bisect_right(self.values, value)
+        self.values.insert(index, value)
+        self.keys.insert(index, key)
+
+    def remove(self, value: float, key: tuple) -> None:
+        index = bisect_left(self.values, value)
+        while self.keys[index] != key:
+            index += 1
+        del self.values[index]
+        del self.keys[index]
+
+    def below(self, value: float) -> list[tuple]:
+        return self.keys[:bisect_left(self.values, value)]
+
+    def between(self, low: float, high: float) -> list[tuple]:
+        """
+Returns keys with values above `low`, up to `high`
+        """
+        return self.keys[bisect_right(self.values, low):
+                         bisect_right(self.values, high)]
+
+
+class ResultCache:
+    """
+Bounded cache of paths found for demands in a network.\n
+Keys identify end nodes, solver with its parameters and size of a demand,
+results are kept as `CachedResult` along with the `load_epoch` they were
+found at. Least recently used results are evicted when there are more than
+`max_size` of them.\n
+A load change on a link evicts only results whose paths use the link and,
+if its load decreased, results it could improve - ones with shared links,
+ones whose lowest load path has lower free capacity fraction than the link
+alone, ones for which the link started to fit the demand and, if the link
+stopped being full, ones without a solution routed without a demand.
+Results are indexed by links of their paths, by their free fractions and by
+their demands, so a change touches only results it can affect.
+    """
+    def __init__(self, network: Network, max_size: int = 4096) -> None:
+        self.network = network
+        self.max_size = max_size
+        self.results = OrderedDict[tuple, CachedResult]()
+        self.links_results = [set[tuple]() for _ in network.links]
+        # Results with shared links, and without a solution and a demand
+        self.shared_results = set[tuple]()
+        self.unsolved_results = set[tuple]()
+        self.free_fractions_index = ValueIndex()
+        self.loads_index = ValueIndex()
+        self.residuals = [link.capacity - link.load for link in network.links]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        network.load_listeners.append(self.on_load_change)
+
+    def get(self, key: tuple) -> CachedResult:
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.results.move_to_end(key)
+        return result
+
+    def put(self, key: tuple, paths: list[list[int]], load: float = None)\
+            -> CachedResult:
+        if key in self.results:
+            self.remove(key)
+        result = CachedResult(paths, self.network, load)
+        self.results[key] = result
+        for link_id in result.links:
+            self.links_results[link_id].add(key)
+        if result.paths is None:
+            if result.load is None:
+                self.unsolved_results.add(key)
+        elif result.shared > 0:
+            self.shared_results.add(key)
+        else:
+            self.free_fractions_index.add(result.free_fraction, key)
+        if result.load is not None:
+            self.loads_index.add(result.load, key)
+        while len(self.results) > self.max_size:
+            self.remove(next(iter(self.results)))
+            self.evictions += 1
+        return result
+
+    def remove(self, key: tuple) -> None:
+        result = self.results.pop(key)
+        for link_id in result.links:
+            self.links_results[link_id].discard(key)
+        if result.paths is None:
+            if result.load is None:
+                self.unsolved_results.discard(key)
+        elif result.shared > 0:
+            self.shared_results.discard(key)
+        else:
+            self.free_fractions_index.remove(result.free_fraction, key)
+        if result.load is not None:
+            self.loads_index.remove(result.load, key)
+
+    def on_load_change(self, link_ids: list[int]) -> None:
+        improved_keys = set[tuple]()
+        for link_id in set(link_ids):
+            link = self.network.links[link_id]
+            old_residual = self.residuals[link_id]
+            new_residual = link.capacity - link.load
+            self.residuals[link_id] = new_residual
+            for key in list(self.links_results[link_id]):
+                self.remove(key)
+                self.invalidations += 1
+            if new_residual <= old_residual:
+                continue
+            improved_keys.update(self.shared_results)
+            improved_keys.update(self.free_fractions_index.below(
+                new_residual/link.capacity))
+            improved_keys.update(self.loads_index.between(old_residual,
+                                                          new_residual))
+            if old_residual <= 0:
+                improved_keys.update(self.unsolved_results)
+
+        for key in improved_keys:
+            if key in self.results:
+                self.remove(key)
+                self.invalidations += 1
+
+    def stats(self) -> dict[str, float]:
+        requests_count = self.hits + self.misses
+        return {'size': len(self.results),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits/requests_count if requests_count else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations}
+
+
 def parse_xml(path: str)\
         -> tuple[list[str], list[tuple[str, str, str, float, float]]]:
     """
@@ -197,3 +637,24 @@ capacity_of_link, cost_of_link
         links_data.append((link.get('id'), source.text, target.text,
                            float(capacity.text), float(cost.text)))
     return(nodes_data, links_data)
+
+
+def parse_demands(path: str) -> Iterator[tuple[str, str, str, float]]:
+    """
+Yields demands of SNDlib XML file `path` as tuples of id of the demand, id
+of its source node, id of its target node and its value.\n
+The file is parsed incrementally and demands already yielded are dropped
+from the parsed tree, so memory use does not grow with their number.
+    """
+    demands = None
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        if element.tag == SNDLIB_NS + 'demands':
+            demands = element if event == 'start' else None
+            continue
+        if event != 'end' or element.tag != SNDLIB_NS + 'demand':
+            continue
+        yield (element.get('id'), element.find(SNDLIB_NS + 'source').text,
+               element.find(SNDLIB_NS + 'target').text,
+               float(element.find(SNDLIB_NS + 'demandValue').text))
+        if demands is not None:
+            demands.clear()
@@ -1,6 +1,7 @@
 from unittest.case import expectedFailure
 import network as net
 from os.path import normpath, join
+import numpy as np
 import unittest
 
 
@@ -25,18 +26,18 @@ class TestNode(unittest.TestCase):
     def test_add_new_link(self):
         test_node = net.Node(0)
 
-        self.assertListEqual(test_node.links, [])
+        self.assertTupleEqual(test_node.links, ())
 
         test_node.add_link(0)
         test_node.add_link(1)
         test_node.add_link(2)
 
-        self.assertListEqual(test_node.links, [0, 1, 2])
+        self.assertTupleEqual(test_node.links, (0, 1, 2))
 
     def test_add_existing_link(self):
         test_node = net.Node(0)
 
-        self.assertListEqual(test_node.links, [])
+        self.assertTupleEqual(test_node.links, ())
 
         test_node.add_link(0)
         test_node.add_link(1)
@@ -45,7 +46,7 @@ class TestNode(unittest.TestCase):
         test_node.add_link(1)
         test_node.add_link(0)
 
-        self.assertListEqual(test_node.links, [0, 1, 2])
+        self.assertTupleEqual(test_node.links, (0, 1, 2))
 
     def test___eq___the_same(self):
         test_node = net.Node(0)
@@ -124,8 +125,7 @@ class TestNode(unittest.TestCase):
 
         self.assertNotEqual(test_node1, test_node2)
 
-    @expectedFailure
-    def test___eq___not_equal_links_different_contents(self):
+    def test___eq___equal_ids_links_different_contents(self):
         test_node1 = net.Node(0)
         test_node2 = net.Node(0)
 
@@ -137,19 +137,36 @@ class TestNode(unittest.TestCase):
         test_node2.add_link(1)
 
         self.assertEqual(test_node1, test_node2)
+        self.assertEqual(hash(test_node1), hash(test_node2))
 
-    def test___ne___not_equal_links_different_contents(self):
+    def test_same_structure(self):
         test_node1 = net.Node(0)
         test_node2 = net.Node(0)
+        test_node3 = net.Node(1)
 
         test_node1.add_link(0)
         test_node1.add_link(1)
         test_node1.add_link(2)
 
+        test_node2.add_link(2)
         test_node2.add_link(0)
         test_node2.add_link(1)
 
-        self.assertNotEqual(test_node1, test_node2)
+        test_node3.add_link(0)
+        test_node3.add_link(1)
+        test_node3.add_link(2)
+
+        self.assertTrue(test_node1.same_structure(test_node2))
+        self.assertFalse(test_node1.same_structure(test_node3))
+        test_node2.add_link(3)
+        self.assertFalse(test_node1.same_structure(test_node2))
+
+    def test_id_is_frozen(self):
+        test_node = net.Node(0)
+        with self.assertRaises(AttributeError):
+            test_node.id = 1
+        with self.assertRaises(AttributeError):
+            test_node.other = 1
 
 
 class TestLink(unittest.TestCase):
@@ -197,46 +214,55 @@ class TestLink(unittest.TestCase):
         test_link2 = net.Link(1, 0, 1, 0, 0)
         self.assertNotEqual(test_link1, test_link2)
 
-    @expectedFailure
-    def test___eq___not_equal_different_costs(self):
+    def test___eq___equal_ids_different_fields(self):
         test_link1 = net.Link(0, 0, 1, 0, 0)
-        test_link2 = net.Link(0, 0, 1, 0, 1)
+        test_link2 = net.Link(0, 2, 3, 1, 1)
         self.assertEqual(test_link1, test_link2)
+        self.assertEqual(hash(test_link1), hash(test_link2))
 
-    def test___ne___not_equal_different_costs(self):
+    def test_same_structure_different_costs(self):
         test_link1 = net.Link(0, 0, 1, 0, 0)
         test_link2 = net.Link(0, 0, 1, 0, 1)
-        self.assertNotEqual(test_link1, test_link2)
+        self.assertFalse(test_link1.same_structure(test_link2))
 
-    @expectedFailure
-    def test___eq___not_equal_different_capacities(self):
+    def test_same_structure_different_capacities(self):
         test_link1 = net.Link(0, 0, 1, 0, 0)
         test_link2 = net.Link(0, 0, 1, 1, 0)
-        self.assertEqual(test_link1, test_link2)
+        self.assertFalse(test_link1.same_structure(test_link2))
 
-    def test___ne___not_equal_different_capacities(self):
-        test_link1 = net.Link(0, 0, 1, 0, 0)
-        test_link2 = net.Link(0, 0, 1, 1, 0)
-        self.assertNotEqual(test_link1, test_link2)
-
-    @expectedFailure
-    def test___eq___not_equal_different_ends(self):
+    def test_same_structure_different_ends(self):
         test_link1 = net.Link(0, 0, 1, 0, 0)
         test_link2 = net.Link(0, 0, 2, 0, 0)
         test_link3 = net.Link(0, 2, 1, 0, 0)
         test_link4 = net.Link(0, 2, 3, 0, 0)
-        self.assertEqual(test_link1, test_link2)
-        self.assertEqual(test_link1, test_link3)
-        self.assertEqual(test_link1, test_link4)
+        self.assertFalse(test_link1.same_structure(test_link2))
+        self.assertFalse(test_link1.same_structure(test_link3))
+        self.assertFalse(test_link1.same_structure(test_link4))
 
-    def test___ne___not_equal_different_ends(self):
+    def test_same_structure_switched_ends(self):
         test_link1 = net.Link(0, 0, 1, 0, 0)
-        test_link2 = net.Link(0, 0, 2, 0, 0)
-        test_link3 = net.Link(0, 2, 1, 0, 0)
-        test_link4 = net.Link(0, 2, 3, 0, 0)
-        self.assertNotEqual(test_link1, test_link2)
-        self.assertNotEqual(test_link1, test_link3)
-        self.assertNotEqual(test_link1, test_link4)
+        test_link2 = net.Link(0, 1, 0, 0, 0)
+        test_link3 = net.Link(1, 1, 0, 0, 0)
+        self.assertTrue(test_link1.same_structure(test_link2))
+        self.assertFalse(test_link1.same_structure(test_link3))
+
+    def test_topology_is_frozen(self):
+        test_link = net.Link(0, 0, 1, 10.0, 1.0)
+        for name, value in (('id', 1), ('ends', (1, 2)), ('capacity', 5.0),
+                            ('cost', 2.0)):
+            with self.assertRaises(AttributeError):
+                setattr(test_link, name, value)
+        self.assertEqual(test_link.load, 0.0)
+        test_link.load = 4.0
+        self.assertEqual(test_link.load, 4.0)
+        self.assertEqual(net.Link(1, 0, 1, 10.0, 1.0).load, 0.0)
+
+        test_node = net.Node(0)
+        test_node.add_link(0)
+        with self.assertRaises(AttributeError):
+            test_node.links = (1,)
+        with self.assertRaises(AttributeError):
+            test_node.links.append(1)
 
 
 class TestNetwork(unittest.TestCase):
@@ -287,3 +313,228 @@ the links_data')
                               [test_network.links[1].id,
                                test_network.links[2].id,
                                test_network.links[4].id])
+
+    def test_change_links_load(self):
+        nodes_data = ['Aachen', 'Augsburg', 'Bayreuth', 'Berlin']
+        links_data = [('L1', 'Aachen', 'Augsburg', 40.0, 3290.0),
+                      ('L2', 'Berlin', 'Augsburg', 50.0, 2290.0),
+                      ('L3', 'Berlin', 'Bayreuth', 45.0, 4000.0)]
+        test_network = net.Network(nodes_data, links_data)
+        changes = []
+        test_network.load_listeners.append(changes.append)
+
+        test_network.change_links_load([0, 2, 2], 5.0)
+
+        self.assertListEqual([link.load for link in test_network.links],
+                             [5.0, 0, 10.0])
+        self.assertEqual(test_network.load_epoch, 1)
+        self.assertListEqual(changes, [[0, 2, 2]])
+
+    def test_bulk_loads(self):
+        nodes_data = ['Aachen', 'Augsburg', 'Bayreuth', 'Berlin']
+        links_data = [('L1', 'Aachen', 'Augsburg', 40.0, 3290.0),
+                      ('L2', 'Berlin', 'Augsburg', 50.0, 2290.0),
+                      ('L3', 'Berlin', 'Bayreuth', 45.0, 4000.0)]
+        test_network = net.Network(nodes_data, links_data)
+        changes = []
+        test_network.load_listeners.append(changes.append)
+
+        test_network.set_loads([4.0, 0.0, 9.0])
+        snapshot = test_network.snapshot_loads()
+        epoch = test_network.load_epoch
+        test_network.links[1].load = 5.0
+        test_network.notify_load_change([1])
+
+        self.assertListEqual([link.load for link in test_network.links],
+                             [4.0, 5.0, 9.0])
+        self.assertListEqual(test_network.changed_links(epoch).tolist(),
+                             [False, True, False])
+        self.assertListEqual(test_network.changed_links(0).tolist(),
+                             [True, True, True])
+
+        test_network.restore_loads(snapshot)
+
+        self.assertListEqual(test_network.get_loads().tolist(),
+                             [4.0, 0.0, 9.0])
+        self.assertListEqual(changes, [[0, 2], [1], [1]])
+        self.assertEqual(test_network.load_epoch, 3)
+        self.assertIsNot(snapshot, test_network.loads)
+
+    def test_randomize_loads(self):
+        nodes_data = ['Aachen', 'Augsburg', 'Bayreuth', 'Berlin']
+        links_data = [('L1', 'Aachen', 'Augsburg', 40.0, 3290.0),
+                      ('L2', 'Berlin', 'Augsburg', 50.0, 2290.0),
+                      ('L3', 'Berlin', 'Bayreuth', 45.0, 4000.0)]
+        test_network = net.Network(nodes_data, links_data)
+
+        test_network.randomize_loads(0.4, 0.6, 1)
+
+        fractions = test_network.loads / test_network.capacities()
+        self.assertTrue(np.all((fractions >= 0.4) & (fractions <= 0.6)))
+        self.assertTrue(np.all(test_network.changed_links(0)))
+
+        test_network.reset_loads()
+        self.assertListEqual([link.load for link in test_network.links],
+                             [0.0, 0.0, 0.0])
+
+    def test_capacity_mask(self):
+        nodes_data = ['Aachen', 'Augsburg', 'Bayreuth', 'Berlin']
+        links_data = [('L1', 'Aachen', 'Augsburg', 40.0, 3290.0),
+                      ('L2', 'Berlin', 'Augsburg', 50.0, 2290.0),
+                      ('L3', 'Berlin', 'Bayreuth', 45.0, 4000.0),
+                      ('L4', 'Aachen', 'Bayreuth', 60.0, 1290.0)]
+        test_network = net.Network(nodes_data, links_data)
+        test_network.change_links_load([1], 30.0)
+
+        self.assertListEqual(test_network.capacity_mask(40.0).tolist(),
+                             [True, False, True, True])
+        self.assertListEqual(test_network.capacity_mask(45.0).tolist(),
+                             [False, False, True, True])
+        self.assertListEqual(test_network.capacity_mask(0.0).tolist(),
+                             [True, True, True, True])
+
+        test_network.change_links_load([1], -30.0)
+        self.assertListEqual(test_network.capacity_mask(45.0).tolist(),
+                             [False, True, True, True])
+
+    def test_capacity_mask_updated_incrementally(self):
+        nodes_data = ['Aachen', 'Augsburg', 'Bayreuth', 'Berlin']
+        links_data = [('L1', 'Aachen', 'Augsburg', 40.0, 3290.0),
+                      ('L2', 'Berlin', 'Augsburg', 50.0, 2290.0),
+                      ('L3', 'Berlin', 'Bayreuth', 45.0, 4000.0),
+                      ('L4', 'Aachen', 'Bayreuth', 60.0, 1290.0)]
+        test_network = net.Network(nodes_data, links_data)
+        mask = test_network.capacity_mask(42.0)
+
+        # Mask of demands between the same residual capacities is shared,
+        # and kept while load changes do not change its contents
+        self.assertIs(test_network.capacity_mask(41.0), mask)
+        test_network.change_links_load([1], 5.0)
+        self.assertIs(test_network.capacity_mask(42.0), mask)
+        self.assertFalse(mask.flags.writeable)
+
+        test_network.change_links_load([1], 5.0)
+        updated_mask = test_network.capacity_mask(42.0)
+        self.assertIsNot(updated_mask, mask)
+        self.assertListEqual(updated_mask.tolist(),
+                             [False, False, True, True])
+        self.assertListEqual(mask.tolist(), [False, True, True, True])
+
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            link_ids = rng.choice(4, rng.integers(1, 4)).tolist()
+            test_network.change_links_load(link_ids, rng.uniform(-20, 20))
+            residuals = test_network.capacities() - test_network.loads
+            for demand in (0.0, 10.0, 30.0, 45.0, 70.0):
+                self.assertListEqual(
+                    test_network.capacity_mask(demand).tolist(),
+                    (residuals >= demand).tolist())
+            self.assertListEqual(
+                test_network.residual_capacity_index.sorted_residuals
+                .tolist(), np.sort(residuals).tolist())
+
+    def test_masked_view(self):
+        nodes_data = ['Aachen', 'Augsburg', 'Bayreuth', 'Berlin']
+        links_data = [('L1', 'Aachen', 'Augsburg', 40.0, 1.0),
+                      ('L2', 'Berlin', 'Augsburg', 50.0, 1.0),
+                      ('L3', 'Aachen', 'Berlin', 45.0, 1.0)]
+        test_network = net.Network(nodes_data, links_data)
+        mask = np.asarray([True, True, False])
+
+        with test_network.masked_view(mask):
+            self.assertIs(test_network.link_mask, mask)
+            min_dist = test_network.nodes_min_distance()
+        self.assertIsNone(test_network.link_mask)
+
+        self.assertEqual(min_dist[0][3], 2.0)
+        self.assertEqual(test_network.nodes_min_distance()[0][3], 1.0)
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        nodes_data = ['Aachen', 'Augsburg', 'Bayreuth', 'Berlin']
+        links_data = [('L1', 'Aachen', 'Augsburg', 40.0, 3290.0),
+                      ('L2', 'Berlin', 'Augsburg', 50.0, 2290.0),
+                      ('L3', 'Berlin', 'Bayreuth', 45.0, 4000.0),
+                      ('L4', 'Aachen', 'Bayreuth', 60.0, 1290.0),
+                      ('L5', 'Aachen', 'Berlin', 50.0, 4500.0)]
+        self.test_network = net.Network(nodes_data, links_data)
+        self.test_network.change_links_load([0, 1, 2, 3, 4], 20.0)
+        self.cache = net.ResultCache(self.test_network, max_size=2)
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', [[4], [0, 1]])
+
+        result = self.cache.get('a')
+
+        self.assertListEqual(result.paths, [[4], [0, 1]])
+        self.assertSetEqual(result.links, {0, 1, 4})
+        self.assertEqual(result.shared, 0)
+        self.assertAlmostEqual(result.free_fraction, 0.5 * 0.6)
+        self.assertEqual(self.cache.stats()['hit_rate'], 0.5)
+
+    def test_least_recently_used_evicted(self):
+        self.cache.put('a', [[4], [0, 1]])
+        self.cache.put('b', [[4], [3, 2]])
+        self.cache.get('a')
+        self.cache.put('c', [[4], [3, 2]])
+
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_load_increase_evicts_only_results_using_link(self):
+        self.cache.put('a', [[4], [0, 1]])
+        self.cache.put('b', [[3], [3, 2]])
+
+        self.test_network.change_links_load([1], 5.0)
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('b'))
+
+    def test_load_decrease_evicts_results_link_could_improve(self):
+        self.cache.put('a', [[4], [1]])
+        self.cache.put('b', [[2], [3]], load=25.0)
+
+        # Free fraction of L1 becomes 0.625, more than of lowest load path
+        # of 'a', its residual capacity starts to fit demand of 'b'
+        self.test_network.change_links_load([0], -5.0)
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_load_decrease_keeps_results_link_cannot_improve(self):
+        self.cache.put('a', [[4], [1]])
+        self.cache.put('b', [[2], [3]], load=10.0)
+
+        # Free fraction of L1 becomes 0.625, less than of lowest load path
+        # of 'b', which was already able to use it
+        self.test_network.change_links_load([0], -5.0)
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('b'))
+
+    def test_load_decrease_touches_only_indexed_results(self):
+        self.cache.max_size = 8
+        self.cache.put('a', None, load=35.0)
+        self.cache.put('b', None, load=25.0)
+        self.cache.put('c', [[4], [4]])
+        self.cache.put('d', None)
+
+        # Residual capacity of L1 rises from 20 to 30, it starts to fit
+        # demand of 'b' only, and it was not full
+        self.test_network.change_links_load([0], -10.0)
+
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNone(self.cache.get('c'))
+        self.assertIsNotNone(self.cache.get('d'))
+
+        self.test_network.change_links_load([2], 25.0)
+        self.cache.put('d', None)
+        self.test_network.change_links_load([2], -5.0)
+
+        self.assertIsNone(self.cache.get('d'))
+        self.assertIsNotNone(self.cache.get('a'))
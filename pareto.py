@@ -0,0 +1,68 @@
+from bisect import bisect_left, bisect_right
+
+
+class ParetoArchive:
+    """
+Archive of non-dominated solutions of a problem with three minimized
+objectives: number of shared links, distance cost and capacity cost.\n
+Solutions are grouped by number of shared links. In every group they form
+a staircase - sorted by increasing distance cost, with capacity cost
+strictly decreasing - so both checking if a new solution is dominated and
+removing solutions it dominates take a binary search per group.\n
+Solutions equal in all objectives to an archived one are not added.
+    """
+    def __init__(self) -> None:
+        # shared links count -> (distance costs, negated capacity costs, items)
+        self.groups = dict[int, tuple[list[float], list[float], list]]()
+        self.added_count = 0
+
+    def __len__(self) -> int:
+        return sum(len(group[0]) for group in self.groups.values())
+
+    def add(self, shared: int, distance_cost: float, capacity_cost: float,
+            item) -> bool:
+        """
+Adds `item` with given objectives, unless it is dominated by an already
+archived one. Returns True if it was added
+        """
+        for group_shared, (distances, neg_capacities, _)\
+                in self.groups.items():
+            if group_shared > shared:
+                continue
+            # Among solutions not longer than the new one, the last one has
+            # the lowest capacity cost
+            index = bisect_right(distances, distance_cost) - 1
+            if index >= 0 and -neg_capacities[index] <= capacity_cost:
+                return False
+
+        for group_shared, (distances, neg_capacities, items)\
+                in self.groups.items():
+            if group_shared < shared:
+                continue
+            first = bisect_left(distances, distance_cost)
+            last = bisect_right(neg_capacities, -capacity_cost, first)
+            del distances[first:last]
+            del neg_capacities[first:last]
+            del items[first:last]
+
+        distances, neg_capacities, items =\
+            self.groups.setdefault(shared, ([], [], []))
+        index = bisect_left(distances, distance_cost)
+        distances.insert(index, distance_cost)
+        neg_capacities.insert(index, -capacity_cost)
+        items.insert(index, item)
+        self.added_count += 1
+        return True
+
+    def front(self) -> list[tuple[tuple[int, float, float], object]]:
+        """
+Returns list of ((shared, distance cost, capacity cost), item) of archived
+solutions, sorted by their objectives
+        """
+        front = []
+        for shared in sorted(self.groups):
+            distances, neg_capacities, items = self.groups[shared]
+            for distance, neg_capacity, item in\
+                    zip(distances, neg_capacities, items):
+                front.append(((shared, distance, -neg_capacity), item))
+        return front
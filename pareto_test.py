@@ -0,0 +1,44 @@
+from pareto import ParetoArchive
+import numpy as np
+import unittest
+
+
+def dominates(a, b):
+    return all(x <= y for x, y in zip(a, b)) and a != b
+
+
+class TestParetoArchive(unittest.TestCase):
+
+    def test_add(self):
+        archive = ParetoArchive()
+
+        self.assertTrue(archive.add(1, 3.0, 1.0, 'a'))
+        self.assertTrue(archive.add(0, 5.0, 2.0, 'b'))
+        self.assertFalse(archive.add(1, 5.0, 2.0, 'c'))
+        self.assertFalse(archive.add(0, 5.0, 2.0, 'd'))
+        self.assertTrue(archive.add(0, 2.0, 3.0, 'e'))
+        self.assertTrue(archive.add(0, 3.0, 1.0, 'f'))
+
+        self.assertListEqual(archive.front(), [((0, 2.0, 3.0), 'e'),
+                                               ((0, 3.0, 1.0), 'f')])
+
+    def test_front_matches_pairwise_comparison(self):
+        rng = np.random.default_rng(3)
+        points = [(int(rng.integers(3)), float(rng.integers(10)),
+                   float(rng.integers(10))) for _ in range(300)]
+        archive = ParetoArchive()
+
+        for index, point in enumerate(points):
+            archive.add(*point, index)
+
+        expected = set()
+        for point in points:
+            if not any(dominates(other, point) for other in points):
+                expected.add(point)
+        front = archive.front()
+        self.assertSetEqual({objectives for objectives, _ in front},
+                            expected)
+        self.assertEqual(len(front), len(expected))
+        self.assertEqual(len(archive), len(expected))
+        for objectives, index in front:
+            self.assertEqual(points[index], objectives)
@@ -0,0 +1,229 @@
+import os
+import numpy as np
+import network as net
+from candidates import CandidatePool, METRIC_HOPS, metric_weights
+
+LINKS_FILE = 'links.npy'
+PATH_OFFSETS_FILE = 'path_offsets.npy'
+ENTRY_OFFSETS_FILE = 'entry_offsets.npy'
+LOADS_FILE = 'loads.npy'
+
+
+def entry_index(nodes_count: int, source_id: int, target_id: int) -> int:
+    # Paths are symmetrical, only entries with lower id first are stored
+    if source_id > target_id:
+        source_id, target_id = target_id, source_id
+    return source_id * nodes_count + target_id
+
+
+def save_entries(directory: str, nodes_count: int,
+                 entries: dict[int, list[list[list[int]]]],
+                 loads: np.ndarray) -> None:
+    """
+Writes path pairs of `entries` (entry index -> list of [distance path,
+capacity path]) as flat arrays: `links` with ids of links of all paths,
+`path_offsets` with the start of every path in `links` and `entry_offsets`
+with the first pair of every entry, pair `p` being paths `2p` and `2p + 1`
+    """
+    links = []
+    path_offsets = [0]
+    entry_offsets = [0]
+    for index in range(nodes_count * nodes_count):
+        for pair in entries.get(index, ()):
+            for path in pair:
+                links.extend(path)
+                path_offsets.append(len(links))
+        entry_offsets.append((len(path_offsets) - 1) // 2)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, LINKS_FILE),
+            np.asarray(links, dtype=np.int32))
+    np.save(os.path.join(directory, PATH_OFFSETS_FILE),
+            np.asarray(path_offsets, dtype=np.int64))
+    np.save(os.path.join(directory, ENTRY_OFFSETS_FILE),
+            np.asarray(entry_offsets, dtype=np.int64))
+    np.save(os.path.join(directory, LOADS_FILE), loads)
+
+
+def build_path_index(network: net.Network, directory: str, k: int = 20,
+                     pairs_count: int = 4, distance_metric: int = METRIC_HOPS,
+                     distance_weight: float = 5, capacity_weight: float = 5)\
+        -> None:
+    """
+Precomputes `pairs_count` best pairs of paths for every pair of nodes of
+`network` under its current loads, choosing them from `k` shortest
+candidates, and saves them in `directory`
+    """
+    pool = CandidatePool(network, k, distance_metric, distance_weight,
+                         capacity_weight)
+    nodes_count = len(network.nodes)
+    entries = {}
+    for source_id in range(nodes_count):
+        for target_id in range(source_id + 1, nodes_count):
+            entries[entry_index(nodes_count, source_id, target_id)] =\
+                pool.best_pairs(source_id, target_id, pairs_count)
+    save_entries(directory, nodes_count, entries, network.get_loads())
+
+
+class PathIndex:
+    """
+Pairs of paths for every pair of nodes of `network`, precomputed by
+`build_path_index` and memory-mapped from `directory`.\n
+Queries only re-score stored pairs against current loads with the formula
+of `ant.cost_func`, with distance measured under `distance_metric`,
+skipping pairs with links hidden by `link_mask`. An
+entry is rebuilt, in memory, when load of any of its links moved by more
+than `rebuild_threshold` of its capacity since the entry was computed. If
+no stored pair is usable under current mask, candidates are computed for
+this query only.
+`save` writes rebuilt entries back.
+    """
+    def __init__(self, network: net.Network, directory: str, k: int = 20,
+                 pairs_count: int = 4, distance_metric: int = METRIC_HOPS,
+                 distance_weight: float = 5, capacity_weight: float = 5,
+                 rebuild_threshold: float = 0.2) -> None:
+        self.network = network
+        self.directory = directory
+        self.pairs_count = pairs_count
+        self.distance_weight = distance_weight
+        self.capacity_weight = capacity_weight
+        self.rebuild_threshold = rebuild_threshold
+        self.pool = CandidatePool(network, k, distance_metric,
+                                  distance_weight, capacity_weight)
+
+        self.links = np.load(os.path.join(directory, LINKS_FILE),
+                             mmap_mode='r')
+        self.path_offsets = np.load(
+            os.path.join(directory, PATH_OFFSETS_FILE), mmap_mode='r')
+        self.entry_offsets = np.load(
+            os.path.join(directory, ENTRY_OFFSETS_FILE), mmap_mode='r')
+        self.index_loads = np.load(os.path.join(directory, LOADS_FILE))
+        if len(self.entry_offsets) != len(network.nodes) ** 2 + 1:
+            raise ValueError('path index was built for another network')
+
+        # entry index -> (pairs of paths, loads they were computed at)
+        self.rebuilt = dict[int, tuple[list[list[list[int]]], np.ndarray]]()
+        self.rebuilds_count = 0
+        self.fallbacks_count = 0
+
+        with network.masked_view(None):
+            self.distance_costs = metric_weights(network, distance_metric)
+        self.capacities = np.asarray(
+            [link.capacity for link in network.links], dtype=float)
+        self.loads = None
+        self.loads_epoch = None
+
+    def current_loads(self) -> np.ndarray:
+        if self.loads_epoch != self.network.load_epoch:
+            self.loads = self.network.get_loads()
+            self.loads_epoch = self.network.load_epoch
+        return self.loads
+
+    def stored_pairs(self, index: int) -> list[list[list[int]]]:
+        pairs = []
+        for pair in range(self.entry_offsets[index],
+                          self.entry_offsets[index + 1]):
+            pairs.append([self.links[self.path_offsets[path]:
+                                     self.path_offsets[path + 1]].tolist()
+                          for path in (2 * pair, 2 * pair + 1)])
+        return pairs
+
+    def entry(self, source_id: int, target_id: int)\
+            -> list[list[list[int]]]:
+        """
+Returns pairs of paths between nodes with numerical ids, rebuilding them
+first if loads of their links changed too much. Paths lead from the node
+with lower id
+        """
+        index = entry_index(len(self.network.nodes), source_id, target_id)
+        if index in self.rebuilt:
+            pairs, entry_loads = self.rebuilt[index]
+        else:
+            pairs, entry_loads = self.stored_pairs(index), self.index_loads
+
+        links = [link_id for pair in pairs for path in pair
+                 for link_id in path]
+        drift = np.abs(self.current_loads()[links] - entry_loads[links]) /\
+            self.capacities[links]
+        if pairs and drift.max() > self.rebuild_threshold:
+            with self.network.masked_view(None):
+                pairs = self.pool.best_pairs(min(source_id, target_id),
+                                             max(source_id, target_id),
+                                             self.pairs_count)
+            self.rebuilt[index] = (pairs, self.current_loads())
+            self.rebuilds_count += 1
+        return pairs
+
+    def best_pair(self, source_id: int, target_id: int) -> list[list[int]]:
+        """
+Returns the best pair of paths between nodes with numerical ids under
+current loads, first one - distance path, second - capacity path, or None
+if there is no path between them
+        """
+        if source_id == target_id:
+            return [[], []]
+        pairs = self.entry(source_id, target_id)
+        mask = self.network.link_mask
+        if mask is not None:
+            pairs = [pair for pair in pairs
+                     if all(mask[path].all() for path in pair)]
+        if not pairs:
+            self.fallbacks_count += 1
+            return self.pool.best_pair(source_id, target_id)
+
+        distance_incidence = np.zeros(
+            (len(pairs), len(self.distance_costs)), dtype=np.int32)
+        capacity_incidence = np.zeros_like(distance_incidence)
+        for row, (distance_path, capacity_path) in enumerate(pairs):
+            distance_incidence[row, distance_path] = 1
+            capacity_incidence[row, capacity_path] = 1
+        free_fractions = np.prod(
+            np.where(capacity_incidence,
+                     1 - self.current_loads() / self.capacities, 1), axis=1)
+        shared = (distance_incidence * capacity_incidence).sum(axis=1)
+        costs = (self.distance_weight + self.capacity_weight) *\
+            (shared + 1) -\
+            self.distance_weight /\
+            (distance_incidence @ self.distance_costs) -\
+            self.capacity_weight * free_fractions
+
+        best = pairs[int(np.argmin(costs))]
+        if source_id > target_id:
+            return [path[::-1] for path in best]
+        return [list(path) for path in best]
+
+    def save(self, directory: str) -> None:
+        """
+Writes the index with rebuilt entries to `directory`, other than the one
+it is mapped from. Loads of all entries are then considered current
+        """
+        if os.path.isdir(directory) and\
+                os.path.samefile(directory, self.directory):
+            raise ValueError('cannot overwrite the mapped path index')
+        nodes_count = len(self.network.nodes)
+        entries = {}
+        for source_id in range(nodes_count):
+            for target_id in range(source_id + 1, nodes_count):
+                index = entry_index(nodes_count, source_id, target_id)
+                if index in self.rebuilt:
+                    entries[index] = self.rebuilt[index][0]
+                else:
+                    entries[index] = self.stored_pairs(index)
+        save_entries(directory, nodes_count, entries,
+                     self.current_loads().copy())
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Builds index of path pairs for all pairs of nodes')
+    parser.add_argument('network', nargs='?',
+                        default='data/network_structure.xml')
+    parser.add_argument('directory', nargs='?', default='path_index')
+    parser.add_argument('--k', type=int, default=20,
+                        help='candidates of each kind per pair of nodes')
+    parser.add_argument('--pairs', type=int, default=4,
+                        help='pairs of paths stored per pair of nodes')
+    args = parser.parse_args()
+    build_path_index(net.Network(*net.parse_xml(args.network)),
+                     args.directory, args.k, args.pairs)
@@ -0,0 +1,105 @@
+import os
+import tempfile
+from admission_test import create_test_network
+from candidates import CandidatePool, METRIC_HOPS
+import network as net
+from path_index import PathIndex, build_path_index
+from routing import Router, ALG_PATH_INDEX
+import numpy as np
+import unittest
+
+
+class TestPathIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.directory.name, 'index')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_candidate_pool(self):
+        test_network = create_test_network()
+        build_path_index(test_network, self.index_path, k=5,
+                         distance_metric=METRIC_HOPS)
+        index = PathIndex(test_network, self.index_path, k=5,
+                          distance_metric=METRIC_HOPS)
+        pool = CandidatePool(test_network, k=5, distance_metric=METRIC_HOPS)
+
+        for source_id in range(len(test_network.nodes)):
+            for target_id in range(len(test_network.nodes)):
+                self.assertListEqual(index.best_pair(source_id, target_id),
+                                     pool.best_pair(source_id, target_id))
+        self.assertEqual(index.rebuilds_count, 0)
+
+    def test_reversed_paths(self):
+        test_network = create_test_network()
+        build_path_index(test_network, self.index_path)
+        index = PathIndex(test_network, self.index_path)
+
+        self.assertListEqual(index.best_pair(1, 0),
+                             [path[::-1] for path in index.best_pair(0, 1)])
+
+    def test_rebuild_after_load_change(self):
+        test_network = create_test_network()
+        build_path_index(test_network, self.index_path, k=1, pairs_count=1)
+        index = PathIndex(test_network, self.index_path, k=1, pairs_count=1)
+        self.assertListEqual(index.best_pair(0, 1)[1], [0, 2, 4])
+
+        test_network.change_links_load([2], 0.1)
+        self.assertListEqual(index.best_pair(0, 1)[1], [0, 2, 4])
+        self.assertEqual(index.rebuilds_count, 0)
+
+        test_network.change_links_load([2], 0.7)
+        self.assertListEqual(index.best_pair(0, 1)[1], [0, 3])
+        self.assertEqual(index.rebuilds_count, 1)
+
+        saved_path = os.path.join(self.directory.name, 'saved')
+        index.save(saved_path)
+        saved_index = PathIndex(test_network, saved_path, k=1, pairs_count=1)
+        self.assertListEqual(saved_index.best_pair(0, 1)[1], [0, 3])
+        self.assertEqual(saved_index.rebuilds_count, 0)
+        with self.assertRaises(ValueError):
+            index.save(self.index_path)
+
+    def test_rebuild_threshold_is_fraction_of_capacity(self):
+        nodes_ids = ['S', 'K', 'a']
+        links_data = [('L1', 'S', 'K', 100, 1),
+                      ('L2', 'S', 'a', 100, 1),
+                      ('L3', 'a', 'K', 100, 1)]
+        test_network = net.Network(nodes_ids, links_data)
+        build_path_index(test_network, self.index_path, k=1, pairs_count=1)
+        index = PathIndex(test_network, self.index_path, k=1, pairs_count=1)
+        index.best_pair(0, 1)
+
+        test_network.change_links_load([0], 15.0)
+        index.best_pair(0, 1)
+        self.assertEqual(index.rebuilds_count, 0)
+
+        test_network.change_links_load([0], 10.0)
+        index.best_pair(0, 1)
+        self.assertEqual(index.rebuilds_count, 1)
+
+    def test_link_mask(self):
+        test_network = create_test_network()
+        build_path_index(test_network, self.index_path, pairs_count=1)
+        index = PathIndex(test_network, self.index_path, pairs_count=1)
+        mask = np.ones(len(test_network.links), dtype=bool)
+        mask[2] = False
+
+        with test_network.masked_view(mask):
+            paths = index.best_pair(0, 1)
+
+        self.assertNotIn(2, paths[0] + paths[1])
+        self.assertEqual(index.fallbacks_count, 1)
+
+    def test_router(self):
+        test_network = create_test_network()
+        build_path_index(test_network, self.index_path)
+        router = Router(test_network)
+        with self.assertRaises(ValueError):
+            router.route(0, 1, ALG_PATH_INDEX)
+        router.path_index = PathIndex(test_network, self.index_path)
+
+        self.assertListEqual(router.route(0, 1, ALG_PATH_INDEX),
+                             [[1, 5, 6], [0, 2, 4]])
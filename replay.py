@@ -0,0 +1,126 @@
+import os
+import time
+from typing import Iterable, Iterator
+import numpy as np
+import network as net
+from admission import AdmissionController
+from routing import Router, ALG_A_STAR
+
+
+class TrafficSlice:
+    """
+Single time slice of a traffic trace - a demand matrix of SNDlib XML file
+`path`. `demands` parses it anew on every call, yielding numerical ids of
+source and target nodes and value of every demand with a positive value
+between different nodes.
+    """
+    def __init__(self, path: str, nodes_int_ids: dict[str, int]) -> None:
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.nodes_int_ids = nodes_int_ids
+
+    def demands(self) -> Iterator[tuple[int, int, float]]:
+        for _, source_id, target_id, value in net.parse_demands(self.path):
+            if value <= 0 or source_id == target_id:
+                continue
+            yield (self.nodes_int_ids[source_id],
+                   self.nodes_int_ids[target_id], value)
+
+
+def iter_traffic_slices(network: net.Network, paths: Iterable[str])\
+        -> Iterator[TrafficSlice]:
+    """
+Yields slices of a traffic trace made of SNDlib XML files in `paths`.
+Directories stand for all XML files in them, in order of their names
+    """
+    nodes_int_ids = {node_str_id: node_id for node_id, node_str_id
+                     in enumerate(network.nodes_ids_map)}
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith('.xml'):
+                    yield TrafficSlice(os.path.join(path, name),
+                                       nodes_int_ids)
+        else:
+            yield TrafficSlice(path, nodes_int_ids)
+
+
+class SliceReport:
+    """
+Results of replaying a single time slice: numbers of demands, admitted and
+rejected ones, wall time of the whole slice and `latencies` - seconds it
+took to route and admit every demand
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.demands_count = 0
+        self.admitted_count = 0
+        self.rejected_count = 0
+        self.seconds = 0.0
+        self.latencies = list[float]()
+
+    def throughput(self) -> float:
+        return self.demands_count / max(self.seconds, 1e-9)
+
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(self.latencies, percentile))
+
+    def __str__(self):
+        return f'{self.name}: {self.admitted_count}/{self.demands_count} ' \
+               f'admitted, {self.throughput():.1f} demands/s, latency ' \
+               f'p50 {self.latency_percentile(50) * 1000:.2f} ms, ' \
+               f'p95 {self.latency_percentile(95) * 1000:.2f} ms, ' \
+               f'max {self.latency_percentile(100) * 1000:.2f} ms'
+
+
+def replay(controller: AdmissionController, slices: Iterable[TrafficSlice],
+           algorithm: int = ALG_A_STAR, scale: float = 1.0)\
+        -> Iterator[SliceReport]:
+    """
+Replays traffic slices one after another: every demand of a slice is
+admitted by `controller` with its value multiplied by `scale` as load, and
+all of them are released before the next slice. Yields a report of every
+slice as soon as it is replayed, so a trace of any length is replayed in
+constant memory
+    """
+    for traffic_slice in slices:
+        report = SliceReport(traffic_slice.name)
+        flows_ids = []
+        slice_start = time.perf_counter()
+        for source_id, target_id, value in traffic_slice.demands():
+            demand_start = time.perf_counter()
+            flow = controller.admit(source_id, target_id, value * scale,
+                                    algorithm)
+            report.latencies.append(time.perf_counter() - demand_start)
+            report.demands_count += 1
+            if flow is None:
+                report.rejected_count += 1
+            else:
+                report.admitted_count += 1
+                flows_ids.append(flow.id)
+        report.seconds = time.perf_counter() - slice_start
+        for flow_id in flows_ids:
+            controller.release(flow_id)
+        yield report
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Replay of SNDlib traffic matrices')
+    parser.add_argument('traffic', nargs='+',
+                        help='SNDlib XML files or directories of them')
+    parser.add_argument('--network', default='data/network_structure.xml')
+    parser.add_argument('--algorithm', type=int, default=ALG_A_STAR)
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='factor turning demand values into loads')
+    args = parser.parse_args()
+
+    network = net.Network(*net.parse_xml(args.network))
+    controller = AdmissionController(network, Router(network))
+    for report in replay(controller,
+                         iter_traffic_slices(network, args.traffic),
+                         args.algorithm, args.scale):
+        print(report)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from admission import AdmissionController
+from admission_test import create_test_network
+import network as net
+from replay import iter_traffic_slices, replay
+import unittest
+
+
+def write_traffic(path: str, demands: list[tuple[str, str, float]]) -> None:
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   '<network xmlns="http://sndlib.zib.de/network" '
+                   'version="1.0">\n <demands>\n')
+        for source, target, value in demands:
+            file.write(f'  <demand id="{source}_{target}">\n'
+                       f'   <source>{source}</source>\n'
+                       f'   <target>{target}</target>\n'
+                       f'   <demandValue> {value} </demandValue>\n'
+                       f'  </demand>\n')
+        file.write(' </demands>\n</network>\n')
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_parse_demands(self):
+        path = os.path.join(self.directory.name, 'slice.xml')
+        write_traffic(path, [('S', 'K', 0.5), ('a', 'd', 0.25)])
+
+        self.assertListEqual(list(net.parse_demands(path)),
+                             [('S_K', 'S', 'K', 0.5),
+                              ('a_d', 'a', 'd', 0.25)])
+
+    def test_replay_releases_between_slices(self):
+        write_traffic(os.path.join(self.directory.name, 'slice-2.xml'),
+                      [('S', 'K', 0.05), ('S', 'K', 0.6)])
+        write_traffic(os.path.join(self.directory.name, 'slice-1.xml'),
+                      [('S', 'K', 0.05), ('a', 'a', 0.1), ('b', 'c', 0.0)])
+        test_network = create_test_network()
+        loads = [link.load for link in test_network.links]
+        controller = AdmissionController(test_network)
+
+        reports = []
+        for report in replay(controller,
+                             iter_traffic_slices(test_network,
+                                                 [self.directory.name])):
+            for link, load in zip(test_network.links, loads):
+                self.assertAlmostEqual(link.load, load)
+            reports.append(report)
+
+        self.assertListEqual([report.name for report in reports],
+                             ['slice-1', 'slice-2'])
+        self.assertListEqual([(report.demands_count, report.admitted_count,
+                               report.rejected_count) for report in reports],
+                             [(1, 1, 0), (2, 1, 1)])
+        self.assertEqual(len(reports[1].latencies), 2)
+        self.assertGreater(reports[1].throughput(), 0)
+        self.assertEqual(len(controller.flows), 0)
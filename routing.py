@@ -0,0 +1,252 @@
+from functools import partial
+import numpy as np
+import network as net
+from a_star import prepare_solution_tree, a_star, ida_star, beam_search,\
+    heuristic_admissible, SearchStats, BEAM_WIDTH
+from ant import RivalAnt, RivalAntsAlgorithmNetwork, RivalDistanceAnt,\
+    RivalCapacityAnt, cost_func
+from candidates import CandidatePool, METRIC_HOPS, METRIC_CAPACITY
+from heuristics import HeuristicCache
+
+ALG_A_STAR = 1
+ALG_ANT_COLONY = 2
+ALG_K_SHORTEST = 3
+ALG_PATH_INDEX = 4
+ALG_IDA_STAR = 5
+ALG_BEAM = 6
+
+
+def default_ants() -> list[RivalAnt]:
+    return [RivalDistanceAnt((1, -0.9), 1, 0.5),
+            RivalCapacityAnt((-0.9, 1), 1, 3)]
+
+
+def solution_to_paths(solution: list[int]) -> list[list[int]]:
+    """
+Converts A* solution (value for each link of the network) to two lists of
+ids of links, first one - shortest distance path, second - lowest load path
+    """
+    distance_path = []
+    capacity_path = []
+    for link_id, value in enumerate(solution):
+        if value == 1 or value == 3:
+            distance_path.append(link_id)
+        if value == 2 or value == 3:
+            capacity_path.append(link_id)
+    return [distance_path, capacity_path]
+
+
+class Router:
+    """
+Routes demands in `network` with either of the solvers, keeping state
+used by them resident between queries.\n
+A* heuristics use rows of hop distances and minimal `-log10` free capacity
+costs of only the end nodes of a query, kept in `heuristics`, and the ant
+colony network receives loads only of links that changed since its last
+use, along with current `link_mask`.\n
+Paths are returned as two lists of numerical ids of links, first one -
+shortest distance path, second - lowest load path.\n
+Ant colony draws random numbers from a stream seeded with `rng`.
+k shortest paths algorithm chooses among `k_shortest` candidates per path.
+Path index algorithm needs `path_index` to be set to a loaded `PathIndex`.
+IDA* and beam search look through the same solutions as A* in memory
+bounded by depth of the search and by `beam_width` respectively. Statistics
+of the last search of any of them are kept in `search_stats`. They prune
+the tree by a quickly found solution only for weights under which their
+heuristic is admissible.
+If `conflict_index` is set, A* and ant colony count nodes or shared risk
+link groups shared by both paths of a demand instead of shared links.
+    """
+    def __init__(self, network: net.Network,
+                 weight_dist: float = 1, weight_cost: float = 1,
+                 ants_originals: list[RivalAnt] = None,
+                 generations_number: int = 10, rng=None,
+                 k_shortest: int = 20, beam_width: int = BEAM_WIDTH)\
+            -> None:
+        self.network = network
+        self.weight_dist = weight_dist
+        self.weight_cost = weight_cost
+        self.ants_originals = ants_originals
+        if self.ants_originals is None:
+            self.ants_originals = default_ants()
+        self.generations_number = generations_number
+        self.rng = rng
+        self.k_shortest = k_shortest
+        self.beam_width = beam_width
+        self.search_stats = None
+        self.candidate_pool = None
+        self.path_index = None
+        self.conflict_index = None
+        self.links_int_ids = {link_str_id: link_id for link_id, link_str_id
+                              in enumerate(network.links_ids_map)}
+
+        self.heuristics = HeuristicCache(network)
+        self.ant_network = None
+        self.ant_network_dirty_links = set[int]()
+        network.load_listeners.append(self.on_load_change)
+        if network.result_cache is None:
+            network.result_cache = net.ResultCache(network)
+
+    def on_load_change(self, link_ids: list[int]) -> None:
+        if self.ant_network is not None:
+            self.ant_network_dirty_links.update(link_ids)
+
+    def route(self, start_id: int, end_id: int,
+              algorithm: int = ALG_A_STAR) -> list[list[int]]:
+        """
+Returns paths found between nodes with numerical ids `start_id` and `end_id`
+by the chosen algorithm, or None if no solution was found.\n
+Results are kept in `result_cache` of the network, unless the network is
+viewed through a `link_mask` set outside of the router.
+        """
+        if self.network.link_mask is not None:
+            return self.solve(start_id, end_id, algorithm)
+        key = self.cache_key(start_id, end_id, algorithm)
+        result = self.network.result_cache.get(key)
+        if result is not None:
+            return result.paths
+        paths = self.solve(start_id, end_id, algorithm)
+        self.network.result_cache.put(key, paths)
+        return paths
+
+    def route_demand(self, start_id: int, end_id: int, load: float,
+                     algorithm: int = ALG_A_STAR) -> list[list[int]]:
+        """
+Same as `route`, but only links with residual capacity not lower than `load`
+are considered
+        """
+        if self.network.link_mask is not None:
+            return self.solve_demand(start_id, end_id, load, algorithm)
+        key = self.cache_key(start_id, end_id, algorithm, load)
+        result = self.network.result_cache.get(key)
+        if result is not None:
+            return result.paths
+        paths = self.solve_demand(start_id, end_id, load, algorithm)
+        self.network.result_cache.put(key, paths, load)
+        return paths
+
+    def cache_key(self, start_id: int, end_id: int, algorithm: int,
+                  load: float = None) -> tuple:
+        if algorithm in (ALG_A_STAR, ALG_IDA_STAR):
+            params = (self.weight_dist, self.weight_cost,
+                      id(self.conflict_index))
+        elif algorithm == ALG_BEAM:
+            params = (self.weight_dist, self.weight_cost,
+                      id(self.conflict_index), self.beam_width)
+        elif algorithm == ALG_K_SHORTEST:
+            params = (self.weight_dist, self.weight_cost, self.k_shortest)
+        elif algorithm == ALG_PATH_INDEX:
+            params = (id(self.path_index),)
+        else:
+            params = (self.generations_number,
+                      id(self.conflict_index)) + tuple(
+                (type(ant).__name__, tuple(ant.pheromones_weights),
+                 ant.pheromone_influence, ant.criterion_influence)
+                for ant in self.ants_originals)
+        return (start_id, end_id, algorithm, params, load)
+
+    def solve(self, start_id: int, end_id: int,
+              algorithm: int = ALG_A_STAR) -> list[list[int]]:
+        """
+Same as `route`, but always runs the solver
+        """
+        if algorithm == ALG_A_STAR:
+            return self.route_a_star(start_id, end_id)
+        if algorithm == ALG_IDA_STAR:
+            return self.route_a_star(start_id, end_id, ida_star)
+        if algorithm == ALG_BEAM:
+            return self.route_a_star(start_id, end_id, partial(
+                beam_search, beam_width=self.beam_width))
+        if algorithm == ALG_ANT_COLONY:
+            return self.route_ant_colony(start_id, end_id)
+        if algorithm == ALG_K_SHORTEST:
+            return self.route_k_shortest(start_id, end_id)
+        if algorithm == ALG_PATH_INDEX:
+            if self.path_index is None:
+                raise ValueError('router has no path index')
+            return self.path_index.best_pair(start_id, end_id)
+        raise ValueError(f'unknown algorithm {algorithm}')
+
+    def solve_demand(self, start_id: int, end_id: int, load: float,
+                     algorithm: int = ALG_A_STAR) -> list[list[int]]:
+        """
+Same as `route_demand`, but always runs the solver
+        """
+        mask = self.network.capacity_mask(load)
+        if self.network.link_mask is not None:
+            mask = mask & self.network.link_mask
+        with self.network.masked_view(mask):
+            return self.solve(start_id, end_id, algorithm)
+
+    def route_a_star(self, start_id: int, end_id: int, search=a_star)\
+            -> list[list[int]]:
+        root = prepare_solution_tree(
+            self.network,
+            self.network.nodes[start_id],
+            self.network.nodes[end_id],
+            self.heuristics.rows(METRIC_CAPACITY),
+            self.heuristics.rows(METRIC_HOPS),
+            self.weight_dist, self.weight_cost,
+            conflict_index=self.conflict_index
+        )
+        self.search_stats = SearchStats()
+        # Pruning by a quickly found solution could drop the optimum if
+        # the heuristic overestimates
+        solution_node = search(
+            root, stats=self.search_stats,
+            prune=heuristic_admissible(self.weight_dist, self.weight_cost))
+        if solution_node is None:
+            return None
+        return solution_to_paths(solution_node.solution)
+
+    def route_ant_colony(self, start_id: int, end_id: int)\
+            -> list[list[int]]:
+        if self.ant_network is None:
+            self.ant_network = RivalAntsAlgorithmNetwork(
+                self.network.get_node_id_str_list(),
+                self.network.get_link_data_list(),
+                len(self.ants_originals), rng=self.rng)
+            self.ant_network_dirty_links = set(range(len(self.network.links)))
+        self.sync_ant_network()
+        self.ant_network.link_mask = self.network.link_mask
+
+        demand_cost_func = cost_func
+        if self.conflict_index is not None:
+            demand_cost_func = partial(
+                cost_func, conflict_index=self.conflict_index,
+                ends_mask=self.conflict_index.ends_mask(start_id, end_id))
+        paths = self.ant_network.rival_ants_algorithm(
+            self.network.nodes_ids_map[start_id],
+            self.network.nodes_ids_map[end_id],
+            self.ants_originals,
+            demand_cost_func, generations_number=self.generations_number
+        )
+        if paths is None:
+            return None
+        return [[self.links_int_ids[link_str_id] for link_str_id in path]
+                for path in paths]
+
+    def route_k_shortest(self, start_id: int, end_id: int)\
+            -> list[list[int]]:
+        if self.candidate_pool is None:
+            # Distance is measured in hops, as by A* and ant colony
+            self.candidate_pool = CandidatePool(
+                self.network, self.k_shortest, METRIC_HOPS,
+                distance_weight=self.weight_dist,
+                capacity_weight=self.weight_cost)
+        return self.candidate_pool.best_pair(start_id, end_id)
+
+    def sync_ant_network(self) -> None:
+        # Ant colony needs some load on every link, 1% of capacity, same as
+        # after its initialization
+        links_ids = np.fromiter(self.ant_network_dirty_links, dtype=np.intp,
+                                count=len(self.ant_network_dirty_links))
+        loads = self.network.loads[links_ids]
+        empty = loads == 0
+        loads[empty] = 0.01 * self.network.capacities()[links_ids[empty]]
+        self.ant_network.loads[links_ids] = loads
+        self.ant_network_dirty_links.clear()
+        # Structures derived from loads of the colony network, like detours
+        # cached by its local search, follow its load epoch
+        if len(links_ids) > 0:
+            self.ant_network.notify_load_change(links_ids.tolist())
@@ -0,0 +1,245 @@
+import asyncio
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor,\
+    ThreadPoolExecutor
+import numpy as np
+import network as net
+from admission import AdmissionController
+from routing import Router, ALG_A_STAR
+
+# Router of a worker process, created once by `init_worker`
+worker_router = None
+
+
+def init_worker(nodes_ids: list[str],
+                links_data: list[tuple[str, str, str, float, float]]) -> None:
+    global worker_router
+    worker_router = Router(net.Network(nodes_ids, links_data))
+    # Loads are not a part of links data, they arrive with the first demand
+    worker_router.network.load_epoch = -1
+
+
+def route_in_worker(start_id: int, end_id: int, algorithm: int,
+                    load: float, load_epoch: int, links_loads: list[float])\
+        -> list[list[int]]:
+    """
+Routes a demand with router of the worker process, after bringing loads
+of its network up to `load_epoch` of the service network
+    """
+    network = worker_router.network
+    if network.load_epoch != load_epoch:
+        network.set_loads(links_loads)
+        network.load_epoch = load_epoch
+    if load is None:
+        return worker_router.route(start_id, end_id, algorithm)
+    return worker_router.route_demand(start_id, end_id, load, algorithm)
+
+
+class RoutingService:
+    """
+Long-running routing service keeping `network`, its `router` and
+`controller` resident between requests.\n
+Routing is done by `executor` if given (e.g. a `ProcessPoolExecutor` created
+by `create_process_pool`) on copies of loads, otherwise by `router`.
+Everything reading or changing `network` - searches of `router`, lookups in
+its `result_cache`, reservations and releases - runs in the single thread of
+`solver_thread`, so that the event loop keeps serving other clients, loads,
+masks and caches never change under a running search and masks of searches
+never reach admission checks.
+Concurrent requests with the same end nodes, algorithm and load made at
+the same `load_epoch` share one computation, and results are kept in
+`result_cache` of the network.\n
+Requests and responses are JSON objects, one per line. Supported operations
+(`op` field) are `route`, `admit`, `release` and `stats`.
+    """
+    def __init__(self, network: net.Network, executor: Executor = None)\
+            -> None:
+        self.network = network
+        self.router = Router(network)
+        self.controller = AdmissionController(network, self.router)
+        self.executor = executor
+        self.solver_thread = ThreadPoolExecutor(1)
+        self.nodes_int_ids = {node_str_id: node_id for node_id, node_str_id
+                              in enumerate(network.nodes_ids_map)}
+
+        self.in_flight = dict[tuple, asyncio.Future]()
+        self.computations_count = 0
+        self.coalesced_count = 0
+        self.cache_hits = 0
+
+    def create_process_pool(self, workers_count: int = None)\
+            -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            workers_count, initializer=init_worker,
+            initargs=(self.network.get_node_id_str_list(),
+                      self.network.get_link_data_list()))
+
+    async def on_network(self, function, *args):
+        """
+Returns result of `function` called with `args` in `solver_thread`
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self.solver_thread, function, *args)
+
+    async def route(self, start_id: int, end_id: int,
+                    algorithm: int = ALG_A_STAR, load: float = None)\
+            -> list[list[int]]:
+        key = self.router.cache_key(start_id, end_id, algorithm, load)
+        epoch, result = await self.on_network(self.lookup, key)
+        if result is not None:
+            self.cache_hits += 1
+            return result.paths
+
+        in_flight_key = key + (epoch,)
+        if in_flight_key in self.in_flight:
+            self.coalesced_count += 1
+            return await asyncio.shield(self.in_flight[in_flight_key])
+
+        self.computations_count += 1
+        computation = asyncio.ensure_future(
+            self.compute(key, start_id, end_id, algorithm, load))
+        self.in_flight[in_flight_key] = computation
+        try:
+            return await asyncio.shield(computation)
+        finally:
+            del self.in_flight[in_flight_key]
+
+    def lookup(self, key: tuple) -> tuple[int, net.CachedResult]:
+        return self.network.load_epoch, self.network.result_cache.get(key)
+
+    async def compute(self, key: tuple, start_id: int, end_id: int,
+                      algorithm: int, load: float) -> list[list[int]]:
+        if self.executor is None:
+            return await self.on_network(self.solve, key, start_id, end_id,
+                                         algorithm, load)
+        epoch, links_loads = await self.on_network(self.loads_snapshot)
+        paths = await asyncio.get_running_loop().run_in_executor(
+            self.executor, route_in_worker, start_id, end_id, algorithm,
+            load, epoch, links_loads)
+        await self.on_network(self.store, key, paths, load, epoch)
+        return paths
+
+    def solve(self, key: tuple, start_id: int, end_id: int, algorithm: int,
+              load: float) -> list[list[int]]:
+        if load is None:
+            paths = self.router.solve(start_id, end_id, algorithm)
+        else:
+            paths = self.router.solve_demand(start_id, end_id, load,
+                                             algorithm)
+        self.network.result_cache.put(key, paths, load)
+        return paths
+
+    def loads_snapshot(self) -> tuple[int, np.ndarray]:
+        return self.network.load_epoch, self.network.get_loads()
+
+    def store(self, key: tuple, paths: list[list[int]], load: float,
+              epoch: int) -> None:
+        # Paths found for loads which changed since are not kept
+        if self.network.load_epoch == epoch:
+            self.network.result_cache.put(key, paths, load)
+
+    def stats(self) -> dict:
+        return {'load_epoch': self.network.load_epoch,
+                'computations': self.computations_count,
+                'coalesced': self.coalesced_count,
+                'cache_hits': self.cache_hits,
+                'cache': self.network.result_cache.stats(),
+                'flows': len(self.controller.flows)}
+
+    async def handle_request(self, request: dict) -> dict:
+        if not isinstance(request, dict):
+            raise ValueError('request has to be a JSON object')
+        op = request.get('op', 'route')
+        if op == 'stats':
+            return await self.on_network(self.stats)
+        if op == 'release':
+            flow = await self.on_network(self.controller.release,
+                                         request['flow'])
+            return {'flow': flow.id}
+
+        start_id = self.get_node_int_id(request['start'])
+        end_id = self.get_node_int_id(request['end'])
+        algorithm = request.get('algorithm', ALG_A_STAR)
+        load = request.get('load')
+        if load is not None and not isinstance(load, (int, float)):
+            raise TypeError(f'load has to be a number, not {load!r}')
+        if op == 'route':
+            paths = await self.route(start_id, end_id, algorithm, load)
+            return {'paths': self.paths_to_str_ids(paths)}
+        if op == 'admit':
+            load = request['load']
+            paths = await self.route(start_id, end_id, algorithm, load)
+            flow = await self.on_network(self.controller.reserve, start_id,
+                                         end_id, load, paths)
+            if flow is None:
+                return {'flow': None, 'paths': None}
+            return {'flow': flow.id,
+                    'paths': self.paths_to_str_ids(flow.paths)}
+        raise ValueError(f'unknown operation {op}')
+
+    def get_node_int_id(self, id: str) -> int:
+        try:
+            return self.nodes_int_ids[id]
+        except KeyError as err:
+            raise ValueError(f'there is no node with {id} id') from err
+
+    def paths_to_str_ids(self, paths: list[list[int]]) -> list[list[str]]:
+        if paths is None:
+            return None
+        return [[self.network.links_ids_map[link_id] for link_id in path]
+                for path in paths]
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.handle_request(json.loads(line))
+                # Malformed requests, e.g. with fields of wrong types, are
+                # answered with an error instead of dropping the connection
+                except (ValueError, KeyError, TypeError) as err:
+                    response = {'error': str(err)}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def start_server(self, host: str = '127.0.0.1', port: int = 0,
+                           unix_path: str = None) -> asyncio.AbstractServer:
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle_client,
+                                                   unix_path)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+
+async def send_request(reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter, request: dict) -> dict:
+    writer.write(json.dumps(request).encode() + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def serve(network_path: str, host: str, port: int, unix_path: str,
+                workers_count: int) -> None:
+    service = RoutingService(net.Network(*net.parse_xml(network_path)))
+    if workers_count > 0:
+        service.executor = service.create_process_pool(workers_count)
+    server = await service.start_server(host, port, unix_path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Routing service')
+    parser.add_argument('network', nargs='?',
+                        default='data/network_structure.xml')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None,
+                        help='path of unix socket to listen on instead')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='size of the process pool, 0 to route in place')
+    args = parser.parse_args()
+    asyncio.run(serve(args.network, args.host, args.port, args.unix,
+                      args.workers))
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from admission_test import create_test_network
+from routing_service import RoutingService, send_request
+from routing import ALG_A_STAR
+import unittest
+
+
+class TestRoutingService(unittest.IsolatedAsyncioTestCase):
+
+    async def test_route_coalesces_concurrent_requests(self):
+        service = RoutingService(create_test_network())
+
+        results = await asyncio.gather(
+            *[service.route(0, 1, ALG_A_STAR) for _ in range(5)])
+
+        self.assertEqual(service.computations_count, 1)
+        self.assertEqual(service.coalesced_count, 4)
+        for paths in results:
+            self.assertListEqual(paths, results[0])
+
+    async def test_route_cached_until_load_changes(self):
+        test_network = create_test_network()
+        service = RoutingService(test_network)
+
+        await service.route(0, 1, ALG_A_STAR)
+        await service.route(0, 1, ALG_A_STAR)
+        self.assertEqual(service.computations_count, 1)
+        self.assertEqual(service.cache_hits, 1)
+
+        test_network.change_links_load([0], 0.1)
+        await service.route(0, 1, ALG_A_STAR)
+        self.assertEqual(service.computations_count, 2)
+
+    async def test_network_changed_only_in_solver_thread(self):
+        test_network = create_test_network()
+        service = RoutingService(test_network)
+        changes = []
+        test_network.load_listeners.append(
+            lambda link_ids: changes.append((threading.current_thread(),
+                                             test_network.link_mask)))
+
+        await asyncio.gather(
+            service.handle_request({'op': 'admit', 'start': 'S',
+                                    'end': 'K', 'load': 0.05}),
+            service.handle_request({'op': 'route', 'start': 'a',
+                                    'end': 'K', 'load': 0.5}))
+        await service.handle_request({'op': 'release', 'flow': 0})
+
+        self.assertEqual(len(changes), 2)
+        for thread, mask in changes:
+            self.assertIsNot(thread, threading.main_thread())
+            self.assertIsNone(mask)
+
+    async def test_client_session(self):
+        service = RoutingService(create_test_network())
+        server = await service.start_server()
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+        response = await send_request(
+            reader, writer, {'op': 'admit', 'start': 'S', 'end': 'K',
+                             'load': 0.05})
+        self.assertEqual(response['flow'], 0)
+        self.assertCountEqual(response['paths'][0], ['L2', 'L6', 'L7'])
+        self.assertCountEqual(response['paths'][1], ['L1', 'L3', 'L5'])
+
+        response = await send_request(reader, writer,
+                                      {'op': 'route', 'start': 'S',
+                                       'end': 'X'})
+        self.assertIn('error', response)
+
+        for request in ({'op': 'route', 'start': ['S'], 'end': 'K'},
+                        {'op': 'admit', 'start': 'S', 'end': 'K',
+                         'load': 'high'},
+                        ['S', 'K']):
+            response = await send_request(reader, writer, request)
+            self.assertIn('error', response)
+
+        response = await send_request(reader, writer,
+                                      {'op': 'release', 'flow': 0})
+        self.assertEqual(response['flow'], 0)
+        response = await send_request(reader, writer, {'op': 'stats'})
+        self.assertEqual(response['flows'], 0)
+        self.assertEqual(response['load_epoch'], 2)
+
+        writer.close()
+        await writer.wait_closed()
+        server.close()
+        await server.wait_closed()
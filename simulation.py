@@ -0,0 +1,241 @@
+import time
+from array import array
+from heapq import heappush, heappop
+import numpy as np
+import network as net
+from admission import AdmissionController
+from routing import ALG_A_STAR
+
+# Kinds of events, departures at the same time as an arrival free their
+# capacity first
+DEPARTURE = 0
+ARRIVAL = 1
+
+
+class SimulationReport:
+    """
+Results of a simulation run: numbers of arrivals, admitted and rejected
+demands and departures, `simulated_time`, wall time in `seconds`,
+`utilization` - time average of load to capacity ratio of every link and
+`latencies` - seconds it took to route and admit every arrival
+    """
+    def __init__(self, links_count: int) -> None:
+        self.arrivals_count = 0
+        self.admitted_count = 0
+        self.rejected_count = 0
+        self.departures_count = 0
+        self.simulated_time = 0.0
+        self.seconds = 0.0
+        self.utilization = np.zeros(links_count)
+        self.latencies = array('d')
+
+    def blocking_ratio(self) -> float:
+        return self.rejected_count / max(self.arrivals_count, 1)
+
+    def events_per_second(self) -> float:
+        return (self.arrivals_count + self.departures_count) /\
+            max(self.seconds, 1e-9)
+
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(np.frombuffer(self.latencies), percentile))
+
+    def __str__(self):
+        return f'{self.arrivals_count} arrivals, {self.departures_count} ' \
+               f'departures, blocking ratio {self.blocking_ratio():.4f}, ' \
+               f'utilization mean {self.utilization.mean():.3f}, ' \
+               f'max {self.utilization.max(initial=0):.3f}, latency ' \
+               f'p50 {self.latency_percentile(50) * 1000:.3f} ms, ' \
+               f'p95 {self.latency_percentile(95) * 1000:.3f} ms, ' \
+               f'p99 {self.latency_percentile(99) * 1000:.3f} ms, ' \
+               f'{self.events_per_second():.0f} events/s'
+
+
+class Simulation:
+    """
+Discrete-event simulation of demands arriving to the network of
+`controller` and departing from it.\n
+Demands arrive in a Poisson process with `arrival_rate` arrivals per unit
+of time, between pairs of nodes from `pairs` (numerical ids) drawn with
+probabilities proportional to `weights`, or between any two different
+nodes if `pairs` is None. Every demand has load drawn uniformly from
+`load_range` and holds it for exponentially distributed time with mean
+`mean_holding_time`.\n
+Arrivals are routed and admitted by `controller` with `algorithm`, and
+admitted flows are released at their departure, subtracting their load
+from all of their links with one vectorized operation. Events wait in
+a heap ordered by time, holding departures of all admitted flows and only
+the next arrival. Random numbers are drawn in blocks of `block_size` from
+a generator seeded with `rng`.\n
+Time integral of load of a link is brought up to date only when its load
+changes, as reported to `load_listeners` of the network, so events cost
+time proportional to the number of links they change, not of all links.
+Run time is still dominated by the solver routing arrivals.\n
+Consecutive runs continue the same simulation.
+    """
+    def __init__(self, controller: AdmissionController, arrival_rate: float,
+                 mean_holding_time: float,
+                 load_range: tuple[float, float] = (1.0, 1.0),
+                 pairs: list[tuple[int, int]] = None,
+                 weights: list[float] = None, algorithm: int = ALG_A_STAR,
+                 rng=None, block_size: int = 4096) -> None:
+        self.controller = controller
+        self.network = controller.network
+        self.arrival_rate = arrival_rate
+        self.mean_holding_time = mean_holding_time
+        self.load_range = load_range
+        if pairs is None:
+            nodes_count = len(self.network.nodes)
+            pairs = [(start_id, end_id) for start_id in range(nodes_count)
+                     for end_id in range(nodes_count) if start_id != end_id]
+        self.pairs = pairs
+        self.probabilities = None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+            self.probabilities = weights / weights.sum()
+        self.algorithm = algorithm
+        self.rng = np.random.default_rng(rng)
+        self.block_size = block_size
+        self.block = None
+        self.position = block_size
+
+        self.now = 0.0
+        self.events = list[tuple[float, int, int]]()
+        heappush(self.events, (self.next_gap(), ARRIVAL, -1))
+
+        # Loads of links since times of their last changes, and integrals of
+        # loads over time up to then
+        links_count = len(self.network.links)
+        self.integrated_loads = self.network.get_loads()
+        self.integrated_times = np.zeros(links_count)
+        self.loads_integral = np.zeros(links_count)
+        self.network.load_listeners.append(self.on_load_change)
+
+    def on_load_change(self, link_ids: list[int]) -> None:
+        links_ids = np.asarray(link_ids, dtype=np.intp)
+        # Repeated ids get the same values, so they are integrated once
+        self.loads_integral[links_ids] += self.integrated_loads[links_ids] *\
+            (self.now - self.integrated_times[links_ids])
+        self.integrated_times[links_ids] = self.now
+        self.integrated_loads[links_ids] = self.network.loads[links_ids]
+
+    def integrate_loads(self) -> None:
+        """
+Brings time integrals of loads of all links up to `now`
+        """
+        self.loads_integral += self.integrated_loads *\
+            (self.now - self.integrated_times)
+        self.integrated_times[:] = self.now
+
+    def draw_block(self) -> None:
+        size = self.block_size
+        self.block = (
+            self.rng.exponential(1 / self.arrival_rate, size).tolist(),
+            self.rng.exponential(self.mean_holding_time, size).tolist(),
+            self.rng.choice(len(self.pairs), size,
+                            p=self.probabilities).tolist(),
+            self.rng.uniform(*self.load_range, size).tolist())
+        self.position = 0
+
+    def next_gap(self) -> float:
+        """
+Moves to random values of the next arrival and returns time until it
+        """
+        self.position += 1
+        if self.position >= self.block_size:
+            self.draw_block()
+        return self.block[0][self.position]
+
+    def run(self, max_arrivals: int = None, until: float = None)\
+            -> SimulationReport:
+        """
+Processes events until `max_arrivals` demands arrived or the simulated
+time reached `until`, whichever comes first, and returns report of this run
+        """
+        if max_arrivals is None and until is None:
+            raise ValueError('run needs max_arrivals or until')
+        report = SimulationReport(len(self.network.links))
+        self.integrate_loads()
+        self.loads_integral[:] = 0
+        start_time = self.now
+        wall_start = time.perf_counter()
+        while self.events:
+            event_time, kind, flow_id = self.events[0]
+            if until is not None and event_time > until:
+                break
+            if kind == ARRIVAL and max_arrivals is not None and\
+                    report.arrivals_count >= max_arrivals:
+                break
+            heappop(self.events)
+            self.now = event_time
+
+            if kind == DEPARTURE:
+                self.controller.release(flow_id)
+                report.departures_count += 1
+                continue
+
+            report.arrivals_count += 1
+            holding_time = self.block[1][self.position]
+            start_id, end_id = self.pairs[self.block[2][self.position]]
+            load = self.block[3][self.position]
+            heappush(self.events, (self.now + self.next_gap(), ARRIVAL, -1))
+
+            demand_start = time.perf_counter()
+            flow = self.controller.admit(start_id, end_id, load,
+                                         self.algorithm)
+            report.latencies.append(time.perf_counter() - demand_start)
+            if flow is None:
+                report.rejected_count += 1
+            else:
+                report.admitted_count += 1
+                heappush(self.events,
+                         (self.now + holding_time, DEPARTURE, flow.id))
+
+        if until is not None and until > self.now:
+            self.now = until
+        self.integrate_loads()
+        report.seconds = time.perf_counter() - wall_start
+        report.simulated_time = self.now - start_time
+        if report.simulated_time > 0:
+            report.utilization = self.loads_integral /\
+                self.network.capacities() / report.simulated_time
+        return report
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Simulation of demands arriving to and departing from '
+                    'a network')
+    parser.add_argument('--network', default='data/network_structure.xml')
+    parser.add_argument('--traffic', default=None,
+                        help='SNDlib XML file with demands, their values '
+                             'weight pairs of nodes')
+    parser.add_argument('--arrivals', type=int, default=100000)
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help='arrivals per unit of time')
+    parser.add_argument('--holding', type=float, default=10.0,
+                        help='mean holding time of a demand')
+    parser.add_argument('--loads', type=float, nargs=2, default=(1.0, 1.0),
+                        metavar=('MIN', 'MAX'))
+    parser.add_argument('--algorithm', type=int, default=ALG_A_STAR)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    network = net.Network(*net.parse_xml(args.network))
+    pairs = weights = None
+    if args.traffic is not None:
+        nodes_int_ids = {node_str_id: node_id for node_id, node_str_id
+                         in enumerate(network.nodes_ids_map)}
+        pairs = []
+        weights = []
+        for _, source_id, target_id, value in net.parse_demands(args.traffic):
+            if value > 0 and source_id != target_id:
+                pairs.append((nodes_int_ids[source_id],
+                              nodes_int_ids[target_id]))
+                weights.append(value)
+    simulation = Simulation(AdmissionController(network), args.rate,
+                            args.holding, tuple(args.loads), pairs, weights,
+                            args.algorithm, args.seed)
+    print(simulation.run(args.arrivals))
@@ -0,0 +1,93 @@
+import numpy as np
+from admission import AdmissionController
+from admission_test import create_test_network
+from routing import ALG_K_SHORTEST
+from simulation import Simulation, DEPARTURE
+import unittest
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.test_network = create_test_network()
+        self.test_network.reset_loads()
+        self.initial_epoch = self.test_network.load_epoch
+
+    def create_simulation(self, arrival_rate: float = 1.0,
+                          mean_holding_time: float = 1.0,
+                          load_range: tuple[float, float] = (0.01, 0.05),
+                          rng=1) -> Simulation:
+        return Simulation(AdmissionController(self.test_network),
+                          arrival_rate, mean_holding_time, load_range,
+                          algorithm=ALG_K_SHORTEST, rng=rng, block_size=16)
+
+    def test_departures_restore_loads(self):
+        simulation = self.create_simulation()
+
+        report = simulation.run(max_arrivals=200)
+        # Without the next arrival all flows depart
+        simulation.events = [event for event in simulation.events
+                             if event[1] == DEPARTURE]
+        report_end = simulation.run(until=simulation.now + 1000)
+
+        self.assertEqual(report.arrivals_count, 200)
+        self.assertEqual(report.admitted_count + report.rejected_count, 200)
+        self.assertEqual(report.admitted_count,
+                         report.departures_count + report_end.departures_count)
+        self.assertEqual(len(report.latencies), 200)
+        self.assertDictEqual(simulation.controller.flows, {})
+        np.testing.assert_allclose(self.test_network.loads, 0, atol=1e-9)
+
+    def test_blocking(self):
+        # Each link bears at most 2 flows of 0.4 at a time
+        simulation = self.create_simulation(arrival_rate=10.0,
+                                            mean_holding_time=10.0,
+                                            load_range=(0.4, 0.4))
+
+        report = simulation.run(max_arrivals=300)
+
+        self.assertGreater(report.blocking_ratio(), 0.5)
+        self.assertLess(report.blocking_ratio(), 1)
+        self.assertTrue(np.all(self.test_network.loads < 1))
+
+    def test_utilization(self):
+        simulation = self.create_simulation(arrival_rate=2.0,
+                                            mean_holding_time=2.0)
+
+        report = simulation.run(until=100.0)
+
+        self.assertEqual(simulation.now, 100.0)
+        self.assertAlmostEqual(report.simulated_time, 100.0)
+        self.assertTrue(np.all(report.utilization >= 0))
+        self.assertTrue(np.all(report.utilization < 1))
+        self.assertGreater(report.utilization.mean(), 0)
+        self.assertLessEqual(report.latency_percentile(50),
+                             report.latency_percentile(99))
+
+    def test_utilization_integrates_load_changes(self):
+        simulation = self.create_simulation(mean_holding_time=1e9,
+                                            load_range=(0.05, 0.05))
+        arrival_time = simulation.events[0][0]
+        # Only the first arrival is processed before the end of the run
+        until = arrival_time + 2.0
+
+        report = simulation.run(max_arrivals=1, until=until)
+
+        flow, = simulation.controller.flows.values()
+        expected = np.zeros(len(self.test_network.links))
+        np.add.at(expected, flow.links, 0.05 * (until - arrival_time) / until)
+        np.testing.assert_allclose(report.utilization, expected)
+
+    def test_seed(self):
+        reports = []
+        for _ in range(2):
+            self.test_network.reset_loads()
+            reports.append(
+                self.create_simulation(rng=7).run(max_arrivals=100))
+
+        self.assertEqual(reports[0].admitted_count,
+                         reports[1].admitted_count)
+        self.assertEqual(reports[0].departures_count,
+                         reports[1].departures_count)
+        np.testing.assert_allclose(reports[0].utilization,
+                                   reports[1].utilization)
@@ -5,12 +5,26 @@ class TreeNode:
     start_node = None
     end_node = None
 
+    # Rows of minimal distances to the end node and minimal costs to the start node
     min_dist = None
     min_cost = None
 
+    # Free capacity fractions of links, loads don't change during a search
+    free_fractions = None
+
     weight_length = 1
     weight_cost = 1
 
+    # Number of links each link stands for, None if every link is a single one
+    link_lengths = None
+
+    # If set, conflicts.ConflictIndex counting elements shared by both paths instead of shared links
+    conflict_index = None
+    conflict_ends_mask = None
+
+    # Goal function of the best known complete solution, children with higher scores are not created
+    upper_bound = float("inf")
+
     """
     Node of A* partial solution tree.\n
 Each node represents a partial solution through a list of integers, one for each edge in the network\n
@@ -29,10 +43,24 @@ A node consists of a partial solution and references to its parent and sons
         # Although not exactly necessary, this makes neighbourhood calculation much faster
         self.head = head
         self.phase = phase
+
+        # Bitmask of ids of nodes visited in the current phase, the second one starts at the end node
+        if parent is None or parent.phase != phase:
+            self.visited = 1 << head.id
+        else:
+            self.visited = parent.visited | (1 << head.id)
+
+        self.score = None
+        # Number of children not created because of `upper_bound`
+        self.pruned_count = 0
     
     def create_children_nodes(self):
         self.children = []
+        self.pruned_count = 0
+        mask = TreeNode.network.link_mask
         for link_id in self.head.links:
+            if mask is not None and not mask[link_id]:
+                continue
             link = TreeNode.network.links[link_id]
             edge_type = self.solution[link_id]
 
@@ -49,7 +77,7 @@ A node consists of a partial solution and references to its parent and sons
                         phase = self.phase
                         if target_node == TreeNode.end_node:
                             phase = 2    
-                        self.children.append(TreeNode(new_solution, self, target_node, phase))
+                        self.add_child(TreeNode(new_solution, self, target_node, phase))
             
             # Phase 2 = going back to start
             if self.phase == 2:
@@ -60,18 +88,65 @@ A node consists of a partial solution and references to its parent and sons
                         phase = self.phase
                         if target_node == TreeNode.start_node:
                             phase = 3    
-                        self.children.append(TreeNode(new_solution, self, target_node, phase))
+                        self.add_child(TreeNode(new_solution, self, target_node, phase))
             
             # Phase 3 = arrived at the start -> no more can be added
 
+    def add_child(self, child):
+        # Set only when scores never overestimate, see `a_star.heuristic_admissible`, so such a child can not lead
+        # to a solution better than the known one
+        if child.get_score() > TreeNode.upper_bound + 1e-9:
+            self.pruned_count += 1
+            return
+        self.children.append(child)
+
     def is_visited_in_this_phase(self, node):
-        for link_id in node.links:
-            if self.solution[link_id] >= self.phase:
-                return True
-        return False
+        return (self.visited >> node.id) & 1 == 1
+
+    def get_link_length(self, link_id):
+        if TreeNode.link_lengths is None:
+            return 1
+        return TreeNode.link_lengths[link_id]
+
+    def get_objectives(self):
+        """
+        Returns number of links shared by both paths, number of links of the first path
+        and -log10 of product of free capacity fractions of links of the second path
+        """
+        shared = 0
+        dist_sum = 0
+        capacity_cost = 0
+
+        for edge, value in enumerate(self.solution):
+            length = self.get_link_length(edge)
+            if value == 1 or value == 3:
+                dist_sum += length
+
+            if value == 2 or value == 3:
+                capacity_cost += TreeNode.network.links[edge].get_a_star_cost()
+
+            if value == 3:
+                shared += length
+
+        if TreeNode.conflict_index is not None:
+            shared = self.get_conflicts_count()
+        return shared, dist_sum, capacity_cost
+
+    def get_conflicts_count(self):
+        first_path = []
+        second_path = []
+        for edge, value in enumerate(self.solution):
+            if value == 1 or value == 3:
+                first_path.append(edge)
+            if value == 2 or value == 3:
+                second_path.append(edge)
+        return TreeNode.conflict_index.count(first_path, second_path, TreeNode.conflict_ends_mask)
 
     def get_score(self):
-        return self.get_heuristic() + self.get_goal_function()
+        # Search params don't change during a search, so the score is computed once
+        if self.score is None:
+            self.score = self.get_heuristic() + self.get_goal_function()
+        return self.score
 
     
     # Doesn't check validity
@@ -83,15 +158,16 @@ A node consists of a partial solution and references to its parent and sons
         for edge, value in enumerate(self.solution):
             
             if value == 1 or value == 3:
-                dist_sum += 1
+                dist_sum += self.get_link_length(edge)
 
             if value == 2 or value == 3:
-                capacity = TreeNode.network.links[edge].capacity
-                load = TreeNode.network.links[edge].load
-                cost_prod *= (capacity - load) / capacity
+                cost_prod *= TreeNode.free_fractions[edge]
             
-            if value == 3:
-                result += TreeNode.weight_cost + TreeNode.weight_length
+            if value == 3 and TreeNode.conflict_index is None:
+                result += (TreeNode.weight_cost + TreeNode.weight_length) * self.get_link_length(edge)
+
+        if TreeNode.conflict_index is not None:
+            result += (TreeNode.weight_cost + TreeNode.weight_length) * self.get_conflicts_count()
 
         if dist_sum == 0:
             result -= TreeNode.weight_length
@@ -108,21 +184,19 @@ A node consists of a partial solution and references to its parent and sons
         for edge, value in enumerate(self.solution):
             
             if value == 1 or value == 3:
-                dist_sum += 1
+                dist_sum += self.get_link_length(edge)
 
             if value == 2 or value == 3:
-                capacity = TreeNode.network.links[edge].capacity
-                load = TreeNode.network.links[edge].load
-                cost_prod *= (capacity - load) / capacity
+                cost_prod *= TreeNode.free_fractions[edge]
 
         
         heur_dist_sum = dist_sum
         heur_cost_prod = cost_prod
         if self.phase == 1:
-            heur_dist_sum += TreeNode.min_dist[self.head.id][TreeNode.end_node.id]
-            heur_cost_prod *= pow(10, -TreeNode.weight_cost * TreeNode.min_cost[self.end_node.id][self.start_node.id]) # 10^-cost to reverse -log10 that was necessary for Dijkstra to function
+            heur_dist_sum += TreeNode.min_dist[self.head.id]
+            heur_cost_prod *= pow(10, -TreeNode.weight_cost * TreeNode.min_cost[self.end_node.id]) # 10^-cost to reverse -log10 that was necessary for Dijkstra to function
         elif self.phase == 2:
-            heur_cost_prod *= pow(10, -TreeNode.weight_cost * TreeNode.min_cost[self.head.id][self.start_node.id])
+            heur_cost_prod *= pow(10, -TreeNode.weight_cost * TreeNode.min_cost[self.head.id])
             #heur_dist_sum += 0.0001 * TreeNode.min_dist[self.head.id][TreeNode.start_node.id]   # A small addition to speed up search. Shouldn't be big enough to make a real difference between otherwise same solutions
         else:
             return 0
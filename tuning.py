@@ -0,0 +1,247 @@
+import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import network as net
+from ant import RivalAntsAlgorithmNetwork, RivalDistanceAnt,\
+    RivalCapacityAnt, cost_func
+
+# distance ants: love towards capacity ants, pheromone influence, criterion influence;
+# capacity ants: love towards distance ants, pheromone influence, criterion influence
+DEFAULT_PARAMS = (-0.9, 1, 3, -0.9, 1, 45)
+PARAMS_NAMES = ('dist_cap_love', 'dist_pheromone', 'dist_criterion',
+                'cap_dist_love', 'cap_pheromone', 'cap_criterion')
+# Standard deviations of params of sampled configurations
+PARAMS_DEVIATIONS = (0.25, 1, 1, 0.25, 1, 1)
+# Cost of a demand for which ants could not find paths
+FAILURE_COST = 1000.0
+
+# Ant colony network of a worker process, created once by `init_worker`
+worker_network = None
+
+
+def init_worker(nodes_ids: list[str],
+                links_data: list[tuple[str, str, str, float, float]]) -> None:
+    global worker_network
+    worker_network = RivalAntsAlgorithmNetwork(nodes_ids, links_data, 2)
+
+
+def create_ants(params: tuple[float]) -> list:
+    return [RivalDistanceAnt((1, params[0]), params[1], params[2]),
+            RivalCapacityAnt((params[3], 1), params[4], params[5])]
+
+
+def sample_configurations(count: int, rng=None,
+                          base_params: tuple[float] = DEFAULT_PARAMS)\
+        -> list[tuple[float]]:
+    """
+Returns `base_params` and `count - 1` configurations drawn from normal
+distributions around them. Loves have to stay negative and influences
+non-negative, otherwise the base value is used.
+    """
+    rng = np.random.default_rng(rng)
+    configurations = [tuple(base_params)]
+    for _ in range(count - 1):
+        params = rng.normal(base_params, PARAMS_DEVIATIONS).tolist()
+        for i in range(len(params)):
+            is_love = i % 3 == 0
+            if (is_love and params[i] >= 0) or\
+                    (not is_love and params[i] < 0):
+                params[i] = base_params[i]
+        configurations.append(tuple(params))
+    return configurations
+
+
+def evaluate(params: tuple[float], demands: list[tuple[str, str]],
+             ants_per_generation: int, generations_number: int, seed)\
+        -> tuple[float, float]:
+    """
+Runs the colony of a worker process with ants configured by `params` for
+every demand. Returns sum of costs of found paths and used CPU time
+    """
+    cpu_time = time.process_time()
+    rng = np.random.default_rng(seed)
+    cost_sum = 0.0
+    for start_id, end_id in demands:
+        paths = worker_network.rival_ants_algorithm(
+            start_id, end_id, create_ants(params), cost_func,
+            ants_per_generation, generations_number, rng=rng)
+        if paths is None:
+            cost_sum += FAILURE_COST
+            continue
+        links_paths = [[worker_network.get_link_by_id(link_id)
+                        for link_id in path] for path in paths]
+        cost_sum += cost_func(links_paths, len(worker_network.links))
+    return cost_sum, time.process_time() - cpu_time
+
+
+class TuningResult:
+    """
+Evaluation of a single configuration of colony parameters.\n
+Contains sum of costs of paths found for `demands_count` first demands of
+the demand set, and CPU time it took. Quality is the inverse of 1 plus
+average cost, so that it is positive and higher is better.
+    """
+    def __init__(self, params: tuple[float]) -> None:
+        self.params = params
+        self.demands_count = 0
+        self.cost_sum = 0.0
+        self.cpu_seconds = 0.0
+
+    def average_cost(self) -> float:
+        return self.cost_sum / self.demands_count
+
+    def quality(self) -> float:
+        return 1 / (1 + self.average_cost())
+
+    def quality_per_cpu_second(self) -> float:
+        return self.quality() / max(self.cpu_seconds, 1e-9)
+
+
+class Tuner:
+    """
+Tunes parameters of the ant colony with successive halving.\n
+All configurations are evaluated on a few first demands of `demands`, then
+only the best `1/eta` of them are evaluated on `eta` times more demands,
+until one configuration is left or all demands were used. Evaluations only
+extend previous ones by new demands.\n
+Evaluations run in a pool of `workers_count` processes, or in this process
+if it is 0. Each evaluation gets its own random stream spawned from `seed`.
+    """
+    def __init__(self, nodes_ids: list[str],
+                 links_data: list[tuple[str, str, str, float, float]],
+                 demands: list[tuple[str, str]], workers_count: int = None,
+                 ants_per_generation: int = 5, generations_number: int = 25,
+                 eta: int = 3, min_demands: int = 2, seed=None) -> None:
+        self.nodes_ids = nodes_ids
+        self.links_data = links_data
+        self.demands = demands
+        self.workers_count = workers_count
+        self.ants_per_generation = ants_per_generation
+        self.generations_number = generations_number
+        self.eta = eta
+        self.min_demands = min_demands
+        self.seed_sequence = np.random.SeedSequence(seed)
+
+    def tune(self, configurations: list[tuple[float]])\
+            -> list[TuningResult]:
+        """
+Returns results of all `configurations`, the ones that survived the most
+rounds first, each round ordered by quality
+        """
+        results = [TuningResult(params) for params in configurations]
+        survivors = results
+        demands_count = min(self.min_demands, len(self.demands))
+        executor = None
+        if self.workers_count != 0:
+            executor = ProcessPoolExecutor(
+                self.workers_count, initializer=init_worker,
+                initargs=(self.nodes_ids, self.links_data))
+        else:
+            init_worker(self.nodes_ids, self.links_data)
+        try:
+            while True:
+                self.evaluate_round(survivors, demands_count, executor)
+                survivors.sort(key=TuningResult.quality, reverse=True)
+                if len(survivors) == 1 or demands_count == len(self.demands):
+                    break
+                survivors = survivors[:max(1, len(survivors) // self.eta)]
+                demands_count = min(demands_count * self.eta,
+                                    len(self.demands))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        results.sort(key=lambda result: (result.demands_count,
+                                         result.quality()), reverse=True)
+        return results
+
+    def evaluate_round(self, results: list[TuningResult], demands_count: int,
+                       executor: ProcessPoolExecutor) -> None:
+        seeds = self.seed_sequence.spawn(len(results))
+        tasks = [(result.params, self.demands[result.demands_count:
+                                              demands_count],
+                  self.ants_per_generation, self.generations_number, seed)
+                 for result, seed in zip(results, seeds)]
+        if executor is None:
+            evaluations = [evaluate(*task) for task in tasks]
+        else:
+            evaluations = executor.map(evaluate, *zip(*tasks))
+        for result, (cost_sum, cpu_seconds) in zip(results, evaluations):
+            result.demands_count = demands_count
+            result.cost_sum += cost_sum
+            result.cpu_seconds += cpu_seconds
+
+
+def save_results(path: str, results: list[TuningResult]) -> None:
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(PARAMS_NAMES + ('demands', 'average_cost', 'quality',
+                                        'cpu_seconds',
+                                        'quality_per_cpu_second'))
+        for result in results:
+            writer.writerow(tuple(f'{param:.4g}' for param in result.params) +
+                            (result.demands_count,
+                             f'{result.average_cost():.6g}',
+                             f'{result.quality():.6g}',
+                             f'{result.cpu_seconds:.4g}',
+                             f'{result.quality_per_cpu_second():.6g}'))
+
+
+def random_demands(nodes_ids: list[str], count: int, rng=None)\
+        -> list[tuple[str, str]]:
+    rng = np.random.default_rng(rng)
+    demands = []
+    while len(demands) < count:
+        start_index, end_index = rng.choice(len(nodes_ids), 2, replace=False)
+        demands.append((nodes_ids[start_index], nodes_ids[end_index]))
+    return demands
+
+
+def main(argv: list[str] = None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Tuning of ant colony parameters')
+    parser.add_argument('network', nargs='?',
+                        default='data/network_structure.xml')
+    parser.add_argument('--configurations', type=int, default=81)
+    parser.add_argument('--demands', type=int, default=54,
+                        help='number of random demands in the demand set')
+    parser.add_argument('--min-demands', type=int, default=2,
+                        help='demands evaluated in the first round')
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--generations', type=int, default=25)
+    parser.add_argument('--ants', type=int, default=5,
+                        help='ants of each type per generation')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='size of the process pool, 0 to run in place')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default='tuning_results.csv')
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    nodes_ids, links_data = net.parse_xml(args.network)
+    configurations_rng, demands_rng, tuner_rng =\
+        np.random.default_rng(args.seed).spawn(3)
+    tuner = Tuner(nodes_ids, links_data,
+                  random_demands(nodes_ids, args.demands, demands_rng),
+                  args.workers, args.ants, args.generations, args.eta,
+                  args.min_demands, int(tuner_rng.integers(2**32)))
+    results = tuner.tune(sample_configurations(args.configurations,
+                                               configurations_rng))
+    save_results(args.output, results)
+
+    finalists = [result for result in results
+                 if result.demands_count == results[0].demands_count]
+    print('Best by quality:')
+    for result in finalists[:args.top]:
+        print(f'{result.params} quality {result.quality():.4f}, '
+              f'{result.cpu_seconds:.2f} CPU seconds')
+    print('Best by quality per CPU second:')
+    finalists.sort(key=TuningResult.quality_per_cpu_second, reverse=True)
+    for result in finalists[:args.top]:
+        print(f'{result.params} quality {result.quality():.4f}, '
+              f'{result.quality_per_cpu_second():.4f} per CPU second')
+
+
+if __name__ == '__main__':
+    main()
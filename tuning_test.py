@@ -0,0 +1,48 @@
+import csv
+import os
+import tempfile
+import tuning
+import unittest
+
+NODES_IDS = ['A', 'B', 'C', 'D']
+LINKS_DATA = [('L1', 'A', 'B', 10.0, 1.0),
+              ('L2', 'B', 'C', 10.0, 1.0),
+              ('L3', 'C', 'A', 10.0, 1.0),
+              ('L4', 'C', 'D', 10.0, 1.0),
+              ('L5', 'B', 'D', 10.0, 1.0)]
+
+
+class TestTuner(unittest.TestCase):
+
+    def test_sample_configurations(self):
+        configurations = tuning.sample_configurations(20, 3)
+
+        self.assertEqual(len(configurations), 20)
+        self.assertEqual(configurations[0], tuning.DEFAULT_PARAMS)
+        for params in configurations:
+            self.assertLess(params[0], 0)
+            self.assertLess(params[3], 0)
+            for influence in params[1:3] + params[4:]:
+                self.assertGreaterEqual(influence, 0)
+
+    def test_successive_halving(self):
+        demands = tuning.random_demands(NODES_IDS, 8, 5)
+        tuner = tuning.Tuner(NODES_IDS, LINKS_DATA, demands,
+                             workers_count=0, generations_number=2,
+                             eta=3, min_demands=1, seed=5)
+
+        results = tuner.tune(tuning.sample_configurations(9, 5))
+
+        self.assertListEqual([result.demands_count for result in results],
+                             [8] + [3] * 2 + [1] * 6)
+        for result in results:
+            self.assertGreater(result.quality(), 0)
+            self.assertGreater(result.cpu_seconds, 0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.csv')
+            tuning.save_results(path, results)
+            with open(path, newline='') as file:
+                rows = list(csv.reader(file))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[1][6], '8')